@@ -13,13 +13,21 @@ import sublime_plugin
 
 from Dart.sublime_plugin_lib import PluginLogger
 from Dart.sublime_plugin_lib.events import IdleIntervalEventListener
+from Dart.sublime_plugin_lib.panels import OutputPanel
 from Dart.sublime_plugin_lib.path import is_active
 from Dart.sublime_plugin_lib.sublime import after
 
+from Dart._init_ import editor_context
+from Dart.lib.analysis_status import summarize
+from Dart.lib.analysis_status import TRIGGER_PUBSPEC
 from Dart.lib.analyzer.analyzer import AnalysisServer
 from Dart.lib.error import ConfigError
+from Dart.lib.manifests import refresh_manifests_async
+from Dart.lib.package_uris import uri_resolver
+from Dart.lib.path import is_pubspec
 from Dart.lib.path import is_view_dart_script
 from Dart.lib.path import only_for_dart_files
+from Dart.lib.project_registry import registry
 from Dart.lib.pub_package import DartFile
 from Dart.lib.sdk import SDK
 
@@ -63,9 +71,18 @@ def _init():
         print('==============================================')
         return
 
+    uri_resolver.server_lookup = _map_uri
+
     # print('Dart: Starting analysis server...')
 
 
+def _map_uri(root, uri, callback):
+    if not AnalysisServer.ping():
+        callback(None)
+        return
+    g_server.send_map_uri(root, uri, callback)
+
+
 def plugin_unloaded():
     # The worker threads handling requests/responses block when reading their
     # queue, so give them something.
@@ -114,6 +131,12 @@ class DartViewEventsMonitor(sublime_plugin.EventListener):
             self.on_load(view)
             return
 
+    @only_for_dart_files
+    def on_close(self, view):
+        if view.file_name():
+            editor_context.highlights.remove(view.file_name())
+            editor_context.symbol_index.remove(view.file_name())
+
     @only_for_dart_files
     def on_post_save(self, view):
         # The file has been saved, so force use of filesystem content.
@@ -140,3 +163,50 @@ class DartViewEventsMonitor(sublime_plugin.EventListener):
         else:
             # XXX: Retry this a limited amount of times and increase timeout?
             after(250, self.on_activated, view)
+
+
+class DartPubspecMonitor(sublime_plugin.EventListener):
+    """
+    Notes edits to pubspec.yaml files, which may create new packages and
+    usually cause lots of analysis.
+    """
+
+    def on_post_save(self, view):
+        if not is_pubspec(view):
+            return
+
+        # The file may be new.
+        registry.invalidate(os.path.dirname(view.file_name()))
+        # Have it parsed by the time something asks about dependencies.
+        refresh_manifests_async(os.path.dirname(view.file_name()))
+
+        if AnalysisServer.ping():
+            g_server.status.mark(TRIGGER_PUBSPEC)
+
+
+class DartShowAnalysisHistoryCommand(sublime_plugin.WindowCommand):
+    """
+    Shows how long analysis took to settle down after startup, root changes
+    and pubspec.yaml edits, across plugin and server versions.
+    """
+
+    def run(self):
+        records = editor_context.status_history.read()
+
+        panel = OutputPanel('dart.analysis_history')
+        if not records:
+            panel.write('No analysis history yet.\n')
+        else:
+            panel.write(summarize(records) + '\n\nRecent:\n')
+            for r in records[-20:]:
+                panel.write('  {:<10} {:>8}ms  ({} / {})\n'.format(
+                            r.get('trigger'), r.get('quiescence_ms'),
+                            r.get('plugin'), r.get('server')))
+
+        if g_server:
+            current = g_server.status.get_history()
+            panel.write('\nThis session: {} intervals'.format(len(current)))
+            if g_server.status.is_analyzing:
+                panel.write(', analyzing now')
+            panel.write('\n')
+        panel.show()
@@ -11,6 +11,7 @@ from Dart.sublime_plugin_lib.sublime import get_active_view
 from Dart import analyzer
 from Dart._init_ import editor_context
 from Dart.analyzer import AnalysisServer
+from Dart.lib.analyzer import actions
 from Dart.lib.path import is_view_dart_script
 from Dart.lib.pub_package import DartFile
 
@@ -18,6 +19,31 @@ from Dart.lib.pub_package import DartFile
 _logger = PluginLogger(__name__)
 
 
+_IDENTIFIER_CHAR_RX = re.compile(r'[\w$]')
+_RECEIVER_END_RX = re.compile(r'[\w$)\]\'"]')
+
+
+def find_identifier_start(view, pt):
+    '''Returns the offset where the identifier ending at @pt starts.
+    '''
+    line_start = view.line(pt).begin()
+    start = pt
+    while start > line_start and _IDENTIFIER_CHAR_RX.match(view.substr(start - 1)):
+        start -= 1
+    return start
+
+
+def get_receiver(view, anchor):
+    '''Returns the text between the start of the line and @anchor.
+    '''
+    return view.substr(sublime.Region(view.line(anchor).begin(), anchor))
+
+
+def speculative_completions_enabled():
+    setts = sublime.load_settings('Dart - Plugin Settings.sublime-settings')
+    return setts.get('dart_speculative_completions') is True
+
+
 class DartIdleAutocomplete(IdleIntervalEventListener):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -34,6 +60,9 @@ class DartIdleAutocomplete(IdleIntervalEventListener):
         self._show_completions(view)
 
     def _show_completions(self, view):
+        if self._show_prefetched_completions(view):
+            return
+
         try:
             # TODO: We probably should show completions after other chars.
             is_after_dot = view.substr(view.sel()[0].b - 1) == '.'
@@ -54,6 +83,35 @@ class DartIdleAutocomplete(IdleIntervalEventListener):
         if is_active(view):
             view.window().run_command('dart_get_completions')
 
+    def _show_prefetched_completions(self, view):
+        '''Shows completions obtained ahead of time, if any are available for
+        the caret's location.
+
+        Returns `True` if completions were shown.
+        '''
+        if not speculative_completions_enabled():
+            return False
+
+        try:
+            pt = view.sel()[0].b
+        except IndexError:
+            return False
+
+        anchor = find_identifier_start(view, pt)
+        if view.substr(anchor - 1) != '.':
+            return False
+
+        with editor_context.autocomplete_context as actx:
+            results = actx.take_prefetched(view.id(), anchor,
+                                           get_receiver(view, anchor))
+
+        if results is None:
+            return False
+
+        _logger.debug('using prefetched completions at %d', anchor)
+        actions.handle_completions(results)
+        return True
+
     def _in_string_or_comment(self, view):
         try:
             return view.match_selector(view.sel()[0].b,
@@ -62,6 +120,72 @@ class DartIdleAutocomplete(IdleIntervalEventListener):
             pass
 
 
+class DartSpeculativeCompletions(sublime_plugin.EventListener):
+    '''Requests completions as soon as a member access starts, so that they
+    are ready by the time the completions popup would open.
+
+    Opt-in via the `dart_speculative_completions` setting.
+    '''
+
+    def on_modified(self, view):
+        if not speculative_completions_enabled():
+            return
+
+        if not is_view_dart_script(view) or len(view.sel()) != 1:
+            return
+
+        if not view.sel()[0].empty() or not is_active(view):
+            return
+
+        pt = view.sel()[0].b
+        trigger, anchor = self._get_trigger(view, pt)
+        if not trigger:
+            return
+
+        if view.match_selector(pt, 'source.dart string, source.dart comment'):
+            return
+
+        if not AnalysisServer.ping():
+            return
+
+        receiver = get_receiver(view, anchor)
+        with editor_context.autocomplete_context as actx:
+            prefetch = actx.prefetch
+            if prefetch and prefetch.matches(view.id(), anchor, receiver):
+                # We already asked for this location.
+                return
+
+            if not actx.prefetch_stats.should_prefetch(trigger):
+                _logger.debug('skipping prefetch (%s)', actx.prefetch_stats)
+                return
+
+        analyzer.g_server.send_change_content(view)
+        analyzer.g_server.send_prefetch_suggestions(view, view.file_name(), pt,
+                                                    anchor, receiver)
+
+    def _get_trigger(self, view, pt):
+        '''Returns the kind of trigger found before @pt and the offset where
+        the completed identifier starts.
+        '''
+        if pt < 2:
+            return None, None
+
+        prev = view.substr(pt - 1)
+        if prev == '.':
+            if _RECEIVER_END_RX.match(view.substr(pt - 2)):
+                return '.', pt
+            return None, None
+
+        if (_IDENTIFIER_CHAR_RX.match(prev) and
+            not prev.isdigit() and
+            pt >= 3 and
+            view.substr(pt - 2) == '.' and
+            _RECEIVER_END_RX.match(view.substr(pt - 3))):
+                return 'identifier', pt - 1
+
+        return None, None
+
+
 class DartGetCompletions(sublime_plugin.WindowCommand):
     def run(self):
         view = self.window.active_view()
@@ -5,35 +5,322 @@
 '''Search commands.
 '''
 
+from collections import defaultdict
+import os
+import threading
+
 import sublime
 import sublime_plugin
 
 from Dart.sublime_plugin_lib import PluginLogger
+from Dart.sublime_plugin_lib.panels import OutputPanel
+from Dart.sublime_plugin_lib.sublime import after
+
 from Dart import analyzer
+from Dart._init_ import editor_context
+from Dart.lib.analyzer.queue import TaskPriority
+from Dart.lib.analyzer.searches import SearchHandler
+from Dart.lib.path import find_pubspec_path
+from Dart.lib.references import format_reference
+from Dart.lib.references import OffsetTableCache
+from Dart.lib.references import RESULT_FILE_REGEX
 
 
 _logger = PluginLogger(__name__)
 
 
+class DeclarationIndexRefresh(SearchHandler):
+    '''Feeds the results of a search for all top-level declarations into the
+    persistent declaration indexes.
+
+    Files are only replaced once the search has finished, so a refresh cut
+    short leaves the existing index untouched.
+    '''
+
+    def __init__(self, index, on_done=None):
+        '''
+        @index
+          The `DeclarationIndex` this refresh was started for.
+
+        @on_done
+          Called without arguments on the UI thread when the refresh is done.
+        '''
+        self.index = index
+        self.on_done = on_done
+        # path -> [(name, kind, offset, row, col)]
+        self.files = defaultdict(list)
+
+    def on_results(self, results, is_last):
+        for result in results:
+            if not result.path:
+                continue
+            element = result.path[0]
+            loc = result.location
+            self.files[loc.file].append((element.name, element.kind,
+                                         loc.offset, loc.startLine,
+                                         loc.startColumn))
+
+        if not is_last:
+            return
+
+        indexes = editor_context.declaration_indexes
+        for path, decls in self.files.items():
+            # The server searches across all roots; update any index we've
+            # loaded, not only the one we were asked to refresh.
+            index = indexes.find_loaded(path)
+            if index:
+                index.update_file(path, decls)
+
+        self.index.mark_refreshed()
+        _logger.debug('refreshed declarations index for %s (%d files)',
+                      self.index.root, len(self.files))
+
+        if self.on_done:
+            after(0, self.on_done)
+
+
 class DartFindTopLevelDeclsCommand(sublime_plugin.WindowCommand):
     '''Displays the top-level declarations.
+
+    Results are served from the persistent declaration index for the current
+    package; the index is refreshed from the analysis server in the
+    background when it's old.
     '''
-    def run(self):
-        if analyzer.g_server.ping():
-            v = self.window.active_view()
-            word = v.word(v.sel()[0].b)
-            word = v.substr(word).strip()
-            _logger.info("finding top level decls")
-            analyzer.g_server.send_find_top_level_decls(v, word)
+    def run(self, pattern=None):
+        '''
+        @pattern
+          Regex to match declaration names against. Defaults to the word
+          under the caret; if there isn't any, the user is prompted for one.
+        '''
+        v = self.window.active_view()
+        if not (v and v.file_name()):
+            return
+
+        if pattern is None:
+            try:
+                word = v.substr(v.word(v.sel()[0].b)).strip()
+            except IndexError:
+                word = ''
+
+            if not word.isidentifier():
+                self.window.show_input_panel('Find top-level declarations:',
+                        '', lambda text: self.run(pattern=text), None, None)
+                return
+            pattern = word
+
+        if not pattern:
             return
 
+        root = find_pubspec_path(v.file_name())
+        if not root:
+            sublime.status_message('Dart: Not in a pub package.')
+            return
+
+        index = editor_context.declaration_indexes.get(root)
+        found, stale = index.search(pattern)
+
+        if found:
+            self.show(found)
+
+        if not (stale or index.needs_refresh):
+            if not found:
+                sublime.status_message('Dart: No declarations found.')
+            return
+
+        if not analyzer.g_server.ping():
+            return
+
+        if not index.start_refresh():
+            return
+
+        _logger.info("refreshing top-level declarations for %s", root)
+
+        on_done = None
+        if not found:
+            # Nothing on screen; show whatever the refresh turns up.
+            def on_done():
+                self.run(pattern=pattern)
+
+        analyzer.g_server.send_find_top_level_decls(v, '.*',
+                DeclarationIndexRefresh(index, on_done),
+                priority=TaskPriority.LOW if found else TaskPriority.HIGH)
+
+    def show(self, declarations):
+        self.declarations = declarations
+        self.window.show_quick_panel(
+                [d.to_quick_panel_item() for d in declarations], self.on_done)
+
+    def on_done(self, idx):
+        if idx == -1:
+            return
+
+        decl = self.declarations[idx]
+        self.window.open_file("{}:{}:{}".format(decl.path, decl.row, decl.col),
+                              sublime.ENCODED_POSITION)
+
+
+def find_open_view(path):
+    for window in sublime.windows():
+        view = window.find_open_file(path)
+        if view:
+            return view
+
+
+def read_file(path):
+    try:
+        with open(path, 'rt', encoding='utf-8', newline='') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return
+
+
+class ReferencesSearch(SearchHandler):
+    '''Streams the results of a find-references search into an output
+    panel as they arrive.
+    '''
+
+    PANEL_NAME = 'dart.references'
+
+    # Shared across searches; files rarely change between two of them.
+    offset_tables = OffsetTableCache()
+
+    # The search that owns the panel.
+    current = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.element = None
+        self.count = 0
+        self.done = False
+        self.cancelled = False
+        self.panel = OutputPanel(self.PANEL_NAME)
+        self.panel.set('result_file_regex', RESULT_FILE_REGEX)
+        self.panel.write(self.header() + '\n')
+        self.panel.show()
+        ReferencesSearch.current = self
+
+    def header(self):
+        name = self.element.name if self.element else '...'
+        if self.cancelled:
+            state = ' (cancelled)'
+        elif not self.done:
+            state = ' (searching)'
+        else:
+            state = ''
+        return 'References to {}: {}{}'.format(name, self.count, state)
+
+    def cancel(self):
+        with self.lock:
+            if self.done:
+                return
+            self.cancelled = True
+            self.done = True
+        analyzer.g_server.searches.cancel(self)
+        after(0, self.update_header)
+
+    def on_start(self, element):
+        if element is None:
+            with self.lock:
+                self.done = True
+            after(0, self.write, 'No element found at the caret.\n')
+            after(0, self.update_header)
+            return
+
+        self.element = element
+        after(0, self.update_header)
+
+    def on_results(self, results, is_last):
+        # Resolve locations here, off the UI thread.
+        lines = [self.format_result(result) for result in results]
+
+        with self.lock:
+            if self.cancelled:
+                return
+            self.count += len(lines)
+            self.done = is_last
+
+        if lines:
+            after(0, self.write, '\n'.join(lines) + '\n')
+        after(0, self.update_header)
+
+    def format_result(self, result):
+        loc = result.location
+        table = self.get_offset_table(loc.file)
+        if table is None:
+            return format_reference(loc.file, loc.startLine, loc.startColumn,
+                                    result.kind, potential=result.isPotential)
+
+        row, col = table.row_col(loc.offset)
+        return format_reference(loc.file, row, col, result.kind,
+                                table.line(row), result.isPotential)
+
+    def get_offset_table(self, path):
+        # Offsets refer to the buffer's content for files we have open.
+        view = find_open_view(path)
+        if view:
+            return self.offset_tables.get(path, ('view', view.change_count()),
+                    lambda: view.substr(sublime.Region(0, view.size())))
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return
+        return self.offset_tables.get(path, ('file', mtime),
+                                      lambda: read_file(path))
+
+    def write(self, text):
+        # A newer search may have taken over the panel.
+        if ReferencesSearch.current is self:
+            self.panel.write(text)
+
+    def update_header(self):
+        if ReferencesSearch.current is self:
+            self.panel.view.run_command('dart_replace_first_line',
+                                        {'text': self.header()})
+
 
 class DartFindReferences(sublime_plugin.WindowCommand):
-    '''Displays the references of the given element.
+    '''Displays the references of the element under the caret.
+
+    Results are shown as they arrive from the analysis server.
     '''
+
     def run(self):
-        if analyzer.g_server.ping():
-            v = self.window.active_view()
-            _logger.info("finding element references")
-            analyzer.g_server.send_find_element_refs(v)
+        if not analyzer.g_server.ping():
             return
+
+        v = self.window.active_view()
+        if not (v and v.file_name()):
+            return
+
+        try:
+            offset = v.sel()[0].b
+        except IndexError:
+            return
+
+        if ReferencesSearch.current:
+            ReferencesSearch.current.cancel()
+
+        if v.is_dirty():
+            analyzer.g_server.send_change_content(v)
+
+        _logger.info("finding element references")
+        analyzer.g_server.send_find_element_refs(v, offset,
+                                                 ReferencesSearch())
+
+
+class DartCancelFindReferences(sublime_plugin.WindowCommand):
+    '''Stops showing results for the search in progress.
+    '''
+    def run(self):
+        if ReferencesSearch.current:
+            ReferencesSearch.current.cancel()
+
+    def is_enabled(self):
+        search = ReferencesSearch.current
+        return bool(search and not search.done)
+
+
+class DartReplaceFirstLine(sublime_plugin.TextCommand):
+    def run(self, edit, text):
+        self.view.replace(edit, self.view.full_line(0), text + '\n')
@@ -5,6 +5,15 @@
 import sublime_plugin
 import sublime
 
+from Dart.sublime_plugin_lib import PluginLogger
+
+from Dart.lib.perf import Stopwatch
+from Dart.lib.source_edits import apply_times
+from Dart.lib.source_edits import sort_edits
+
+
+_logger = PluginLogger(__name__)
+
 
 class DartKillToEol(sublime_plugin.TextCommand):
     '''Kills text from caret to EOL.
@@ -12,3 +21,36 @@ class DartKillToEol(sublime_plugin.TextCommand):
     def run(self, edit):
         eol = self.view.size()
         self.view.erase(edit, sublime.Region(self.view.sel()[0].b, eol))
+
+
+class DartApplySourceEdits(sublime_plugin.TextCommand):
+    '''Applies a list of edits from the analysis server in a single step.
+
+    Used for formatting, fixes, assists and refactorings alike.
+    '''
+    def run(self, edit, edits, selection=None):
+        '''
+        @edits
+          A list of [offset, length, replacement] lists. See
+          `Dart.lib.source_edits.to_command_args`.
+
+        @selection
+          An optional [begin, end] list to select once the edits are applied.
+        '''
+        applied = 0
+        with Stopwatch() as sw:
+            # Last edits first, so that offsets remain valid.
+            for offset, length, replacement in sort_edits(edits):
+                region = sublime.Region(offset, offset + length)
+                if self.view.substr(region) == replacement:
+                    continue
+                self.view.replace(edit, region, replacement)
+                applied += 1
+
+            if selection is not None:
+                self.view.sel().clear()
+                self.view.sel().add(sublime.Region(*selection))
+
+        apply_times.add(sw.ms)
+        _logger.debug('applied %d of %d edits in %.1fms', applied, len(edits),
+                      sw.ms)
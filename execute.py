@@ -19,6 +19,10 @@ from Default.exec import AsyncProcess
 from Dart.sublime_plugin_lib.sublime import after
 
 from Dart.sublime_plugin_lib.panels import OutputPanel
+from Dart.lib.output_buffer import OutputBuffer
+from Dart.lib.output_buffer import keep_last_lines
+from Dart.lib.package_uris import LocationRewriter
+from Dart.lib.package_uris import uri_resolver
 
 
 class DartExecCommand(sublime_plugin.WindowCommand, ProcessListener):
@@ -36,13 +40,17 @@ class DartExecCommand(sublime_plugin.WindowCommand, ProcessListener):
             syntax='',
             preamble='',
             panel_name='dart.out',
+            # Package root used to turn URIs in the output into paths.
+            uri_root=None,
             # Catches "path" and "shell"
             **kwargs):
 
         if kill:
             if hasattr(self, 'proc') and self.proc:
                 self.proc.kill()
+                self.flush_output()
                 self.proc = None
+                self.flush_locations()
                 self.append_string(None, "[Cancelled]")
             return
 
@@ -51,6 +59,9 @@ class DartExecCommand(sublime_plugin.WindowCommand, ProcessListener):
         if not hasattr(self, 'out_panel'):
             # Try not to call get_output_panel until the regexes are assigned
             self.out_panel = OutputPanel(panel_name)
+            # Shared by all runs; output from old runs is discarded when
+            # it's written.
+            self.output = OutputBuffer()
 
         # Default to the current files directory if no working directory was given
         if (not working_dir and
@@ -70,8 +81,17 @@ class DartExecCommand(sublime_plugin.WindowCommand, ProcessListener):
         self.out_panel.view.assign_syntax(syntax)
         self.out_panel.set('color_scheme', '')
 
+        settings = sublime.load_settings(
+              "Dart - Plugin Settings.sublime-settings")
+
         self.encoding = encoding
         self.quiet = quiet
+        self.max_lines = settings.get("dart_output_max_lines", 10000)
+        self.locations = None
+        # Bytes dropped because the editor fell behind, and bytes trimmed
+        # to keep the panel within `max_lines` lines.
+        self.dropped = 0
+        self.trimmed = 0
 
         self.proc = None
         if not self.quiet:
@@ -84,8 +104,7 @@ class DartExecCommand(sublime_plugin.WindowCommand, ProcessListener):
         if preamble:
             self.append_string(self.proc, preamble)
 
-        show_panel_on_build = sublime.load_settings(
-              "Dart - Plugin Settings.sublime-settings").get("show_panel_on_build", True)
+        show_panel_on_build = settings.get("show_panel_on_build", True)
         if show_panel_on_build:
             self.out_panel.show()
 
@@ -120,6 +139,10 @@ class DartExecCommand(sublime_plugin.WindowCommand, ProcessListener):
             self.append_string(None, self.debug_text + "\n")
             if not self.quiet:
                 self.append_string(None, "[Finished]")
+        else:
+            # Output arrives through `after`, so this is in place in time.
+            if uri_root:
+                self.locations = LocationRewriter(uri_resolver, uri_root)
 
     def append_data(self, proc, data):
         if proc != self.proc:
@@ -140,13 +163,57 @@ class DartExecCommand(sublime_plugin.WindowCommand, ProcessListener):
         # in memory.
         str_ = str_.replace('\r\n', '\n').replace('\r', '\n')
 
-        self.out_panel.write(str_)
+        if self.locations:
+            str_ = self.locations.feed(str_)
+
+        self.write_output(str_)
+
+    def write_output(self, text):
+        if self.max_lines:
+            kept, cut = keep_last_lines(text, self.max_lines)
+            if cut:
+                self.trimmed += len(text[:cut].encode(self.encoding))
+                text = kept
+
+        self.out_panel.write(text)
+
+        if self.max_lines:
+            self.trim_panel()
+
+    def trim_panel(self):
+        view = self.out_panel.view
+        lines = view.rowcol(view.size())[0]
+        # Let the panel grow a little past the limit, so that we don't edit
+        # it on every write.
+        if lines <= self.max_lines + self.max_lines // 10:
+            return
+        region = sublime.Region(0, view.text_point(lines - self.max_lines, 0))
+        self.trimmed += len(view.substr(region).encode(self.encoding))
+        view.run_command('dart_erase_region', {'region': [region.a, region.b]})
+
+    def flush_output(self):
+        chunks, dropped = self.output.take()
+        self.dropped += dropped
+        for proc, data in chunks:
+            self.append_data(proc, data)
+
+    def flush_locations(self):
+        # Write out the last, unfinished line kept by the rewriter.
+        locations, self.locations = getattr(self, 'locations', None), None
+        if locations:
+            self.write_output(locations.flush())
 
     def append_string(self, proc, str):
         self.append_data(proc, str.encode(self.encoding))
 
     def finish(self, proc):
+        self.flush_output()
+        if proc == self.proc:
+            self.flush_locations()
+
         if not self.quiet:
+            if proc == self.proc:
+                self.report_lost_output()
             elapsed = time.time() - proc.start_time
             exit_code = proc.exit_code()
             if (exit_code == 0) or (exit_code == None):
@@ -167,8 +234,26 @@ class DartExecCommand(sublime_plugin.WindowCommand, ProcessListener):
         else:
             sublime.status_message(("Build finished with %d errors") % len(errs))
 
+    def report_lost_output(self):
+        if self.dropped:
+            self.append_string(self.proc,
+                "[Dropped %d bytes of output the editor couldn't keep up "
+                "with]\n" % self.dropped)
+        if self.trimmed:
+            self.append_string(self.proc,
+                "[Trimmed %d bytes of older output to keep the last %d "
+                "lines]\n" % (self.trimmed, self.max_lines))
+
     def on_data(self, proc, data):
-        after(0, functools.partial(self.append_data, proc, data))
+        # Called from the process' reader threads.
+        delay = self.output.add(proc, data)
+        if delay is not None:
+            after(delay, self.flush_output)
 
     def on_finished(self, proc):
         after(0, functools.partial(self.finish, proc))
+
+
+class DartEraseRegion(sublime_plugin.TextCommand):
+    def run(self, edit, region):
+        self.view.erase(edit, sublime.Region(*region))
@@ -0,0 +1,221 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Applies the same fix to all errors of a kind.
+'''
+
+import sublime
+import sublime_plugin
+
+from Dart.sublime_plugin_lib import PluginLogger
+from Dart.sublime_plugin_lib.sublime import after
+
+from Dart import analyzer
+from Dart._init_ import editor_context
+from Dart.lib.analyzer.analyzer import AnalysisServer
+from Dart.lib.analyzer.batch import RequestWindow
+from Dart.lib.analyzer.queue import TaskPriority
+from Dart.lib.fixes import choose_fix
+from Dart.lib.fixes import count_kinds
+from Dart.lib.fixes import EditMerger
+from Dart.lib.fixes import error_kind
+from Dart.lib.fixes import find_fixes
+from Dart.lib.fixes import normalize_message
+from Dart.lib.path import find_pubspec_path
+from Dart.lib.path import is_view_dart_script
+from Dart.lib.source_changes import is_stamp_current
+from Dart.lib.source_edits import apply_edits
+
+
+_logger = PluginLogger(__name__)
+
+
+# Max. number of edit.getFixes requests in flight.
+MAX_IN_FLIGHT = 16
+
+
+class DartFixAllCommand(sublime_plugin.WindowCommand):
+    '''Applies a fix to every error of the same kind as the one under the
+    caret, in the current file or in the whole package.
+
+    If there's no error under the caret, the user picks a kind of error from
+    a list.
+    '''
+
+    # The batch in progress, if any.
+    window_in_flight = None
+
+    def run(self, scope='file'):
+        '''
+        @scope
+          One of: file, project.
+        '''
+        view = self.window.active_view()
+        if not (view and view.file_name() and is_view_dart_script(view)):
+            return
+
+        if not AnalysisServer.ping():
+            return
+
+        if DartFixAllCommand.window_in_flight:
+            sublime.status_message('Dart: Already fixing errors.')
+            return
+
+        if scope == 'project':
+            root = find_pubspec_path(view.file_name())
+            if not root:
+                sublime.status_message('Dart: Not in a pub package.')
+                return
+            if any(v.is_dirty() for v in self.window.views()
+                   if is_view_dart_script(v)):
+                sublime.status_message('Dart: Save all files first.')
+                return
+            self.errors = editor_context.get_errors_under(root)
+        else:
+            if view.is_dirty():
+                sublime.status_message('Dart: Save the file first.')
+                return
+            self.errors = {view.file_name():
+                           editor_context.get_file_errors(view.file_name())}
+
+        all_errors = [e for errors in self.errors.values() for e in errors]
+        if not all_errors:
+            sublime.status_message('Dart: No errors to fix.')
+            return
+
+        try:
+            caret = view.sel()[0].b
+        except IndexError:
+            caret = -1
+
+        at_caret = [e for e in editor_context.get_file_errors(view.file_name())
+                    if e.location.offset <= caret <=
+                       e.location.offset + e.location.length]
+        if at_caret:
+            self.on_kind_chosen(error_kind(at_caret[0]))
+            return
+
+        self.kinds = count_kinds(all_errors)
+        self.window.show_quick_panel(
+                [['{} ({})'.format(message, count), error_type.lower()]
+                 for ((error_type, message), count) in self.kinds],
+                lambda idx: idx != -1 and self.on_kind_chosen(
+                    self.kinds[idx][0]))
+
+    def on_kind_chosen(self, kind):
+        self.targets = [e for errors in self.errors.values() for e in errors
+                        if error_kind(e) == kind]
+        first = self.targets[0]
+
+        def on_fixes(result, error):
+            fixes = find_fixes(result.fixes, first) if result else []
+            after(0, self.on_sample_fixes, fixes)
+
+        # Ask for the fixes for one error so the user can choose.
+        analyzer.g_server.send_get_fixes(first.location.file,
+                                         first.location.offset, on_fixes)
+
+    def on_sample_fixes(self, fixes):
+        if not fixes:
+            sublime.status_message('Dart: No fixes available.')
+            return
+
+        if len(fixes) == 1:
+            self.fix_all(normalize_message(fixes[0].message))
+            return
+
+        self.window.show_quick_panel(
+                [f.message for f in fixes],
+                lambda idx: idx != -1 and self.fix_all(
+                    normalize_message(fixes[idx].message)))
+
+    def fix_all(self, fix_kind):
+        merger = EditMerger()
+        # Fixes are computed from the buffers as they are now; edits made
+        # while they're computed would shift their offsets.
+        change_counts = {}
+        for e in self.targets:
+            view = self.window.find_open_file(e.location.file)
+            if view:
+                change_counts[e.location.file] = view.change_count()
+
+        def send(error, callback):
+            analyzer.g_server.send_get_fixes(error.location.file,
+                                             error.location.offset, callback,
+                                             priority=TaskPriority.LOW)
+
+        def on_response(error, result, server_error):
+            if server_error or not result:
+                return
+            change = choose_fix(result.fixes, error, fix_kind)
+            if change:
+                merger.add(change)
+
+        def on_done():
+            DartFixAllCommand.window_in_flight = None
+            if batch.cancelled:
+                after(0, sublime.status_message, 'Dart: Cancelled fixes.')
+                return
+            after(0, self.apply, merger, change_counts)
+
+        _logger.info('fixing %d errors', len(self.targets))
+        sublime.status_message('Dart: Fixing {} errors...'.format(
+                               len(self.targets)))
+        batch = RequestWindow(self.targets, send, on_response, on_done,
+                              size=MAX_IN_FLIGHT)
+        DartFixAllCommand.window_in_flight = batch
+        batch.start()
+
+    def apply(self, merger, change_counts):
+        edits = merger.get_edits()
+        stale = 0
+        for path, file_edits in edits.items():
+            view = self.window.find_open_file(path)
+            if view:
+                if view.change_count() != change_counts.get(path):
+                    _logger.info('not fixing %s: edited meanwhile', path)
+                    stale += 1
+                    continue
+                view.run_command('dart_apply_source_edits',
+                                 {'edits': file_edits})
+                continue
+            if not self.apply_to_file(path, file_edits,
+                                      merger.stamps.get(path)):
+                stale += 1
+
+        msg = 'Dart: Applied {} fixes in {} files'.format(merger.accepted,
+                                                          len(edits))
+        if merger.rejected:
+            msg += ' ({} skipped; run again to apply them)'.format(
+                        merger.rejected)
+        if stale:
+            msg += (' ({} files not written; they changed meanwhile or could'
+                    ' not be read)'.format(stale))
+        sublime.status_message(msg)
+
+    def apply_to_file(self, path, file_edits, stamp):
+        '''Returns `False` if the file changed since the fixes were
+        computed or can't be written.
+        '''
+        try:
+            if not is_stamp_current(path, stamp):
+                _logger.info('not fixing %s: changed on disk', path)
+                return False
+            with open(path, 'rt', encoding='utf-8', newline='') as f:
+                text = f.read()
+            with open(path, 'wt', encoding='utf-8', newline='') as f:
+                f.write(apply_edits(text, file_edits))
+        except (OSError, UnicodeDecodeError) as e:
+            _logger.error('could not apply fixes to %s: %s', path, e)
+            return False
+        return True
+
+
+class DartCancelFixAllCommand(sublime_plugin.WindowCommand):
+    def run(self):
+        if DartFixAllCommand.window_in_flight:
+            DartFixAllCommand.window_in_flight.cancel()
+
+    def is_enabled(self):
+        return DartFixAllCommand.window_in_flight is not None
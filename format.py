@@ -4,14 +4,26 @@
 
 from subprocess import PIPE
 from subprocess import Popen
+import multiprocessing
+import os
+import threading
 
 import sublime
 import sublime_plugin
 
 from Dart.sublime_plugin_lib import PluginLogger
+from Dart.sublime_plugin_lib.panels import OutputPanel
 from Dart.sublime_plugin_lib.plat import supress_window
+from Dart.sublime_plugin_lib.sublime import after
 
 from Dart import analyzer
+from Dart.lib.analyzer.analyzer import AnalysisServer
+from Dart.lib.batch_format import find_dart_files
+from Dart.lib.batch_format import format_files
+from Dart.lib.batch_format import summarize
+from Dart.lib.path import find_pubspec_path
+from Dart.lib.path import is_view_dart_script
+from Dart.lib.perf import Stopwatch
 from Dart.lib.sdk import DartFormat
 
 
@@ -32,6 +44,98 @@ class DartFormatCommand(sublime_plugin.WindowCommand):
         analyzer.g_server.send_format_file(view)
 
 
+class DartFormatProjectCommand(sublime_plugin.WindowCommand):
+    '''Formats all the .dart files in the current pub package with
+    `dartfmt`, several at a time, and writes back those that changed.
+
+    Files under packages/ and build/ are skipped.
+    '''
+
+    # Whether a run is in progress.
+    running = False
+
+    def run(self, max_workers=None):
+        view = self.window.active_view()
+        if not (view and view.file_name()):
+            return
+
+        root = find_pubspec_path(view.file_name())
+        if not root:
+            sublime.status_message('Dart: Not in a pub package.')
+            return
+
+        if DartFormatProjectCommand.running:
+            sublime.status_message('Dart: Already formatting.')
+            return
+
+        # Formatted files may be open with unsaved changes.
+        for v in self.window.views():
+            if v.is_dirty() and is_view_dart_script(v):
+                sublime.status_message('Dart: Save all files first.')
+                return
+
+        DartFormatProjectCommand.running = True
+        self.panel = OutputPanel('dart.format')
+        self.panel.show()
+        self.write('Formatting {}...\n'.format(root))
+
+        workers = max_workers or min(multiprocessing.cpu_count(), 8)
+        threading.Thread(target=self.format_all, args=(root, workers)).start()
+
+    def write(self, text):
+        after(0, self.panel.write, text)
+
+    def format_all(self, root, max_workers):
+        try:
+            paths = find_dart_files(root)
+            self.write('{} files\n'.format(len(paths)))
+            dartfmt = DartFormat()
+
+            def on_result(result):
+                rel = os.path.relpath(result.path, root)
+                if result.error:
+                    self.write('Error    {}: {}\n'.format(rel, result.error))
+                elif result.changed:
+                    self.write('Formatted {} ({:.0f}ms)\n'.format(rel,
+                                                                 result.ms))
+
+            with Stopwatch() as sw:
+                results = format_files(paths, dartfmt.format_source,
+                                       on_result, max_workers=max_workers)
+            self.write('\n' + summarize(results, sw.ms) + '\n')
+        except Exception as e:
+            _logger.error('error while formatting project: %s', e)
+            self.write('Error: {}\n'.format(e))
+        finally:
+            DartFormatProjectCommand.running = False
+            # Open views will pick up the changes from disk.
+            after(0, sublime.status_message, 'Dart: Done formatting.')
+
+
+class DartFormatOnSave(sublime_plugin.EventListener):
+    '''Formats Dart files after they are saved, if enabled.
+
+    Saving never waits for the server; the formatted buffer is saved again
+    when the results arrive, unless it has changed in the meantime.
+    '''
+    def on_post_save(self, view):
+        if not is_view_dart_script(view):
+            return
+
+        if view.settings().get('dart_saving_formatted'):
+            view.settings().erase('dart_saving_formatted')
+            return
+
+        setts = sublime.load_settings('Dart - Plugin Settings.sublime-settings')
+        if not setts.get('dart_format_on_save'):
+            return
+
+        if not AnalysisServer.ping():
+            return
+
+        analyzer.g_server.send_format_file(view, on_save=True)
+
+
 class DartReplaceRegion(sublime_plugin.TextCommand):
     def run(self, edit, region, text):
         reg = sublime.Region(*region)
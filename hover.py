@@ -0,0 +1,143 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Hover information for Dart files.
+'''
+
+import re
+
+import sublime
+import sublime_plugin
+
+from Dart.sublime_plugin_lib import PluginLogger
+from Dart.sublime_plugin_lib.events import IdleIntervalEventListener
+from Dart.sublime_plugin_lib.path import is_active
+
+from Dart import analyzer
+from Dart._init_ import editor_context
+from Dart.analyzer import AnalysisServer
+from Dart.lib.analyzer.queue import TaskPriority
+from Dart.lib.notifications import show_hover_tooltip
+from Dart.lib.path import is_view_dart_script
+
+
+_logger = PluginLogger(__name__)
+
+
+_IDENTIFIER_RX = re.compile(r'[A-Za-z_$][\w$]*')
+
+# Max. number of identifiers around the caret to prefetch hovers for.
+MAX_PREFETCH = 6
+
+
+def hover_enabled():
+    setts = sublime.load_settings('Dart - Plugin Settings.sublime-settings')
+    return setts.get('dart_enable_hover_info') is not False
+
+
+def show_hover(view, offset):
+    '''Shows hover information for @offset in @view.
+
+    Uses the cache if possible; otherwise, the popup is shown once the server
+    responds.
+    '''
+    hovers = editor_context.hover_cache.lookup(view.file_name(),
+                                               view.change_count(),
+                                               offset)
+    if hovers is None:
+        if not AnalysisServer.ping():
+            return
+        if view.is_dirty():
+            analyzer.g_server.send_change_content(view)
+        analyzer.g_server.send_get_hover(view, offset, show=True,
+                                         priority=TaskPriority.HIGH)
+        return
+
+    if hovers:
+        show_hover_tooltip(hovers[0], view=view, location=offset)
+
+
+class DartShowHoverCommand(sublime_plugin.WindowCommand):
+    '''Shows hover information for the element under the caret.
+    '''
+    def run(self):
+        view = self.window.active_view()
+        if not view or not is_view_dart_script(view):
+            return
+
+        try:
+            offset = view.sel()[0].b
+        except IndexError:
+            return
+
+        show_hover(view, offset)
+
+
+class DartHoverListener(sublime_plugin.EventListener):
+    def on_hover(self, view, point, hover_zone):
+        if hover_zone != sublime.HOVER_TEXT:
+            return
+
+        if not is_view_dart_script(view) or not hover_enabled():
+            return
+
+        if view.match_selector(point, 'source.dart comment, source.dart string'):
+            return
+
+        show_hover(view, point)
+
+
+class DartIdleHoverPrefetch(IdleIntervalEventListener):
+    '''
+    After ST has been idle for an interval, requests hover information for
+    the identifiers around the caret so that hover popups can be served from
+    the cache.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(duration=800)
+
+    def check(self, view):
+        return is_view_dart_script(view) and hover_enabled()
+
+    def on_idle(self, view):
+        if not AnalysisServer.ping() or not is_active(view):
+            return
+
+        try:
+            caret = view.sel()[0].b
+        except IndexError:
+            return
+
+        path = view.file_name()
+        version = view.change_count()
+        cache = editor_context.hover_cache
+
+        offsets = [offset for offset in self.find_identifiers(view, caret)
+                   if cache.lookup(path, version, offset) is None
+                   and not cache.is_pending(path, version, offset)]
+        if not offsets:
+            return
+
+        if view.is_dirty():
+            analyzer.g_server.send_change_content(view)
+
+        _logger.debug('prefetching hovers for %d identifiers', len(offsets))
+        for offset in offsets:
+            analyzer.g_server.send_get_hover(view, offset,
+                                             priority=TaskPriority.LOW)
+
+    def find_identifiers(self, view, caret):
+        '''Returns the start offsets of the identifiers on the caret's line,
+        closest to the caret first.
+        '''
+        line = view.line(caret)
+        text = view.substr(line)
+        starts = [line.begin() + m.start()
+                  for m in _IDENTIFIER_RX.finditer(text)]
+        starts = [pt for pt in starts
+                  if not view.match_selector(pt,
+                            'source.dart comment, source.dart string')]
+        starts.sort(key=lambda pt: abs(pt - caret))
+        return starts[:MAX_PREFETCH]
@@ -0,0 +1,208 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Tracks how long the analysis server takes to finish analyzing.
+
+The server reports `server.status` notifications when analysis starts and
+stops. Each analyzing->idle interval is recorded, along with the event that
+probably caused it (startup, new roots, an edited pubspec.yaml), so that we
+can see how long it takes for analysis to settle down.
+'''
+
+from collections import deque
+from collections import OrderedDict
+from threading import Lock
+import json
+import os
+import time
+
+
+# Reason recorded for analysis nobody asked for explicitly.
+TRIGGER_EDIT = 'edit'
+TRIGGER_STARTUP = 'startup'
+TRIGGER_ROOTS = 'roots'
+TRIGGER_PUBSPEC = 'pubspec'
+
+
+class AnalysisInterval(object):
+    def __init__(self, trigger, triggered_at, started_at, ended_at=None):
+        self.trigger = trigger
+        self.triggered_at = triggered_at
+        self.started_at = started_at
+        self.ended_at = ended_at
+
+    @property
+    def analyzing_ms(self):
+        '''Time spent analyzing.
+        '''
+        return (self.ended_at - self.started_at) * 1000
+
+    @property
+    def quiescence_ms(self):
+        '''Time from the trigger until analysis was done.
+        '''
+        return (self.ended_at - self.triggered_at) * 1000
+
+
+class AnalysisStatusTracker(object):
+    '''Turns `server.status` notifications into `AnalysisInterval`s.
+    '''
+
+    def __init__(self, size=100, clock=time.time):
+        self.lock = Lock()
+        self.clock = clock
+        self.current = None
+        # Last target the server reported.
+        self.target = None
+        self.history = deque(maxlen=size)
+        # (trigger, time) for the next interval.
+        self._trigger = None
+
+    @property
+    def is_analyzing(self):
+        with self.lock:
+            return self.current is not None
+
+    def mark(self, trigger):
+        '''Records @trigger as the cause of the next analysis.
+
+        A trigger already waiting is kept, since it happened first.
+        '''
+        with self.lock:
+            if self.current is not None and self.current.trigger == TRIGGER_EDIT:
+                # The trigger arrived while analyzing something else; what
+                # we want to know is when everything settles down.
+                self.current.trigger = trigger
+                self.current.triggered_at = self.clock()
+                return
+            if self._trigger is None:
+                self._trigger = (trigger, self.clock())
+
+    def update(self, is_analyzing, target=None):
+        '''Updates the state from a `server.status` notification.
+
+        Returns the `AnalysisInterval` that just ended, if any.
+        '''
+        now = self.clock()
+        with self.lock:
+            self.target = target or None
+            if is_analyzing:
+                if self.current is None:
+                    trigger, triggered_at = self._trigger or (TRIGGER_EDIT, now)
+                    self._trigger = None
+                    self.current = AnalysisInterval(trigger, triggered_at, now)
+                return
+
+            if self.current is None:
+                return
+
+            finished = self.current
+            finished.ended_at = now
+            self.current = None
+            self.history.append(finished)
+            return finished
+
+    def get_history(self):
+        with self.lock:
+            return list(self.history)
+
+
+def parse_plugin_version(messages_json):
+    '''Returns the newest version listed in the text of messages.json, or
+    `None`.
+    '''
+    def key(version):
+        return tuple(int(n) for n in version.split('.'))
+
+    try:
+        versions = [v for v in json.loads(messages_json)
+                    if all(n.isdigit() for n in v.split('.'))]
+    except ValueError:
+        return
+    if versions:
+        return max(versions, key=key)
+
+
+def to_record(interval, plugin_version, server_version):
+    return OrderedDict([
+        ('trigger', interval.trigger),
+        ('ended', round(interval.ended_at, 3)),
+        ('quiescence_ms', round(interval.quiescence_ms)),
+        ('analyzing_ms', round(interval.analyzing_ms)),
+        ('plugin', plugin_version),
+        ('server', server_version),
+    ])
+
+
+class StatusHistory(object):
+    '''Keeps analysis timings across sessions in a JSON lines file, so that
+    they can be compared across plugin and SDK versions.
+    '''
+
+    def __init__(self, path, max_records=2000):
+        self.path = path
+        self.max_records = max_records
+        self.lock = Lock()
+
+    def append(self, record):
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'at', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def read(self):
+        '''Returns the most recent records, oldest first.
+
+        The file is trimmed if it has grown too much.
+        '''
+        with self.lock:
+            try:
+                with open(self.path, 'rt', encoding='utf-8') as f:
+                    lines = f.readlines()
+            except FileNotFoundError:
+                return []
+
+            records = []
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+
+            if len(lines) > self.max_records * 2:
+                records = records[-self.max_records:]
+                with open(self.path, 'wt', encoding='utf-8') as f:
+                    f.writelines(json.dumps(r) + '\n' for r in records)
+
+            return records[-self.max_records:]
+
+
+def median(values):
+    values = sorted(values)
+    if not values:
+        return
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2
+
+
+def summarize(records):
+    '''Returns a table comparing time-to-quiescence per trigger across
+    plugin and server versions.
+    '''
+    groups = OrderedDict()
+    for r in records:
+        key = (r.get('plugin'), r.get('server'), r.get('trigger'))
+        groups.setdefault(key, []).append(r.get('quiescence_ms', 0))
+
+    lines = ['{:<12} {:<12} {:<10} {:>5} {:>10} {:>10}'.format(
+                'plugin', 'server', 'trigger', 'n', 'median ms', 'max ms')]
+    for (plugin, server, trigger), values in sorted(groups.items(),
+                                                    key=lambda i: str(i[0])):
+        lines.append('{:<12} {:<12} {:<10} {:>5} {:>10.0f} {:>10.0f}'.format(
+                        str(plugin), str(server), trigger, len(values),
+                        median(values), max(values)))
+    return '\n'.join(lines)
@@ -13,12 +13,25 @@ import sublime
 from Dart.sublime_plugin_lib import PluginLogger
 from Dart.sublime_plugin_lib.panels import OutputPanel
 from Dart.sublime_plugin_lib.sublime import get_active_view
+from Dart.sublime_plugin_lib.sublime import after
 from Dart.sublime_plugin_lib.sublime import R
 
 from Dart.lib.analyzer.api.protocol import AnalysisErrorSeverity
 from Dart.lib.analyzer.api.protocol import AnalysisErrorType
 from Dart.lib.analyzer.api.protocol import ElementKind
 from Dart._init_ import editor_context
+from Dart.lib.analysis_status import parse_plugin_version
+from Dart.lib.analysis_status import to_record
+from Dart.lib.analysis_status import TRIGGER_EDIT
+from Dart.lib.highlights import HIGHLIGHT_GROUPS
+from Dart.lib.highlights import LARGE_FILE_REGIONS
+from Dart.lib.highlights import region_key
+from Dart.lib.highlights import split_visible
+from Dart.lib.perf import metrics
+from Dart.lib.perf import Stopwatch
+from Dart.lib.profiling import profiled
+from Dart.lib.source_edits import to_command_args
+from Dart.lib.notifications import show_hover_tooltip
 
 
 _logger = PluginLogger(__name__)
@@ -31,6 +44,7 @@ DAS_SCOPE_WARNING = 'constant.numeric'
 DAS_UI_REGIONS_INFOS = 'dart.infos'
 DAS_UI_REGIONS_WARNINGS = 'dart.warnings'
 DAS_UI_REGIONS_ERRORS = 'dart.errors'
+DAS_UI_REGIONS_OCCURRENCES = 'dart.occurrences'
 
 
 _flags = (sublime.DRAW_SQUIGGLY_UNDERLINE |
@@ -38,10 +52,193 @@ _flags = (sublime.DRAW_SQUIGGLY_UNDERLINE |
           sublime.DRAW_NO_OUTLINE)
 
 
+@metrics.timed('ui.handle_navigation_data')
+@profiled
 def handle_navigation_data(navigation_params):
     editor_context.navigation = navigation_params
 
 
+def handle_outline(outline_params):
+    added, removed, moved = editor_context.symbol_index.update(
+            outline_params.file, outline_params.outline)
+    _logger.debug('updated symbols for %s (+%d -%d ~%d)', outline_params.file,
+                  added, removed, moved)
+
+    # Keep the persistent index in sync for free while we're at it. Entries
+    # are checked against the file's mtime, so outlines for unsaved buffers
+    # must not be stored.
+    index = editor_context.declaration_indexes.find_loaded(outline_params.file)
+    if index and not has_dirty_view(outline_params.file):
+        index.update_file(outline_params.file,
+                          get_top_level_declarations(outline_params.outline))
+
+
+def has_dirty_view(path):
+    '''Returns `True` if @path is open with unsaved changes in any window.
+    '''
+    for w in sublime.windows():
+        v = w.find_open_file(path)
+        if v and v.is_dirty():
+            return True
+    return False
+
+
+def get_top_level_declarations(outline):
+    '''Returns (name, kind, offset, row, col) tuples for the top-level
+    declarations in the compilation unit @outline.
+    '''
+    decls = []
+    for child in (outline.children or []):
+        element = child.element
+        if not element.name:
+            continue
+        loc = element.location
+        if loc:
+            decls.append((element.name, element.kind, loc.offset,
+                          loc.startLine, loc.startColumn))
+        else:
+            decls.append((element.name, element.kind, child.offset, 0, 0))
+    return decls
+
+
+def handle_occurrences(occurrences_params):
+    editor_context.occurrences.update(occurrences_params.file,
+                                      occurrences_params.occurrences)
+    after(0, refresh_occurrences, occurrences_params.file)
+
+
+@metrics.timed('ui.refresh_occurrences')
+@profiled
+def refresh_occurrences(path):
+    v = get_active_view()
+    if v and v.file_name() == path:
+        show_occurrences(v)
+
+
+def show_occurrences(view):
+    '''Highlights the occurrences of the element under the caret in @view.
+    '''
+    table = editor_context.occurrences.get(view.file_name())
+    sel = view.sel()
+    if not table or len(sel) != 1 or not sel[0].empty():
+        view.erase_regions(DAS_UI_REGIONS_OCCURRENCES)
+        return
+
+    occurrences = table.lookup(sel[0].b)
+    if len(occurrences) < 2:
+        view.erase_regions(DAS_UI_REGIONS_OCCURRENCES)
+        return
+
+    view.add_regions(DAS_UI_REGIONS_OCCURRENCES,
+                     [R(offset, offset + length)
+                      for (offset, length) in occurrences],
+                     scope='comment',
+                     flags=sublime.DRAW_NO_FILL)
+
+
+def handle_highlights(highlights_params):
+    cache = editor_context.highlights
+    with Stopwatch() as sw:
+        changed, removed = cache.update(highlights_params.file,
+                                        highlights_params.regions)
+    cache.stats.process_ms.add(sw.ms)
+
+    if len(highlights_params.regions) > LARGE_FILE_REGIONS:
+        _logger.info('highlights for %s: %d regions, %d sets changed, '
+                     '%.1fms', highlights_params.file,
+                     len(highlights_params.regions),
+                     len(changed) + len(removed), sw.ms)
+
+    if cache.stats.process_ms.total % 50 == 0:
+        _logger.debug('highlights: %s', cache.stats.summary())
+
+    if changed or removed:
+        after(0, paint_highlights, highlights_params.file, changed, removed)
+
+
+# path -> {group: paint generation}
+_highlight_generations = {}
+_highlight_generation = 0
+# path -> ids of the views painted for it
+_highlighted_views = {}
+
+
+@metrics.timed('ui.paint_highlights')
+@profiled
+def paint_highlights(path, changed, removed):
+    '''Paints the changed highlight groups for @path.
+
+    Views that haven't been painted yet, like new clones, get all groups.
+    Regions in the viewport are painted first; the rest are painted once ST
+    has had a chance to redraw.
+    '''
+    views = [v for w in sublime.windows() for v in w.views()
+             if v.file_name() == path]
+    if not views:
+        # Make sure everything is painted if the file is opened later.
+        editor_context.highlights.remove(path)
+        _highlight_generations.pop(path, None)
+        _highlighted_views.pop(path, None)
+        return
+
+    painted = _highlighted_views.get(path, set())
+    current = None
+    if any(v.id() not in painted for v in views):
+        current = editor_context.highlights.get(path)
+    _highlighted_views[path] = {v.id() for v in views}
+
+    global _highlight_generation
+    _highlight_generation += 1
+    generation = _highlight_generation
+    generations = _highlight_generations.setdefault(path, {})
+    for group in set(changed) | set(removed) | set(current or ()):
+        generations[group] = generation
+
+    pending = {}
+    with Stopwatch() as sw:
+        for v in views:
+            groups = changed
+            if v.id() not in painted:
+                groups = current
+
+            for group in removed:
+                v.erase_regions(region_key(group))
+
+            visible_region = v.visible_region()
+            for group, spans in groups.items():
+                visible, partial = split_visible(spans, visible_region.begin(),
+                                                 visible_region.end())
+                add_highlight_regions(v, group, visible)
+                if partial:
+                    pending.setdefault(v.id(), (v, {}))[1][group] = spans
+    editor_context.highlights.stats.paint_ms.add(sw.ms)
+
+    if pending:
+        after(10, paint_highlights_rest, path, generation,
+              list(pending.values()))
+
+
+@metrics.timed('ui.paint_highlights_rest')
+@profiled
+def paint_highlights_rest(path, generation, pending):
+    generations = _highlight_generations.get(path, {})
+    with Stopwatch() as sw:
+        for v, groups in pending:
+            if not v.is_valid():
+                continue
+            for group, spans in groups.items():
+                # Skip groups painted again since.
+                if generations.get(group) == generation:
+                    add_highlight_regions(v, group, spans)
+    editor_context.highlights.stats.paint_ms.add(sw.ms)
+
+
+def add_highlight_regions(view, group, spans):
+    view.add_regions(region_key(group), [R(a, b) for (a, b) in spans],
+                     scope=HIGHLIGHT_GROUPS[group][0],
+                     flags=sublime.DRAW_NO_OUTLINE)
+
+
 class ShowErrorsImpl(object):
 
     def compare_paths(self, path1, path2):
@@ -84,6 +281,8 @@ class ShowErrorsImpl(object):
                 "{loc.startLine}|{loc.startColumn}|{error.message}").format(
                                                 error=error, loc=error.location)
 
+    @metrics.timed('ui.show_errors')
+    @profiled
     def __call__(self, errors):
         '''Show errors in the ui.
 
@@ -152,6 +351,8 @@ class ShowErrorsImpl(object):
 show_errors = ShowErrorsImpl()
 
 
+@metrics.timed('ui.clear_ui')
+@profiled
 def clear_ui():
     '''Remove UI decoration.
     '''
@@ -170,6 +371,8 @@ class HandleCompletionsImpl(object):
         self._CONSTRUCTOR = '\u00A9 {}'
         self._OTHER = '· {}'
 
+    @metrics.timed('ui.handle_completions')
+    @profiled
     def __call__(self, results):
         with editor_context.autocomplete_context as actx:
 
@@ -242,17 +445,117 @@ handle_completions = HandleCompletionsImpl()
 #         v.run_command('auto_complete')
 
 
-def handle_formatting(result):
+@metrics.timed('ui.handle_hover')
+@profiled
+def handle_hover(request_id, result):
+    request = editor_context.hover_cache.complete(request_id, result.hovers)
+    if not (request and request.show and result.hovers):
+        return
+
     v = get_active_view()
+    if not v or v.file_name() != request.path:
+        return
 
-    v.sel().clear()
+    if v.change_count() != request.version:
+        return
 
-    for edit in result.edits:
-        v.run_command('dart_replace_region', {
-            'region': [edit.offset, edit.length],
-            'text': edit.replacement
-            })
+    show_hover_tooltip(result.hovers[0], view=v, location=request.offset)
 
-    r = sublime.Region(result.selectionOffset,
-            result.selectionOffset + result.selectionLength)
-    v.sel().add(r)
+
+def find_view_by_id(view_id):
+    for w in sublime.windows():
+        for v in w.views():
+            if v.id() == view_id:
+                return v
+
+
+@metrics.timed('ui.handle_formatting')
+@profiled
+def handle_formatting(request_id, result):
+    requests = editor_context.format_requests
+    request = requests.complete(request_id)
+    if request is None:
+        _logger.debug('dropping superseded formatting result')
+        return
+
+    v = find_view_by_id(request.view_id)
+    if not v or v.change_count() != request.version:
+        _logger.debug('dropping stale formatting result')
+        return
+
+    if request.on_save:
+        setts = sublime.load_settings('Dart - Plugin Settings.sublime-settings')
+        budget = setts.get('dart_format_on_save_timeout', 1000)
+        if request.elapsed_ms > budget:
+            _logger.info('formatting took longer than %dms; skipping', budget)
+            return
+
+    if requests.latency.total % 20 == 0:
+        _logger.debug('formatting latency: %s', requests.latency.summary())
+
+    v.run_command('dart_apply_source_edits', {
+        'edits': to_command_args(result.edits),
+        'selection': [result.selectionOffset,
+                      result.selectionOffset + result.selectionLength]
+        })
+
+    if request.on_save and v.change_count() != request.version:
+        # Save the formatted buffer without formatting it again.
+        v.settings().set('dart_saving_formatted', True)
+        v.run_command('save')
+
+
+DAS_STATUS_ANALYZING = 'dart.analyzing'
+
+# Read lazily from messages.json.
+_plugin_version = None
+
+
+def get_plugin_version():
+    global _plugin_version
+    if _plugin_version is None:
+        try:
+            text = sublime.load_resource('Packages/Dart/messages.json')
+        except IOError:
+            text = ''
+        _plugin_version = parse_plugin_version(text) or 'unknown'
+    return _plugin_version
+
+
+def handle_analysis_status(server, status):
+    '''Records analyzing->idle transitions reported by `server.status`.
+
+    Runs in the response handling thread.
+    '''
+    finished = server.status.update(status.isAnalyzing, status.analysisTarget)
+    after(0, show_analysis_status, status.isAnalyzing)
+    if not finished:
+        return
+
+    if finished.trigger == TRIGGER_EDIT:
+        _logger.debug('analysis done in %.0fms', finished.analyzing_ms)
+        return
+
+    # Only save intervals with a known cause; edits are too frequent and
+    # too varied to compare.
+    _logger.info('analysis settled %.0fms after %s (%.0fms analyzing)',
+                 finished.quiescence_ms, finished.trigger,
+                 finished.analyzing_ms)
+    try:
+        editor_context.status_history.append(
+                to_record(finished, get_plugin_version(), server.version))
+    except OSError as e:
+        _logger.error('could not save analysis history: %s', e)
+
+
+@metrics.timed('ui.show_analysis_status')
+@profiled
+def show_analysis_status(is_analyzing):
+    # Every window, so that the status isn't left behind in windows that
+    # weren't active when analysis finished.
+    views = [v for w in sublime.windows() for v in w.views()]
+    for v in views:
+        if is_analyzing:
+            v.set_status(DAS_STATUS_ANALYZING, 'Dart: Analyzing...')
+        else:
+            v.erase_status(DAS_STATUS_ANALYZING)
@@ -29,7 +29,12 @@ from Dart.lib.analyzer.api.base import Notification
 from Dart.lib.analyzer.api.base import Response
 from Dart.lib.analyzer.api.protocol import AddContentOverlay
 from Dart.lib.analyzer.api.protocol import AnalysisErrorsParams
+from Dart.lib.analyzer.api.protocol import AnalysisGetHoverParams
+from Dart.lib.analyzer.api.protocol import AnalysisHighlightsParams
+from Dart.lib.analyzer.api.protocol import AnalysisGetHoverResult
 from Dart.lib.analyzer.api.protocol import AnalysisNavigationParams
+from Dart.lib.analyzer.api.protocol import AnalysisOccurrencesParams
+from Dart.lib.analyzer.api.protocol import AnalysisOutlineParams
 from Dart.lib.analyzer.api.protocol import AnalysisService
 from Dart.lib.analyzer.api.protocol import AnalysisSetAnalysisRootsParams
 from Dart.lib.analyzer.api.protocol import AnalysisSetAnalysisRootsResult
@@ -38,28 +43,61 @@ from Dart.lib.analyzer.api.protocol import AnalysisSetPriorityFilesResult
 from Dart.lib.analyzer.api.protocol import AnalysisSetSubscriptionsParams
 from Dart.lib.analyzer.api.protocol import AnalysisUpdateContentParams
 from Dart.lib.analyzer.api.protocol import AnalysisUpdateContentResult
+from Dart.lib.analyzer.api.protocol import ChangeContentOverlay
 from Dart.lib.analyzer.api.protocol import CompletionGetSuggestionsParams
 from Dart.lib.analyzer.api.protocol import CompletionGetSuggestionsResult
 from Dart.lib.analyzer.api.protocol import CompletionResultsParams
 from Dart.lib.analyzer.api.protocol import EditFormatParams
 from Dart.lib.analyzer.api.protocol import EditFormatResult
+from Dart.lib.analyzer.api.protocol import EditGetFixesParams
+from Dart.lib.analyzer.api.protocol import EditGetFixesResult
+from Dart.lib.analyzer.api.protocol import EditGetRefactoringParams
+from Dart.lib.analyzer.api.protocol import EditGetRefactoringResult
+from Dart.lib.analyzer.api.protocol import EditOrganizeDirectivesParams
+from Dart.lib.analyzer.api.protocol import EditOrganizeDirectivesResult
+from Dart.lib.analyzer.api.protocol import EditSortMembersParams
+from Dart.lib.analyzer.api.protocol import EditSortMembersResult
+from Dart.lib.analyzer.api.protocol import ExecutionCreateContextParams
+from Dart.lib.analyzer.api.protocol import ExecutionCreateContextResult
+from Dart.lib.analyzer.api.protocol import ExecutionMapUriParams
+from Dart.lib.analyzer.api.protocol import ExecutionMapUriResult
 from Dart.lib.analyzer.api.protocol import RemoveContentOverlay
+from Dart.lib.analyzer.api.protocol import SearchFindElementReferencesParams
+from Dart.lib.analyzer.api.protocol import SearchFindElementReferencesResult
+from Dart.lib.analyzer.api.protocol import SearchFindTopLevelDeclarationsParams
+from Dart.lib.analyzer.api.protocol import SearchFindTopLevelDeclarationsResult
+from Dart.lib.analyzer.api.protocol import SearchResultsParams
 from Dart.lib.analyzer.api.protocol import ServerGetVersionParams
 from Dart.lib.analyzer.api.protocol import ServerGetVersionResult
+from Dart.lib.analyzer.api.protocol import ServerService
+from Dart.lib.analyzer.api.protocol import ServerSetSubscriptionsParams
+from Dart.lib.analyzer.api.protocol import ServerStatusParams
 from Dart.lib.analyzer.api.protocol import ServerSetSubscriptionsResult
+from Dart.lib.analyzer.api.protocol import SourceEdit
+from Dart.lib.analyzer.callbacks import RequestCallbacks
 from Dart.lib.analyzer.pipe_server import PipeServer
+from Dart.lib.analyzer.overlays import OverlayTracker
 from Dart.lib.analyzer.queue import AnalyzerQueue
 from Dart.lib.analyzer.queue import RequestsQueue
 from Dart.lib.analyzer.queue import TaskPriority
 from Dart.lib.analyzer.request_manager import RequestIdManager
 from Dart.lib.analyzer.response import ResponseMaker
+from Dart.lib.analyzer.searches import SearchRegistry
+from Dart.lib.analysis_status import AnalysisStatusTracker
+from Dart.lib.analysis_status import TRIGGER_ROOTS
+from Dart.lib.analysis_status import TRIGGER_STARTUP
 from Dart.lib.dart_project import DartProject
 from Dart.lib.editor_context import EditorContext
 from Dart.lib.error import ConfigError
+from Dart.lib.formatting import FormatRequest
+from Dart.lib.hover import HoverRequest
 from Dart.lib.path import find_pubspec_path
 from Dart.lib.path import is_path_under
 from Dart.lib.path import is_view_dart_script
 from Dart.lib.path import only_for_dart_files
+from Dart.lib.perf import metrics
+from Dart.lib.profiling import session as profiling_session
+from Dart.lib.trace import trace
 from Dart.lib.sdk import SDK
 
 
@@ -70,6 +108,12 @@ START_DELAY = 50
 _SIGNAL_STOP = '__SIGNAL_STOP'
 
 
+# Overlay updates build on each other, so they must reach the server in the
+# order they're sent. They all get the same priority, not bumped for the
+# active view, so the queue keeps them in order.
+CONTENT_PRIORITY = TaskPriority.HIGHER
+
+
 class AnalysisServer(object):
     MAX_ID = 9999999
 
@@ -87,6 +131,15 @@ class AnalysisServer(object):
         self.requests = RequestsQueue('requests')
         self.responses = AnalyzerQueue('responses')
         self.request_ids = RequestIdManager()
+        self.overlays = OverlayTracker()
+        self.searches = SearchRegistry()
+        self.callbacks = RequestCallbacks()
+        self.status = AnalysisStatusTracker()
+        # Reported by the server once it's running.
+        self.version = None
+        # package root -> execution context id
+        self.execution_contexts = {}
+        self._execution_contexts_lock = threading.Lock()
 
     @property
     def stdout(self):
@@ -156,11 +209,14 @@ class AnalysisServer(object):
             _logger.info('AnalysisServer is already running')
             return
 
+        self.status.mark(TRIGGER_STARTUP)
         self.send_get_version()
+        self.send_set_server_subscriptions()
 
         sdk = SDK()
 
         _logger.info('starting AnalysisServer')
+        metrics.incr('server.starts')
 
         AnalysisServer.server = PipeServer([sdk.path_to_dart,
                 sdk.path_to_analysis_snapshot,
@@ -196,9 +252,11 @@ class AnalysisServer(object):
 
     def write(self, data):
         with AnalysisServer._write_lock:
-            data = (json.dumps(data) + '\n').encode('utf-8')
-            _logger.debug('writing to stdin: %s', data)
-            self.stdin.write(data)
+            encoded = (json.dumps(data) + '\n').encode('utf-8')
+            trace.sent(data, len(encoded))
+            # Let the logger format the message only if it's enabled.
+            _logger.debug('writing to stdin: %r', encoded)
+            self.stdin.write(encoded)
             self.stdin.flush()
 
     def send_set_roots(self, view, included=[], excluded=[]):
@@ -207,6 +265,7 @@ class AnalysisServer(object):
         if not (included or excluded):
             return
 
+        self.status.mark(TRIGGER_ROOTS)
         req = AnalysisSetAnalysisRootsParams(included, excluded)
         _logger.info('sending set_roots request')
         self.requests.put(req.to_request(self.get_request_id(view,
@@ -219,29 +278,65 @@ class AnalysisServer(object):
         _logger.info('sending get version request')
         self.requests.put(req, block=False)
 
+    def send_set_server_subscriptions(self):
+        '''Subscribes to `server.status` so we know when analysis is done.
+        '''
+        req = ServerSetSubscriptionsParams([ServerService.STATUS]).to_request(
+                self.get_request_id(None, ServerSetSubscriptionsResult))
+        _logger.info('sending server subscriptions request')
+        self.requests.put(req, block=False)
+
     def send_add_content(self, view):
         if self.should_ignore_file(view.file_name()):
             return
 
         content = view.substr(sublime.Region(0, view.size()))
+        self.overlays.set(view.file_name(), content)
         req = AnalysisUpdateContentParams({view.file_name(): AddContentOverlay(content)})
         _logger.info('sending update content request - add')
+        editor_context.hover_cache.clear()
         # track this type of req as it may expire
         # TODO: when this file is saved, we must remove the overlays.
         self.requests.put(req.to_request(self.get_request_id(view, AnalysisUpdateContentResult)),
-                          view=view,
-                          priority=TaskPriority.HIGH,
+                          priority=CONTENT_PRIORITY,
                           block=False)
 
     def send_remove_content(self, view):
         if self.should_ignore_file(view.file_name()):
             return
 
+        self.overlays.remove(view.file_name())
         req = AnalysisUpdateContentParams({view.file_name(): RemoveContentOverlay()})
         _logger.info('sending update content request - delete')
+        editor_context.hover_cache.clear()
         self.requests.put(req.to_request(self.get_request_id(view, AnalysisUpdateContentResult)),
-                view=view,
-                priority=TaskPriority.HIGH,
+                priority=CONTENT_PRIORITY,
+                block=False)
+
+    def send_change_content(self, view):
+        '''Sends only the changes made to @view since its last overlay.
+
+        Falls back to sending the whole buffer if the server doesn't have an
+        overlay for @view yet.
+        '''
+        if self.should_ignore_file(view.file_name()):
+            return
+
+        if view.file_name() not in self.overlays:
+            self.send_add_content(view)
+            return
+
+        content = view.substr(sublime.Region(0, view.size()))
+        edit = self.overlays.update(view.file_name(), content)
+        if edit is None:
+            return
+
+        overlay = ChangeContentOverlay([SourceEdit(*edit)])
+        req = AnalysisUpdateContentParams({view.file_name(): overlay})
+        _logger.info('sending update content request - change')
+        editor_context.hover_cache.clear()
+        self.requests.put(req.to_request(self.get_request_id(view, AnalysisUpdateContentResult)),
+                priority=CONTENT_PRIORITY,
                 block=False)
 
     def send_set_priority_files(self, view, files):
@@ -252,16 +347,37 @@ class AnalysisServer(object):
         if not definite_files:
             return
 
+        self.priority_files = list(files)
+        # We won't hear about other files anymore.
+        editor_context.occurrences.retain(definite_files)
+
         req = AnalysisSetPriorityFilesParams(definite_files)
         self.requests.put(req.to_request(self.get_request_id(view, AnalysisSetPriorityFilesResult)),
                 priority=TaskPriority.HIGH, block=False)
 
-        req2 = AnalysisSetSubscriptionsParams({AnalysisService.NAVIGATION: definite_files})
+        req2 = AnalysisSetSubscriptionsParams(self.get_subscriptions(definite_files))
         self.requests.put(req2.to_request(self.get_request_id(view,
                 ServerSetSubscriptionsResult)),
                 priority=TaskPriority.HIGH,
                 block=False)
 
+    def get_subscriptions(self, files):
+        '''Returns the analysis services to subscribe to for the priority
+        @files.
+        '''
+        subscriptions = {
+            AnalysisService.NAVIGATION: files,
+            AnalysisService.OUTLINE: files,
+        }
+
+        setts = sublime.load_settings('Dart - Plugin Settings.sublime-settings')
+        if setts.get('dart_semantic_highlighting'):
+            subscriptions[AnalysisService.HIGHLIGHTS] = files
+        if setts.get('dart_highlight_occurrences') is not False:
+            subscriptions[AnalysisService.OCCURRENCES] = files
+
+        return subscriptions
+
     def send_get_suggestions(self, view, file, offset):
         new_id = self.get_request_id(view, CompletionGetSuggestionsResult)
 
@@ -274,13 +390,228 @@ class AnalysisServer(object):
 
         self.requests.put(req, priority=TaskPriority.HIGH, block=False)
 
-    def send_format_file(self, view):
-        new_id = self.get_request_id(view, EditFormatResult)
+    def send_prefetch_suggestions(self, view, file, offset, anchor, receiver):
+        '''Requests completions ahead of time.
+
+        The results are stored in the autocomplete context and used when the
+        completions popup is about to open.
+
+        @anchor
+          Offset where the identifier being completed starts.
+
+        @receiver
+          Text between the start of the line and @anchor.
+        '''
+        new_id = self.get_request_id(view, CompletionGetSuggestionsResult)
+
+        with editor_context.autocomplete_context as actx:
+            actx.start_prefetch(view.id(), anchor, receiver, new_id)
+
+        req = CompletionGetSuggestionsParams(file, offset)
+        req = req.to_request(new_id)
+
+        self.requests.put(req, priority=TaskPriority.HIGH, block=False)
+
+    def send_get_hover(self, view, offset, show=False,
+                       priority=TaskPriority.DEFAULT):
+        '''Requests hover information for @offset in @view.
+
+        @show
+          If `True`, a popup is shown when the response arrives.
+        '''
+        if self.should_ignore_file(view.file_name()):
+            return
+
+        new_id = self.get_request_id(view, AnalysisGetHoverResult)
+        editor_context.hover_cache.add_request(new_id,
+                HoverRequest(view.file_name(), view.change_count(), offset,
+                             show))
+
+        req = AnalysisGetHoverParams(view.file_name(), offset)
+        req = req.to_request(new_id)
+
+        self.requests.put(req, priority=priority, block=False)
+
+    def send_find_top_level_decls(self, view, pattern, handler,
+                                  priority=TaskPriority.DEFAULT):
+        '''Searches for top-level declarations matching the regex @pattern.
+
+        @handler
+          A `SearchHandler` receiving the results.
+        '''
+        new_id = self.get_request_id(view, SearchFindTopLevelDeclarationsResult)
+        self.searches.add_request(new_id, handler)
+
+        req = SearchFindTopLevelDeclarationsParams(pattern)
+        req = req.to_request(new_id)
+
+        self.requests.put(req, priority=priority, block=False)
+
+    def send_find_element_refs(self, view, offset, handler,
+                               include_potential=False):
+        '''Searches for references to the element at @offset in @view.
+
+        @handler
+          A `SearchHandler` receiving the results. The response is accepted
+          whichever view is active when it arrives; the results go to the
+          handler, not to @view.
+        '''
+        new_id = self.get_request_id(None, SearchFindElementReferencesResult)
+        self.searches.add_request(new_id, handler)
+
+        req = SearchFindElementReferencesParams(view.file_name(), offset,
+                                                include_potential)
+        req = req.to_request(new_id)
+
+        self.requests.put(req, priority=TaskPriority.HIGH, block=False)
+
+    def send_get_fixes(self, file, offset, callback,
+                       priority=TaskPriority.DEFAULT):
+        '''Requests the fixes for the errors at @offset in @file.
+
+        The response is accepted whichever view is active when it arrives.
+
+        @callback
+          Called from the response handling thread with an
+          `EditGetFixesResult` and an error; see `RequestCallbacks`.
+        '''
+        new_id = self.get_request_id(None, EditGetFixesResult)
+        self.callbacks.add(new_id, callback)
+
+        req = EditGetFixesParams(file, offset)
+        req = req.to_request(new_id)
+
+        self.requests.put(req, priority=priority, block=False)
+
+    def send_get_refactoring(self, kind, file, offset, length, options,
+                             callback, validate_only=False):
+        '''Requests the changes for a refactoring.
+
+        @options
+          A `RefactoringOptions` for @kind, or `None`.
+
+        @callback
+          Called from the response handling thread with an
+          `EditGetRefactoringResult` and an error; see `RequestCallbacks`.
+        '''
+        new_id = self.get_request_id(None, EditGetRefactoringResult)
+        self.callbacks.add(new_id, callback)
+
+        req = EditGetRefactoringParams(kind, file, offset, length,
+                                       validate_only, options=options)
+        req = req.to_request(new_id)
+
+        self.requests.put(req, priority=TaskPriority.HIGH, block=False)
+
+    def send_organize_directives(self, file, callback,
+                                 priority=TaskPriority.DEFAULT):
+        '''Requests the edit that sorts the directives in @file and removes
+        unused imports.
+
+        @callback
+          Called from the response handling thread with an
+          `EditOrganizeDirectivesResult` and an error; see `RequestCallbacks`.
+        '''
+        new_id = self.get_request_id(None, EditOrganizeDirectivesResult)
+        self.callbacks.add(new_id, callback)
+
+        req = EditOrganizeDirectivesParams(file)
+        req = req.to_request(new_id)
+
+        self.requests.put(req, priority=priority, block=False)
+
+    def send_sort_members(self, file, callback,
+                          priority=TaskPriority.DEFAULT):
+        '''Requests the edit that sorts the members in @file.
+
+        @callback
+          Called from the response handling thread with an
+          `EditSortMembersResult` and an error; see `RequestCallbacks`.
+        '''
+        new_id = self.get_request_id(None, EditSortMembersResult)
+        self.callbacks.add(new_id, callback)
+
+        req = EditSortMembersParams(file)
+        req = req.to_request(new_id)
+
+        self.requests.put(req, priority=priority, block=False)
+
+    def send_map_uri(self, root, uri, callback,
+                     priority=TaskPriority.LOW):
+        '''Has the server map @uri to a path as seen from the package at
+        @root, creating an execution context for @root the first time.
+
+        @callback
+          Called from the response handling thread with the path, or `None`
+          if it couldn't be mapped.
+        '''
+        def on_mapped(result, error):
+            if error:
+                _logger.debug('cannot map %s: %s', uri, error.get('message'))
+            callback(result.file if result else None)
+
+        def send(context_id):
+            new_id = self.get_request_id(None, ExecutionMapUriResult)
+            self.callbacks.add(new_id, on_mapped)
+            req = ExecutionMapUriParams(context_id, uri=uri).to_request(new_id)
+            self.requests.put(req, priority=priority, block=False)
+
+        def on_created(result, error):
+            if error:
+                _logger.debug('cannot create execution context for %s: %s',
+                              root, error.get('message'))
+                callback(None)
+                return
+            with self._execution_contexts_lock:
+                self.execution_contexts[root] = result.id
+            send(result.id)
+
+        with self._execution_contexts_lock:
+            context_id = self.execution_contexts.get(root)
+        if context_id is not None:
+            send(context_id)
+            return
+
+        new_id = self.get_request_id(None, ExecutionCreateContextResult)
+        self.callbacks.add(new_id, on_created)
+        req = ExecutionCreateContextParams(root).to_request(new_id)
+        self.requests.put(req, priority=priority, block=False)
+
+    def send_format_file(self, view, on_save=False):
+        '''Requests formatting edits for @view.
+
+        Edits are only applied if the buffer hasn't changed by the time they
+        arrive.
 
+        @on_save
+          Whether the file is being formatted because it was saved.
+        '''
         if not view.file_name():
             _logger.info("aborting sending request for formatting - no file name")
             return
 
+        # Make sure the server formats what's in the buffer.
+        if view.is_dirty():
+            self.send_change_content(view)
+        elif view.file_name() in self.overlays:
+            self.send_remove_content(view)
+
+        # The response is checked against the view's id and change count
+        # when it arrives, whichever view is active then.
+        new_id = self.get_request_id(None, EditFormatResult)
+        editor_context.format_requests.add(
+                FormatRequest(new_id, view.id(), view.change_count(), on_save))
+
+        def on_response(result, error):
+            if error:
+                # Don't leave the request in flight.
+                editor_context.format_requests.complete(new_id)
+                return
+            after(0, actions.handle_formatting, new_id,
+                  EditFormatResult.from_json(result.to_json().copy()))
+
+        self.callbacks.add(new_id, on_response)
+
         r0 = None
         try:
             r0 = view.sel()[0]
@@ -314,12 +645,20 @@ class ResponseHandler(threading.Thread):
         self.name = 'ResponseHandler-thread'
 
     def run(self):
+        metrics.set_thread_alive(self.name, True)
+        try:
+            self.handle_responses()
+        finally:
+            metrics.set_thread_alive(self.name, False)
+
+    def handle_responses(self):
         _logger.info('starting ResponseHandler')
 
         response_maker = ResponseMaker(self.server)
 
         try:
             for resp in response_maker.make():
+                profiling_session.checkpoint()
 
                 if resp is None:
                     continue
@@ -329,53 +668,117 @@ class ResponseHandler(threading.Thread):
                         _logger.info('ResponseHandler exiting by internal request.')
                         return
 
-                if isinstance(resp, Notification):
-                    if isinstance(resp.params, AnalysisErrorsParams):
-                        # Make sure the right type is passed to the async
-                        # code. `resp` may point to a different object when
-                        # the async code finally has a chance to run.
-                        after(0, actions.show_errors,
-                              AnalysisErrorsParams.from_json(resp.params.to_json().copy())
-                              )
-                        continue
-
-                    if isinstance(resp.params, AnalysisNavigationParams):
-                        after(0, actions.handle_navigation_data,
-                              AnalysisNavigationParams.from_json(resp.params.to_json().copy())
-                              )
-                        continue
-
-                    if isinstance(resp.params, CompletionResultsParams):
-                        with editor_context.autocomplete_context as actx:
-                            if actx.request_id or (resp.params.id != actx.id):
-                                actx.invalidate_results()
-                                continue
-                        after(0, actions.handle_completions,
-                              CompletionResultsParams.from_json(resp.params.to_json().copy())
-                              )
-
-                if isinstance(resp, Response):
-                    if isinstance(resp.result, ServerGetVersionResult):
-                        print('Dart: Running analysis server version', resp.result.version)
-                        continue
-
-                    if isinstance(resp.result, CompletionGetSuggestionsResult):
-                        with editor_context.autocomplete_context as actx:
-                            if resp.id != actx.request_id:
-                                continue
-
-                            actx.id = resp.result.id
-                            actx.request_id = None
-
-                    if isinstance(resp.result, EditFormatResult):
-                        after(0, actions.handle_formatting, EditFormatResult.from_json(resp.result.to_json().copy()))
-                        continue
+                try:
+                    self.handle_response(resp)
+                except Exception as e:
+                    # Keep handling responses; one bad message or callback
+                    # mustn't stop them for the rest of the session.
+                    _logger.error('error handling response: %r', e)
 
         except Exception as e:
             msg = 'error in thread' + self.name + '\n'
             msg += str(e)
             _logger.error(msg)
 
+    def handle_response(self, resp):
+        '''Routes a notification or response from the server.
+        '''
+        if isinstance(resp, Notification):
+            if isinstance(resp.params, AnalysisErrorsParams):
+                editor_context.set_file_errors(resp.params.file,
+                                               resp.params.errors)
+                # Make sure the right type is passed to the async
+                # code. `resp` may point to a different object when
+                # the async code finally has a chance to run.
+                after(0, actions.show_errors,
+                      AnalysisErrorsParams.from_json(resp.params.to_json().copy())
+                      )
+                return
+
+            if isinstance(resp.params, AnalysisNavigationParams):
+                after(0, actions.handle_navigation_data,
+                      AnalysisNavigationParams.from_json(resp.params.to_json().copy())
+                      )
+                return
+
+            if isinstance(resp.params, AnalysisOutlineParams):
+                # Indexing is pure data crunching; keep it off the
+                # UI thread.
+                actions.handle_outline(resp.params)
+                return
+
+            if isinstance(resp.params, AnalysisOccurrencesParams):
+                actions.handle_occurrences(resp.params)
+                return
+
+            if isinstance(resp.params, AnalysisHighlightsParams):
+                # Grouping and diffing regions is done here; only
+                # painting happens on the UI thread.
+                actions.handle_highlights(resp.params)
+                return
+
+            if isinstance(resp.params, SearchResultsParams):
+                self.server.searches.dispatch(resp.params)
+                return
+
+            if isinstance(resp.params, ServerStatusParams):
+                if resp.params.analysis:
+                    actions.handle_analysis_status(self.server,
+                                                   resp.params.analysis)
+                return
+
+            if isinstance(resp.params, CompletionResultsParams):
+                with editor_context.autocomplete_context as actx:
+                    if actx.is_prefetch_id(resp.params.id):
+                        actx.prefetch.results = resp.params
+                        return
+
+                    if actx.request_id or (resp.params.id != actx.id):
+                        actx.invalidate_results()
+                        return
+                after(0, actions.handle_completions,
+                      CompletionResultsParams.from_json(resp.params.to_json().copy())
+                      )
+
+        if isinstance(resp, Response):
+            callback = self.server.callbacks.pop(resp.id)
+            if callback:
+                callback(resp.result, None)
+                return
+
+            if isinstance(resp.result, ServerGetVersionResult):
+                print('Dart: Running analysis server version', resp.result.version)
+                self.server.version = resp.result.version
+                return
+
+            if isinstance(resp.result, CompletionGetSuggestionsResult):
+                with editor_context.autocomplete_context as actx:
+                    if actx.is_prefetch_request(resp.id):
+                        actx.prefetch.id = resp.result.id
+                        return
+
+                    if resp.id != actx.request_id:
+                        return
+
+                    actx.id = resp.result.id
+                    actx.request_id = None
+
+            if isinstance(resp.result, SearchFindTopLevelDeclarationsResult):
+                self.server.searches.start(resp.id, resp.result.id)
+                return
+
+            if isinstance(resp.result, SearchFindElementReferencesResult):
+                handler = self.server.searches.start(resp.id, resp.result.id)
+                if handler:
+                    handler.on_start(resp.result.element)
+                return
+
+            if isinstance(resp.result, AnalysisGetHoverResult):
+                after(0, actions.handle_hover, resp.id,
+                      AnalysisGetHoverResult.from_json(resp.result.to_json().copy())
+                      )
+                return
+
 
 class RequestHandler(threading.Thread):
     """ Watches the requests queue and forwards them to the pipe server.
@@ -386,9 +789,17 @@ class RequestHandler(threading.Thread):
         self.name = 'RequestHandler-thread'
 
     def run(self):
+        metrics.set_thread_alive(self.name, True)
+        try:
+            self.handle_requests()
+        finally:
+            metrics.set_thread_alive(self.name, False)
+
+    def handle_requests(self):
         _logger.info('starting RequestHandler')
 
         while True:
+            profiling_session.checkpoint()
             try:
                 item = self.server.requests.get(timeout=0.1)
 
@@ -397,6 +808,10 @@ class RequestHandler(threading.Thread):
                         'RequestHandler is exiting by internal request')
                     return
 
+                # Before writing: the response may be handled before write()
+                # returns.
+                if 'id' in item:
+                    metrics.start_request(item['id'], item.get('method', 'unknown'))
                 self.server.write(item)
             except queue.Empty:
                 pass
@@ -414,18 +829,27 @@ class StdoutWatcher(threading.Thread):
         self.name = 'StdoutWatcher-thread'
 
     def start(self):
+        metrics.set_thread_alive(self.name, True)
+        try:
+            self.watch()
+        finally:
+            metrics.set_thread_alive(self.name, False)
+
+    def watch(self):
         _logger.info("starting StdoutWatcher")
 
         while True:
+            profiling_session.checkpoint()
             try:
-                data = self.server.stdout.readline().decode('utf-8')
+                raw = self.server.stdout.readline()
+                data = raw.decode('utf-8')
             except Exception as e:
                 msg = 'error in thread' + self.name + '\n'
                 msg += str(e)
                 _logger.error(msg)
                 continue
 
-            _logger.debug('data read from server: %s', repr(data))
+            _logger.debug('data read from server: %r', data)
 
             if not data:
                 if self.server.stdin.closed:
@@ -437,6 +861,9 @@ class StdoutWatcher(threading.Thread):
                 return
 
             decoded = json.loads(data)
+            trace.received(decoded, len(raw))
+            if 'event' in decoded:
+                metrics.mark(decoded['event'])
             # TODO(guillermooo): Some notifications need to have a HIGHEST
             # prio. For example, if we're getting a new search id.
             self.server.responses.put(decoded, view=decoded.get('file'),
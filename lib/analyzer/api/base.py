@@ -3,7 +3,26 @@ class RefactoringOptions(object):
 
 
 class RefactoringFeedback(object):
-    pass
+    '''Feedback for any kind of refactoring.
+
+    The type of feedback depends on the kind of refactoring requested, which
+    isn't known when parsing responses, so the raw data is kept as is.
+    '''
+    def __init__(self, data=None):
+        self.data = data or {}
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['data'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(dict(data))
+
+    def to_json(self):
+        return dict(self.data)
 
 
 class Request(object):
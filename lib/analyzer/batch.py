@@ -0,0 +1,148 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Sends many requests to the analysis server without flooding it.
+'''
+
+from threading import Lock
+from threading import Timer
+import itertools
+import time
+
+
+# Error passed to `on_response` for requests that took too long.
+TIMED_OUT = {'code': 'TIMED_OUT', 'message': 'no response from the server'}
+
+
+def _start_timer(seconds, fn):
+    t = Timer(seconds, fn)
+    t.daemon = True
+    t.start()
+    return t
+
+
+class RequestWindow(object):
+    '''Sends one request per item, keeping at most @size in flight.
+
+    Request ids wrap around, so sending thousands of requests at once would
+    also risk mixing up responses.
+
+    Responses may never arrive (the server may restart, for example), so
+    requests are abandoned after @timeout seconds.
+    '''
+
+    def __init__(self, items, send, on_response, on_done, size=8,
+                 timeout=60.0, clock=time.monotonic,
+                 start_timer=_start_timer):
+        '''
+        @send
+          Called as `send(item, callback)` to send the request for @item.
+          The callback must be called as `callback(result, error)` when
+          the response arrives.
+
+        @on_response
+          Called as `on_response(item, result, error)` for each response,
+          or with `TIMED_OUT` as the error for abandoned requests.
+
+        @on_done
+          Called without arguments once all the responses have arrived or
+          the window has been cancelled.
+
+        @start_timer
+          Called as `start_timer(seconds, fn)` to have `fn` called later.
+        '''
+        self.lock = Lock()
+        self.pending = list(reversed(items))
+        self.total = len(items)
+        # token -> (item, time sent)
+        self._in_flight = {}
+        self._tokens = itertools.count()
+        self.completed = 0
+        self.cancelled = False
+        self.finished = False
+        self.send = send
+        self.on_response = on_response
+        self.on_done = on_done
+        self.size = size
+        self.timeout = timeout
+        self.clock = clock
+        self.start_timer = start_timer
+        self._timer_armed = False
+
+    @property
+    def in_flight(self):
+        return len(self._in_flight)
+
+    def start(self):
+        self._fill()
+
+    def cancel(self):
+        '''Stops sending requests and finishes at once; responses still in
+        flight are ignored.
+        '''
+        with self.lock:
+            self.cancelled = True
+            self.pending = []
+            self._in_flight.clear()
+        self._fill()
+
+    def expire(self):
+        '''Abandons the requests sent more than `timeout` seconds ago.
+        '''
+        now = self.clock()
+        with self.lock:
+            self._timer_armed = False
+            expired = [token for (token, (_, sent_at))
+                       in self._in_flight.items()
+                       if now - sent_at >= self.timeout]
+            items = [self._in_flight.pop(token)[0] for token in expired]
+            self.completed += len(items)
+        try:
+            for item in items:
+                self.on_response(item, None, TIMED_OUT)
+        finally:
+            self._fill()
+
+    def _fill(self):
+        to_send = []
+        with self.lock:
+            now = self.clock()
+            while self.pending and len(self._in_flight) < self.size:
+                token = next(self._tokens)
+                item = self.pending.pop()
+                self._in_flight[token] = (item, now)
+                to_send.append((token, item))
+            done = (not self.pending and not self._in_flight and
+                    not self.finished)
+            if done:
+                self.finished = True
+            delay = None
+            if self._in_flight and not self._timer_armed:
+                self._timer_armed = True
+                oldest = min(sent_at for (_, sent_at)
+                             in self._in_flight.values())
+                delay = max(oldest + self.timeout - now, 0.1)
+
+        if delay is not None:
+            self.start_timer(delay, self.expire)
+
+        for token, item in to_send:
+            self.send(item, self._make_callback(token, item))
+
+        if done:
+            self.on_done()
+
+    def _make_callback(self, token, item):
+        def callback(result, error):
+            with self.lock:
+                # Abandoned or cancelled.
+                if self._in_flight.pop(token, None) is None:
+                    return
+                self.completed += 1
+            try:
+                self.on_response(item, result, error)
+            finally:
+                # Even if @on_response fails, so that @on_done is called.
+                self._fill()
+        return callback
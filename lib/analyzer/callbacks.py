@@ -0,0 +1,32 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Routes responses to callbacks registered for their request ids.
+'''
+
+from threading import Lock
+
+
+class RequestCallbacks(object):
+    '''Callbacks waiting for responses.
+
+    Callbacks are called from the response handling thread as
+    `callback(result, error)`; exactly one of the arguments is `None`.
+    '''
+
+    def __init__(self):
+        self.lock = Lock()
+        self._callbacks = {}
+
+    def __len__(self):
+        with self.lock:
+            return len(self._callbacks)
+
+    def add(self, request_id, callback):
+        with self.lock:
+            self._callbacks[request_id] = callback
+
+    def pop(self, request_id):
+        with self.lock:
+            return self._callbacks.pop(request_id, None)
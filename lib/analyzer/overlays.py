@@ -0,0 +1,72 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Keeps track of the content overlays we've sent to the analysis server.
+'''
+
+import threading
+
+
+def diff_content(old, new):
+    '''Returns the smallest single edit that turns @old into @new.
+
+    Returns a tuple (offset, length, replacement), or `None` if both strings
+    are equal.
+
+    @old
+      Content the server knows about.
+
+    @new
+      Current content.
+    '''
+    if old == new:
+        return
+
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+
+    end_old = len(old)
+    end_new = len(new)
+    while (end_old > start and end_new > start and
+           old[end_old - 1] == new[end_new - 1]):
+        end_old -= 1
+        end_new -= 1
+
+    return (start, end_old - start, new[start:end_new])
+
+
+class OverlayTracker(object):
+    '''Remembers the last content sent to the server for each file so that we
+    can send diffs instead of whole buffers.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._content = {}
+
+    def __contains__(self, path):
+        with self.lock:
+            return path in self._content
+
+    def set(self, path, content):
+        with self.lock:
+            self._content[path] = content
+
+    def remove(self, path):
+        with self.lock:
+            self._content.pop(path, None)
+
+    def update(self, path, content):
+        '''Records @content for @path and returns the edit needed to bring the
+        server's overlay up to date.
+
+        Returns `None` if there's no difference. Raises `KeyError` if there's
+        no overlay for @path yet.
+        '''
+        with self.lock:
+            edit = diff_content(self._content[path], content)
+            self._content[path] = content
+            return edit
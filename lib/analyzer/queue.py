@@ -4,6 +4,7 @@
 
 import sublime
 
+import itertools
 import queue
 import json
 
@@ -32,10 +33,13 @@ class AnalyzerQueue(queue.PriorityQueue):
 
     It automatically bumps up priority of requests/responses coming from or
     targeted at the current view.
+
+    Items with the same priority are retrieved in insertion order.
     '''
     def __init__(self, name, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.name = name
+        self.counter = itertools.count()
         self.lock_put = threading.Lock()
         self.lock_get = threading.Lock()
 
@@ -69,17 +73,20 @@ class AnalyzerQueue(queue.PriorityQueue):
         if self.is_active(view):
             return max((given - 50), TaskPriority.HIGHEST)
 
+        return given
+
     def put(self, data, priority=TaskPriority.DEFAULT, view=None, block=True,
             timeout=None):
                 with self.lock_put:
-                    _logger.debug("putting in %s: %s", self.name, repr(data))
+                    _logger.debug("putting in %s: %r", self.name, data)
                     priority = self.calculate_priority(view, priority)
-                    super().put((priority, json.dumps(data)), block, timeout)
+                    super().put((priority, next(self.counter), json.dumps(data)),
+                                block, timeout)
 
     def get(self, block=True, timeout=None):
         with self.lock_get:
-            prio, data = super().get(block, timeout)
-            _logger.debug("getting in %s: %s", self.name, repr(data))
+            prio, _, data = super().get(block, timeout)
+            _logger.debug("getting in %s: %r", self.name, data)
             return json.loads(data)
 
 
@@ -20,7 +20,8 @@ class RequestIdManager(object):
         Returns a new id for a request.
 
         @view
-          The view from which the new request is going to be made.
+          The view from which the new request is going to be made. If `None`,
+          the response is accepted regardless of the active view.
 
         @response_type
           The type of the DAS response (result) for the new request.
@@ -30,9 +31,12 @@ class RequestIdManager(object):
             if self._id >= self.MAX_ID:
                 self._id = -1
             self._id += 1
-            self.request_ids[view.id()][str(self._id)] = response_type
+            self.request_ids[self._key(view)][str(self._id)] = response_type
             return str(self._id)
 
+    def _key(self, view):
+        return view.id() if view else None
+
     def validate(self, view, data):
         """
         Returns `True` if the @data originates from a known request.
@@ -45,7 +49,10 @@ class RequestIdManager(object):
         """
 
         with self._lock:
-            return view and (data.get('id') in self.request_ids[view.id()])
+            request_id = data.get('id')
+            if request_id in self.request_ids[None]:
+                return True
+            return view and (request_id in self.request_ids[view.id()])
 
     def get_response_type(self, view, request_id):
         """
@@ -61,7 +68,18 @@ class RequestIdManager(object):
         """
 
         with self._lock:
+            if request_id in self.request_ids[None]:
+                return self.request_ids[None].pop(request_id)
             view_id = view.id()
             v = self.request_ids[view_id][request_id]
             del self.request_ids[view_id][request_id]
             return v
+
+    def pending_counts(self):
+        """
+        Returns a dict mapping view ids (or `None`) to the number of ids
+        issued for them that haven't been answered yet.
+        """
+
+        with self._lock:
+            return {key: len(ids) for (key, ids) in self.request_ids.items()}
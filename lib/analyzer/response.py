@@ -13,11 +13,17 @@ from Dart.sublime_plugin_lib import PluginLogger
 from Dart.sublime_plugin_lib.sublime import get_active_view
 
 from Dart.lib.analyzer.api.protocol import AnalysisErrorsParams
+from Dart.lib.analyzer.api.protocol import AnalysisHighlightsParams
 from Dart.lib.analyzer.api.protocol import AnalysisNavigationParams
+from Dart.lib.analyzer.api.protocol import AnalysisOccurrencesParams
+from Dart.lib.analyzer.api.protocol import AnalysisOutlineParams
 from Dart.lib.analyzer.api.protocol import CompletionGetSuggestionsResult
 from Dart.lib.analyzer.api.protocol import CompletionResultsParams
+from Dart.lib.analyzer.api.protocol import SearchResultsParams
 from Dart.lib.analyzer.api.protocol import ServerGetVersionResult
+from Dart.lib.analyzer.api.protocol import ServerStatusParams
 from Dart.lib.analyzer.api.protocol import EditFormatResult
+from Dart.lib.perf import metrics
 
 
 _logger = PluginLogger(__name__)
@@ -48,6 +54,9 @@ class ResponseMaker(object):
                     yield data
                     break
 
+                if 'id' in data:
+                    metrics.finish_request(data['id'])
+
                 view = get_active_view()
                 if self.server.request_ids.validate(view, data):
                     yield self.make_request(view, data)
@@ -57,10 +66,18 @@ class ResponseMaker(object):
 
     # TODO(guillermooo): change this name
     def make_request(self, view, data):
-        view_id = view.id()
         request_id = data['id']
         response_type = self.server.request_ids.get_response_type(view, request_id)
 
+        if data.get('error'):
+            # There's no result to build a response from.
+            _logger.info('request %s failed: %s', request_id,
+                         data['error'].get('message'))
+            callback = self.server.callbacks.pop(request_id)
+            if callback:
+                callback(None, data['error'])
+            return
+
         # TODO(guillermooo): encapsulate this in RequestIdManager too?
         if hasattr(response_type, 'from_json'):
             r = response_type.from_json(data.get('result'))
@@ -92,6 +109,22 @@ def is_completion_results(data):
     return 'completion.results' == data.get('event')
 
 
+def is_outline_notification(data):
+    return 'analysis.outline' == data.get('event')
+
+
+def is_highlights_notification(data):
+    return 'analysis.highlights' == data.get('event')
+
+
+def is_occurrences_notification(data):
+    return 'analysis.occurrences' == data.get('event')
+
+
+def is_server_status_notification(data):
+    return 'server.status' == data.get('event')
+
+
 def event_classifier(data):
     if is_errors_response(data):
         params = AnalysisErrorsParams.from_json(data['params'])
@@ -105,4 +138,24 @@ def event_classifier(data):
         result = CompletionResultsParams.from_json(data['params'])
         return result.to_notification()
 
+    if is_outline_notification(data):
+        result = AnalysisOutlineParams.from_json(data['params'])
+        return result.to_notification()
+
+    if is_occurrences_notification(data):
+        result = AnalysisOccurrencesParams.from_json(data['params'])
+        return result.to_notification()
+
+    if is_highlights_notification(data):
+        result = AnalysisHighlightsParams.from_json(data['params'])
+        return result.to_notification()
+
+    if is_result_response(data):
+        result = SearchResultsParams.from_json(data['params'])
+        return result.to_notification()
+
+    if is_server_status_notification(data):
+        result = ServerStatusParams.from_json(data['params'])
+        return result.to_notification()
+
     return None
@@ -0,0 +1,98 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Routes `search.results` notifications to whoever started the search.
+'''
+
+from threading import Lock
+
+from Dart.sublime_plugin_lib import PluginLogger
+
+
+_logger = PluginLogger(__name__)
+
+
+class SearchHandler(object):
+    '''Base class for objects receiving search results.
+
+    Methods are called from the response handling thread.
+    '''
+
+    def on_start(self, element):
+        '''Called when the server has accepted the search.
+
+        @element
+          The `Element` being searched for, if the search is about one.
+          `None` if the server found no element, in which case no results
+          will follow.
+        '''
+        pass
+
+    def on_results(self, results, is_last):
+        '''
+        @results
+          A list of `SearchResult`s.
+
+        @is_last
+          `True` if no more results will follow.
+        '''
+        raise NotImplementedError()
+
+
+class SearchRegistry(object):
+    '''Keeps track of running searches.
+
+    A search goes through two stages: first we get a response to our request
+    containing a search id, then we get any number of notifications carrying
+    results for that id.
+    '''
+
+    def __init__(self):
+        self.lock = Lock()
+        # request id -> handler
+        self._requests = {}
+        # search id -> handler
+        self._searches = {}
+
+    def add_request(self, request_id, handler):
+        with self.lock:
+            self._requests[request_id] = handler
+
+    def start(self, request_id, search_id):
+        '''Associates the @search_id returned by the server with the handler
+        for @request_id and returns the handler.
+
+        An empty @search_id means the server won't send any results.
+        '''
+        with self.lock:
+            handler = self._requests.pop(request_id, None)
+            if handler is None:
+                _logger.debug('unknown search request: %s', request_id)
+                return
+            if search_id:
+                self._searches[search_id] = handler
+            return handler
+
+    def cancel(self, handler):
+        '''Stops routing results to @handler.
+        '''
+        with self.lock:
+            for d in (self._requests, self._searches):
+                for key in [k for (k, h) in d.items() if h is handler]:
+                    del d[key]
+
+    def dispatch(self, search_results):
+        '''Forwards @search_results to their handler, if any.
+
+        @search_results
+          A `SearchResultsParams`.
+        '''
+        with self.lock:
+            handler = self._searches.get(search_results.id)
+            if handler is None:
+                return
+            if search_results.isLast:
+                del self._searches[search_results.id]
+
+        handler.on_results(search_results.results, search_results.isLast)
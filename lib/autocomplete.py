@@ -1,6 +1,107 @@
+from collections import deque
 from threading import Lock
 
 
+class PrefetchStats(object):
+    '''Keeps track of how many speculative completion requests end up being
+    used, so that we can back off when they are mostly wasted.
+    '''
+
+    # Number of recent outcomes taken into account.
+    WINDOW = 20
+    # Don't tune anything until we have this many outcomes.
+    MIN_SAMPLES = 5
+    # Below this hit ratio, stop prefetching on identifier starts.
+    IDENTIFIER_THRESHOLD = 0.5
+    # Below this hit ratio, only prefetch every so often after a '.'.
+    DOT_THRESHOLD = 0.2
+    # When backing off, still probe once every this many triggers.
+    PROBE_INTERVAL = 5
+
+    def __init__(self):
+        self.issued = 0
+        self.used = 0
+        self.wasted = 0
+        self._outcomes = deque(maxlen=self.WINDOW)
+        self._skipped = 0
+
+    @property
+    def hit_ratio(self):
+        if not self._outcomes:
+            return 1.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def record_issued(self):
+        self.issued += 1
+
+    def record_used(self):
+        self.used += 1
+        self._outcomes.append(1)
+
+    def record_wasted(self):
+        self.wasted += 1
+        self._outcomes.append(0)
+
+    def should_prefetch(self, trigger):
+        '''Returns `True` if a prefetch should be issued for @trigger.
+
+        @trigger
+          Either '.' (member access) or 'identifier' (first char of an
+          identifier after a '.').
+        '''
+        if len(self._outcomes) < self.MIN_SAMPLES:
+            return True
+
+        ratio = self.hit_ratio
+        if trigger == 'identifier':
+            return ratio >= self.IDENTIFIER_THRESHOLD
+
+        if ratio >= self.DOT_THRESHOLD:
+            return True
+
+        self._skipped += 1
+        if self._skipped >= self.PROBE_INTERVAL:
+            self._skipped = 0
+            return True
+        return False
+
+    def __str__(self):
+        return 'issued: {} used: {} wasted: {} hit ratio: {:.2f}'.format(
+                self.issued, self.used, self.wasted, self.hit_ratio)
+
+
+class SpeculativeCompletion(object):
+    '''A completion request issued ahead of time.
+    '''
+
+    def __init__(self, view_id, anchor, receiver, request_id):
+        '''
+        @view_id
+          Id of the view the request was made for.
+
+        @anchor
+          Offset where the identifier being completed starts.
+
+        @receiver
+          Text between the start of the line and @anchor. If it changes, the
+          results are stale.
+
+        @request_id
+          Id of the `completion.getSuggestions` request.
+        '''
+        self.view_id = view_id
+        self.anchor = anchor
+        self.receiver = receiver
+        self.request_id = request_id
+        self.id = None
+        self.results = None
+
+    def matches(self, view_id, anchor, receiver):
+        return (self.view_id == view_id and
+                self.anchor == anchor and
+                self.receiver == receiver)
+
+
 class AutocompleteContext(object):
     '''
     An autocomplete context.
@@ -15,6 +116,8 @@ class AutocompleteContext(object):
         self._request_id = None
         self._results = []
         self._formatted_results = []
+        self._prefetch = None
+        self.prefetch_stats = PrefetchStats()
         self.coords = None
 
     def __enter__(self):
@@ -79,6 +182,60 @@ class AutocompleteContext(object):
         self._results = []
         self._formatted_results = []
 
+    @property
+    def prefetch(self):
+        assert self._is_open, 'must open context first -- use as a context manager'
+        return self._prefetch
+
+    def start_prefetch(self, view_id, anchor, receiver, request_id):
+        '''Records a new speculative request, replacing any previous one.
+        '''
+        assert self._is_open, 'must open context first -- use as a context manager'
+        self.discard_prefetch()
+        self._prefetch = SpeculativeCompletion(view_id, anchor, receiver,
+                                               request_id)
+        self.prefetch_stats.record_issued()
+
+    def discard_prefetch(self):
+        assert self._is_open, 'must open context first -- use as a context manager'
+        if self._prefetch is not None:
+            self.prefetch_stats.record_wasted()
+        self._prefetch = None
+
+    def is_prefetch_request(self, request_id):
+        assert self._is_open, 'must open context first -- use as a context manager'
+        return (self._prefetch is not None and
+                self._prefetch.request_id == request_id)
+
+    def is_prefetch_id(self, completion_id):
+        assert self._is_open, 'must open context first -- use as a context manager'
+        return (self._prefetch is not None and
+                completion_id is not None and
+                self._prefetch.id == completion_id)
+
+    def take_prefetched(self, view_id, anchor, receiver):
+        '''Returns the prefetched results for the given location, if any.
+
+        Prefetched results that don't match the location are discarded.
+        Returns `None` if there aren't any usable results.
+        '''
+        assert self._is_open, 'must open context first -- use as a context manager'
+        prefetch = self._prefetch
+        if prefetch is None:
+            return
+
+        if not prefetch.matches(view_id, anchor, receiver):
+            self.discard_prefetch()
+            return
+
+        if prefetch.results is None:
+            # Still waiting for the server; keep it around.
+            return
+
+        self._prefetch = None
+        self.prefetch_stats.record_used()
+        return prefetch.results
+
     def should_hide_auto_complete_list(self, view):
         s0 = view.sel()[0]
         return s0 < self.coords
@@ -0,0 +1,116 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Formats many files at once.
+'''
+
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+from Dart.lib.perf import Stopwatch
+
+
+# Directories that never contain sources we own.
+SKIPPED_DIRS = ('packages', 'build')
+
+
+def find_dart_files(root):
+    '''Returns the .dart files under @root, skipping dependencies, build
+    output and hidden directories.
+    '''
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if d not in SKIPPED_DIRS and not d.startswith('.'))
+        found.extend(os.path.join(dirpath, f) for f in sorted(filenames)
+                     if f.endswith('.dart'))
+    return found
+
+
+class FileResult(object):
+    def __init__(self, path, changed=False, ms=0, error=None):
+        self.path = path
+        self.changed = changed
+        self.ms = ms
+        self.error = error
+
+
+def format_file(path, format_source):
+    '''Formats the file at @path and writes it back if it changed.
+
+    @format_source
+      Called with the file's text; returns the formatted text or raises
+      `ValueError` if the file can't be formatted.
+    '''
+    try:
+        with open(path, 'rt', encoding='utf-8', newline='') as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return FileResult(path, error=str(e))
+
+    with Stopwatch() as sw:
+        try:
+            formatted = format_source(text)
+        except ValueError as e:
+            error = str(e)
+        else:
+            error = None
+    if error:
+        return FileResult(path, ms=sw.ms, error=error)
+
+    if formatted == text:
+        return FileResult(path, ms=sw.ms)
+
+    try:
+        with open(path, 'wt', encoding='utf-8', newline='') as f:
+            f.write(formatted)
+    except OSError as e:
+        return FileResult(path, ms=sw.ms, error=str(e))
+    return FileResult(path, changed=True, ms=sw.ms)
+
+
+def format_files(paths, format_source, on_result, max_workers=4,
+                 is_cancelled=lambda: False):
+    '''Formats @paths with up to @max_workers formatters running at once.
+
+    @on_result
+      Called with a `FileResult` as each file is done, from a worker thread.
+
+    @is_cancelled
+      Checked before each file is formatted.
+
+    Returns the list of `FileResult`s, in the order they finished.
+    '''
+    def work(path):
+        if is_cancelled():
+            return
+        return format_file(path, format_source)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in as_completed([executor.submit(work, p) for p in paths]):
+            result = future.result()
+            if result is None:
+                continue
+            results.append(result)
+            on_result(result)
+    return results
+
+
+def summarize(results, elapsed_ms, top=10):
+    '''Returns a text summary of @results.
+    '''
+    changed = [r for r in results if r.changed]
+    failed = [r for r in results if r.error]
+    lines = ['{} files, {} formatted, {} failed in {:.0f}ms'.format(
+                len(results), len(changed), len(failed), elapsed_ms)]
+
+    slowest = sorted(results, key=lambda r: r.ms, reverse=True)[:top]
+    if slowest:
+        lines.append('')
+        lines.append('Slowest files:')
+        lines.extend('  {:>8.0f}ms  {}'.format(r.ms, r.path) for r in slowest)
+    return '\n'.join(lines)
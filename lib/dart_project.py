@@ -5,8 +5,11 @@
 import os
 
 from Dart.lib.path import find_pubspec_path
-from Dart.out_there.yaml import load
 from Dart.lib.path import is_view_dart_script
+from Dart.lib.manifests import manifests
+from Dart.lib.manifests import parse_lock
+from Dart.lib.manifests import parse_pubspec
+from Dart.lib.project_registry import registry
 
 
 class DartProject(object):
@@ -14,12 +17,11 @@ class DartProject(object):
         self.pubspec = pubspec
 
     def _get_top_level_dir(self, name):
-        p = os.path.join(self.pubspec.parent, name)
-        if os.path.exists(p):
-            return p
+        return registry.get_top_level_dir(self.pubspec.parent, name)
 
     def make_top_level_dir(self, name):
         os.mkdir(os.path.join(self.pubspec.parent, name))
+        registry.invalidate(self.pubspec.parent)
 
     @property
     def path_to_web(self):
@@ -76,20 +78,22 @@ class PubspecLockFile(object):
     '''
     def __init__(self, pubspec):
         self.path = os.path.join(pubspec.parent, 'pubspec.lock')
-        self._data = None
 
     @property
     def parent(self):
         return os.path.dirname(self.path)
 
-    def _load(self):
-        if self._data is not None:
-            return
-        self._data = load(open(self.path, 'rt'))
+    @property
+    def index(self):
+        '''The `LockIndex` for the file, parsed again only if it changed.
+        '''
+        return manifests.get(self.path, parse_lock)
 
     def has_dependency(self, name, version=None):
-        self._load()
-        return name in self._data['packages']
+        return self.index.has(name, version)
+
+    def get_version(self, name):
+        return self.index.get_version(name)
 
     @classmethod
     def from_pubspec(cls, pubspec):
@@ -105,19 +109,19 @@ class PubspecFile(object):
     '''
     def __init__(self, path):
         self.path = path
-        self._data = None
 
     @property
     def parent(self):
         return os.path.dirname(self.path)
 
-    def _load(self):
-        if self._data is not None:
-            return
-        self._data = load(open(self.path, 'rt'))
+    @property
+    def data(self):
+        '''The parsed file, parsed again only if it changed.
+        '''
+        return manifests.get(self.path, parse_pubspec)
 
     def get_pubspec_lock(self):
-        # TODO(guillermooo): cache this?
+        # Cheap; the parsed lock file is shared through `manifests`.
         return PubspecLockFile.from_pubspec(self)
 
     @classmethod
@@ -0,0 +1,239 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Persistent index of top-level declarations per pub package.
+
+Declarations are stored per file together with the file's mtime. Entries for
+files that have changed on disk are dropped as soon as they are looked at, so
+the index never serves stale data, and the rest of the index survives.
+'''
+
+from threading import Lock
+from threading import Timer
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+
+from Dart.sublime_plugin_lib import PluginLogger
+
+
+_logger = PluginLogger(__name__)
+
+
+FORMAT_VERSION = 1
+
+
+class Declaration(object):
+    def __init__(self, path, name, kind, offset, row, col):
+        self.path = path
+        self.name = name
+        self.kind = kind
+        self.offset = offset
+        # 1-based row and column.
+        self.row = row
+        self.col = col
+
+    def to_quick_panel_item(self):
+        return [self.name,
+                '{} {}:{}'.format(self.kind.lower(), self.path, self.row)]
+
+
+def get_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return
+
+
+class DeclarationIndex(object):
+    '''Top-level declarations for the files under @root.
+    '''
+
+    # Seconds to wait before writing changes to disk.
+    SAVE_DELAY = 2.0
+    # Seconds after which a full refresh from the server is due.
+    REFRESH_INTERVAL = 600
+    # Seconds after which we give up waiting for a refresh to finish.
+    REFRESH_TIMEOUT = 60
+
+    def __init__(self, root, cache_dir):
+        '''
+        @root
+          Directory containing a pubspec.yaml file.
+
+        @cache_dir
+          Directory where the index is persisted.
+        '''
+        self.root = root
+        self.cache_dir = cache_dir
+        self.lock = Lock()
+        # relative path -> (mtime, [(name, kind, offset, row, col)])
+        self._files = {}
+        self.last_refresh = 0
+        # When the refresh in flight started, if any.
+        self.refreshing_since = None
+        self._save_timer = None
+
+    @property
+    def path(self):
+        digest = hashlib.sha1(self.root.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + '.json.gz')
+
+    @property
+    def needs_refresh(self):
+        with self.lock:
+            return time.time() - self.last_refresh > self.REFRESH_INTERVAL
+
+    def start_refresh(self):
+        '''Returns `True` if the caller should request a refresh from the
+        server, that is, if no other refresh is in flight.
+        '''
+        with self.lock:
+            now = time.time()
+            if (self.refreshing_since is not None and
+                now - self.refreshing_since < self.REFRESH_TIMEOUT):
+                    return False
+            self.refreshing_since = now
+            return True
+
+    def owns(self, path):
+        return path.startswith(self.root + os.sep)
+
+    def load(self):
+        '''Loads the index from disk. Returns `True` on success.
+        '''
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            _logger.debug('could not load declarations index: %s', e)
+            return False
+
+        if data.get('version') != FORMAT_VERSION or data.get('root') != self.root:
+            return False
+
+        with self.lock:
+            self._files = {rel: (mtime, [tuple(d) for d in decls])
+                           for (rel, (mtime, decls)) in data['files'].items()}
+            self.last_refresh = data.get('last_refresh', 0)
+        return True
+
+    def save(self):
+        with self.lock:
+            self._save_timer = None
+            data = {
+                'version': FORMAT_VERSION,
+                'root': self.root,
+                'last_refresh': self.last_refresh,
+                'files': self._files,
+            }
+            # Compact separators; the file is not meant for humans.
+            text = json.dumps(data, separators=(',', ':'))
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = self.path + '.tmp'
+            with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            _logger.error('could not save declarations index: %s', e)
+
+    def schedule_save(self):
+        with self.lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = Timer(self.SAVE_DELAY, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def update_file(self, path, declarations):
+        '''Replaces the declarations for @path.
+
+        @declarations
+          A list of (name, kind, offset, row, col) tuples.
+        '''
+        mtime = get_mtime(path)
+        if mtime is None:
+            return
+        rel = os.path.relpath(path, self.root)
+        with self.lock:
+            self._files[rel] = (mtime, list(declarations))
+        self.schedule_save()
+
+    def mark_refreshed(self):
+        with self.lock:
+            self.last_refresh = time.time()
+            self.refreshing_since = None
+        self.schedule_save()
+
+    def invalidate(self, path):
+        rel = os.path.relpath(path, self.root)
+        with self.lock:
+            self._files.pop(rel, None)
+
+    def search(self, pattern):
+        '''Returns the `Declaration`s whose names match the regex @pattern and
+        a list of files that had to be dropped because they changed on disk.
+
+        Only files with matches are checked for changes.
+        '''
+        try:
+            rx = re.compile(pattern)
+        except re.error:
+            rx = re.compile(re.escape(pattern))
+
+        with self.lock:
+            candidates = [(rel, mtime, [d for d in decls if rx.search(d[0])])
+                          for (rel, (mtime, decls)) in self._files.items()]
+
+        found = []
+        stale = []
+        for rel, mtime, decls in candidates:
+            if not decls:
+                continue
+            path = os.path.join(self.root, rel)
+            if get_mtime(path) != mtime:
+                stale.append(path)
+                continue
+            found.extend(Declaration(path, *d) for d in decls)
+
+        for path in stale:
+            self.invalidate(path)
+
+        found.sort(key=lambda d: (d.name, d.path))
+        return found, stale
+
+
+class DeclarationIndexes(object):
+    '''Loads and hands out `DeclarationIndex`es by package root.
+    '''
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.lock = Lock()
+        self._indexes = {}
+
+    def get(self, root):
+        with self.lock:
+            index = self._indexes.get(root)
+            if index is None:
+                index = DeclarationIndex(root, self.cache_dir)
+                index.load()
+                self._indexes[root] = index
+            return index
+
+    def find_loaded(self, path):
+        '''Returns the loaded index owning @path, if any.
+        '''
+        with self.lock:
+            owners = [index for index in self._indexes.values()
+                      if index.owns(path)]
+        if owners:
+            # Nested packages: the innermost one wins.
+            return max(owners, key=lambda index: len(index.root))
@@ -0,0 +1,203 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Reads the directives (library, import, export, part) at the top of Dart
+files.
+
+Directives are parsed once per buffer change, or once per file change for
+files that aren't open, and questions like "does this file import dart:io?"
+are answered from the cache.
+'''
+
+from threading import Lock
+import re
+
+from Dart.lib.manifests import ManifestCache
+
+
+# Directives come first, so there's no need to read whole files.
+HEADER_SIZE = 16 * 1024
+
+_SKIPPED = re.compile(r'''
+      \s+
+    | //[^\n]*
+    | \#![^\n]*
+    ''', re.X)
+_ANNOTATION = re.compile(r'@[\w$.]+\s*')
+_KEYWORD = re.compile(r'(library|import|export|part)\b')
+_STRING = re.compile(r'''r?(?:'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")''')
+_STRING_OR_END = re.compile(r'''r?(?:'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")|;''')
+_PART_OF = re.compile(r'\s*of\b\s*')
+
+
+class Directives(object):
+    '''The directives of a Dart file.
+    '''
+
+    def __init__(self):
+        self.library = None
+        self.part_of = None
+        self.imports = []
+        self.exports = []
+        self.parts = []
+
+    def has_import(self, uri):
+        return uri in self.imports
+
+
+def _skip_block_comment(text, i):
+    # Block comments nest in Dart.
+    depth = 0
+    while i < len(text):
+        if text.startswith('/*', i):
+            depth += 1
+            i += 2
+        elif text.startswith('*/', i):
+            depth -= 1
+            i += 2
+            if not depth:
+                return i
+        else:
+            i += 1
+    return i
+
+
+def _skip_parens(text, i):
+    depth = 0
+    while i < len(text):
+        m = _STRING.match(text, i)
+        if m:
+            i = m.end()
+            continue
+        if text[i] == '(':
+            depth += 1
+        elif text[i] == ')':
+            depth -= 1
+            if not depth:
+                return i + 1
+        i += 1
+    return i
+
+
+def _unquote(literal):
+    if literal.startswith('r'):
+        return literal[2:-1]
+    return literal[1:-1]
+
+
+def _read_statement(text, i):
+    '''Returns the string literals in the statement starting at @i, the
+    text before the first of them, and the position after the ';'.
+    '''
+    start = i
+    literals = []
+    head_end = None
+    while True:
+        m = _STRING_OR_END.search(text, i)
+        if not m:
+            return literals, text[start:head_end], len(text)
+        if m.group() == ';':
+            if head_end is None:
+                head_end = m.start()
+            return literals, text[start:head_end], m.end()
+        if head_end is None:
+            head_end = m.start()
+        literals.append(_unquote(m.group()))
+        i = m.end()
+
+
+def parse_directives(text):
+    '''Returns the `Directives` at the top of @text, the source of a Dart
+    file.
+    '''
+    directives = Directives()
+    i = 1 if text.startswith('\ufeff') else 0
+    while i < len(text):
+        m = _SKIPPED.match(text, i)
+        if m:
+            i = m.end()
+            continue
+        if text.startswith('/*', i):
+            i = _skip_block_comment(text, i)
+            continue
+        m = _ANNOTATION.match(text, i)
+        if m:
+            i = m.end()
+            if text.startswith('(', i):
+                i = _skip_parens(text, i)
+            continue
+
+        m = _KEYWORD.match(text, i)
+        if not m:
+            break
+        keyword = m.group()
+        literals, head, i = _read_statement(text, m.end())
+        if keyword == 'library':
+            directives.library = head.strip()
+        elif keyword == 'part':
+            of = _PART_OF.match(head)
+            if of:
+                directives.part_of = (head[of.end():].strip() or
+                                      (literals[0] if literals else None))
+            elif literals:
+                directives.parts.append(literals[0])
+        elif literals:
+            getattr(directives, keyword + 's').append(literals[0])
+    return directives
+
+
+def read_header(path):
+    # Some editors start files with a BOM.
+    with open(path, 'rt', encoding='utf-8-sig', errors='replace') as f:
+        return f.read(HEADER_SIZE)
+
+
+def parse_file_directives(path):
+    return parse_directives(read_header(path))
+
+
+class DirectiveCache(object):
+    '''Keeps the directives of buffers and files until they change.
+    '''
+
+    # Forget everything beyond this many buffers.
+    MAX_BUFFERS = 200
+
+    def __init__(self):
+        self.lock = Lock()
+        # buffer id -> (change count, Directives)
+        self._buffers = {}
+        self._files = ManifestCache()
+
+    def get_for_buffer(self, buffer_id, change_count, get_text):
+        '''
+        @get_text
+          Called to get the start of the buffer if the cached directives
+          are out of date.
+        '''
+        with self.lock:
+            entry = self._buffers.get(buffer_id)
+        if entry is not None and entry[0] == change_count:
+            return entry[1]
+
+        directives = parse_directives(get_text())
+        with self.lock:
+            if len(self._buffers) >= DirectiveCache.MAX_BUFFERS:
+                self._buffers.clear()
+            self._buffers[buffer_id] = (change_count, directives)
+        return directives
+
+    def get_for_path(self, path):
+        '''Returns the directives of the file at @path, or empty
+        `Directives` if it can't be read.
+        '''
+        try:
+            return self._files.get(path, parse_file_directives)
+        except OSError:
+            return Directives()
+
+
+# The plugin's directive cache.
+directive_cache = DirectiveCache()
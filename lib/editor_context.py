@@ -7,10 +7,20 @@ Holds state about the editor.
 '''
 
 from collections import defaultdict
+import os
 import threading
 
+import sublime
+
 from Dart.sublime_plugin_lib.panels import OutputPanel
+from Dart.lib.analysis_status import StatusHistory
 from Dart.lib.autocomplete import AutocompleteContext
+from Dart.lib.decl_index import DeclarationIndexes
+from Dart.lib.formatting import FormatRequests
+from Dart.lib.highlights import HighlightsCache
+from Dart.lib.hover import HoverCache
+from Dart.lib.occurrences import OccurrencesCache
+from Dart.lib.symbols import SymbolIndex
 
 
 class EditorContext(object):
@@ -22,7 +32,36 @@ class EditorContext(object):
         self._navigation = None
         self._errors = []
         self._errors_index = -1
+        # path -> [AnalysisError], for every file the server reported on.
+        self._file_errors = {}
         self.autocomplete_context = AutocompleteContext()
+        self.hover_cache = HoverCache()
+        self.symbol_index = SymbolIndex()
+        self.highlights = HighlightsCache()
+        self.occurrences = OccurrencesCache()
+        self.format_requests = FormatRequests()
+        self._declaration_indexes = None
+        self._status_history = None
+
+    @property
+    def declaration_indexes(self):
+        # The cache path isn't available until the API is ready, so we
+        # can't set this up in the constructor.
+        with EditorContext.write_lock:
+            if self._declaration_indexes is None:
+                self._declaration_indexes = DeclarationIndexes(
+                        os.path.join(sublime.cache_path(), 'Dart',
+                                     'declarations'))
+            return self._declaration_indexes
+
+    @property
+    def status_history(self):
+        with EditorContext.write_lock:
+            if self._status_history is None:
+                self._status_history = StatusHistory(
+                        os.path.join(sublime.cache_path(), 'Dart',
+                                     'analysis_history.jsonl'))
+            return self._status_history
 
     @property
     def navigation(self):
@@ -46,6 +85,57 @@ class EditorContext(object):
             self._errors_index = -1
             self._errors = list(values)
 
+    def set_file_errors(self, path, errors):
+        '''Stores the latest `AnalysisError`s reported for @path.
+        '''
+        with EditorContext.write_lock:
+            if errors:
+                self._file_errors[path] = list(errors)
+            else:
+                self._file_errors.pop(path, None)
+
+    def get_file_errors(self, path):
+        with EditorContext.write_lock:
+            return list(self._file_errors.get(path, []))
+
+    def get_errors_under(self, root):
+        '''Returns a dict mapping the files under @root to their errors.
+        '''
+        prefix = os.path.join(root, '')
+        with EditorContext.write_lock:
+            return {path: list(errors)
+                    for (path, errors) in self._file_errors.items()
+                    if path.startswith(prefix)}
+
+    def get_memory_items(self):
+        '''Returns (name, count, obj) tuples for the main structures held
+        here; see `Dart.lib.memory.report_structures`.
+        '''
+        with EditorContext.write_lock:
+            file_errors = dict(self._file_errors)
+            errors = list(self._errors)
+            navigation = self._navigation
+
+        with self.autocomplete_context as actx:
+            results = actx.results
+            formatted = actx.formatted_results
+
+        return [
+            ('errors by file (files)', len(file_errors), file_errors),
+            ('errors by file (errors)',
+             sum(len(e) for e in file_errors.values()), None),
+            ('errors panel', len(errors), errors),
+            ('navigation regions',
+             len(navigation.regions) if navigation else 0, navigation),
+            ('completion results', len(results), results),
+            ('completion results (formatted)', len(formatted), formatted),
+            ('hover cache', None, self.hover_cache),
+            ('symbol index', None, self.symbol_index),
+            ('highlights', None, self.highlights),
+            ('occurrences', None, self.occurrences),
+            ('format requests', None, self.format_requests),
+        ]
+
     @property
     def errors_index(self):
         with EditorContext.write_lock:
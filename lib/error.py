@@ -21,3 +21,11 @@ class FatalConfigError(FatalError):
 class ConfigError(Exception):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+
+
+class ChangeConflictError(Exception):
+    '''A change can't be applied because the files it touches have changed
+    since it was computed.
+    '''
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
@@ -0,0 +1,126 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Helpers to apply the same kind of fix to many errors at once.
+'''
+
+from bisect import bisect_left
+from collections import Counter
+import re
+
+
+_QUOTED_RX = re.compile(r"'[^']*'")
+
+
+def normalize_message(message):
+    '''Returns @message with quoted names blanked out, so that messages
+    about different elements compare equal.
+    '''
+    return _QUOTED_RX.sub("''", message)
+
+
+def error_kind(error):
+    '''Returns a key identifying the kind of @error.
+    '''
+    return (error.type, normalize_message(error.message))
+
+
+def count_kinds(errors):
+    '''Returns (kind, count) pairs for @errors, most frequent first.
+    '''
+    return Counter(error_kind(e) for e in errors).most_common()
+
+
+def same_error(a, b):
+    return (a.location.offset == b.location.offset and
+            a.message == b.message)
+
+
+def find_fixes(error_fixes, error):
+    '''Returns the `SourceChange`s for @error in @error_fixes.
+
+    @error_fixes
+      A list of `AnalysisErrorFixes`.
+    '''
+    for ef in error_fixes:
+        if same_error(ef.error, error):
+            return ef.fixes
+    return []
+
+
+def choose_fix(error_fixes, error, fix_kind):
+    '''Returns the fix for @error whose normalized message is @fix_kind, or
+    `None`.
+    '''
+    for change in find_fixes(error_fixes, error):
+        if normalize_message(change.message) == fix_kind:
+            return change
+
+
+class EditMerger(object):
+    '''Merges the edits of many `SourceChange`s, rejecting changes that
+    conflict with the ones already accepted.
+
+    Fixes for different errors often make identical edits, like adding the
+    same import; those don't count as conflicts.
+    '''
+
+    def __init__(self):
+        # path -> sorted [(offset, end, replacement)]
+        self._files = {}
+        # path -> file stamp from the first change touching the file
+        self.stamps = {}
+        self.accepted = 0
+        self.rejected = 0
+
+    def add(self, change):
+        '''Merges @change if none of its edits conflict with earlier ones.
+        Returns `True` if it was merged.
+        '''
+        new_edits = []
+        for file_edit in change.edits:
+            spans = self._files.get(file_edit.file, [])
+            seen = []
+            for e in file_edit.edits:
+                span = (e.offset, e.offset + e.length, e.replacement)
+                if span in seen:
+                    continue
+                if span in spans:
+                    # Already there thanks to another change.
+                    continue
+                if self._conflicts(spans, span) or self._conflicts(
+                        sorted(seen), span):
+                    self.rejected += 1
+                    return False
+                seen.append(span)
+            new_edits.append((file_edit, seen))
+
+        for file_edit, spans in new_edits:
+            self.stamps.setdefault(file_edit.file, file_edit.fileStamp)
+            current = self._files.setdefault(file_edit.file, [])
+            for span in spans:
+                current.insert(bisect_left(current, span), span)
+        self.accepted += 1
+        return True
+
+    def _conflicts(self, spans, span):
+        start, end, _ = span
+        i = bisect_left(spans, span)
+        for neighbor in spans[max(i - 1, 0):i + 1]:
+            n_start, n_end, _ = neighbor
+            # Two insertions at the same spot would depend on their order.
+            if start == n_start:
+                return True
+            if start < n_end and n_start < end:
+                return True
+        return False
+
+    def get_edits(self):
+        '''Returns a dict mapping paths to [offset, length, replacement]
+        lists.
+        '''
+        return {path: [[start, end - start, replacement]
+                       for (start, end, replacement) in spans]
+                for (path, spans) in self._files.items()}
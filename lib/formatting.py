@@ -0,0 +1,70 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Keeps track of `edit.format` requests in flight.
+'''
+
+from threading import Lock
+import time
+
+from Dart.lib.perf import Samples
+
+
+class FormatRequest(object):
+    def __init__(self, request_id, view_id, version, on_save=False):
+        '''
+        @version
+          The view's change count when the request was made. Results are
+          only good for this version of the buffer.
+
+        @on_save
+          Whether the request was made because the file was saved.
+        '''
+        self.request_id = request_id
+        self.view_id = view_id
+        self.version = version
+        self.on_save = on_save
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+class FormatRequests(object):
+    '''Formatting requests in flight, at most one per view.
+
+    A newer request for a view supersedes the older one, whose response will
+    be ignored.
+    '''
+
+    def __init__(self):
+        self.lock = Lock()
+        # view id -> FormatRequest
+        self._requests = {}
+        # Time from request to response, in ms.
+        self.latency = Samples()
+        self.superseded = 0
+
+    def add(self, request):
+        with self.lock:
+            if request.view_id in self._requests:
+                self.superseded += 1
+            self._requests[request.view_id] = request
+
+    def complete(self, request_id):
+        '''Returns the `FormatRequest` for @request_id, or `None` if it's
+        unknown or has been superseded.
+        '''
+        with self.lock:
+            for view_id, request in self._requests.items():
+                if request.request_id == request_id:
+                    del self._requests[view_id]
+                    break
+            else:
+                return
+
+        self.latency.add(request.elapsed_ms)
+        return request
@@ -0,0 +1,170 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Semantic highlighting based on `analysis.highlights` notifications.
+
+The syntax definition already takes care of keywords, literals and comments,
+so we only paint what it can't know about, like whether an identifier names
+a type, a field or a local variable. Highlight regions are grouped and each
+group is painted under its own region key.
+'''
+
+from bisect import bisect_left
+from bisect import bisect_right
+from threading import Lock
+
+from Dart.lib.analyzer.api.protocol import HighlightRegionType as T
+from Dart.lib.perf import Samples
+
+
+REGION_KEY_PREFIX = 'dart.highlights.'
+
+# group -> (scope, highlight region types)
+HIGHLIGHT_GROUPS = {
+    'type': ('support.class.dart', (
+        T.CLASS, T.ENUM, T.FUNCTION_TYPE_ALIAS)),
+    'type_parameter': ('support.type.dart', (
+        T.TYPE_PARAMETER,)),
+    'annotation': ('storage.type.annotation.dart', (
+        T.ANNOTATION,)),
+    'constant': ('constant.other.dart', (
+        T.ENUM_CONSTANT,)),
+    'import_prefix': ('entity.name.namespace.dart', (
+        T.IMPORT_PREFIX,)),
+    'function': ('entity.name.function.dart', (
+        T.CONSTRUCTOR, T.FUNCTION, T.FUNCTION_DECLARATION,
+        T.METHOD, T.METHOD_DECLARATION, T.METHOD_STATIC,
+        T.METHOD_DECLARATION_STATIC,
+        T.INSTANCE_METHOD_DECLARATION, T.INSTANCE_METHOD_REFERENCE,
+        T.STATIC_METHOD_DECLARATION, T.STATIC_METHOD_REFERENCE,
+        T.TOP_LEVEL_FUNCTION_DECLARATION, T.TOP_LEVEL_FUNCTION_REFERENCE,
+        T.LOCAL_FUNCTION_DECLARATION, T.LOCAL_FUNCTION_REFERENCE)),
+    'field': ('variable.other.member.dart', (
+        T.FIELD, T.GETTER_DECLARATION, T.SETTER_DECLARATION,
+        T.INSTANCE_FIELD_DECLARATION, T.INSTANCE_FIELD_REFERENCE,
+        T.INSTANCE_GETTER_DECLARATION, T.INSTANCE_GETTER_REFERENCE,
+        T.INSTANCE_SETTER_DECLARATION, T.INSTANCE_SETTER_REFERENCE)),
+    'static_field': ('variable.other.global.dart', (
+        T.FIELD_STATIC, T.TOP_LEVEL_VARIABLE,
+        T.STATIC_FIELD_DECLARATION,
+        T.STATIC_GETTER_DECLARATION, T.STATIC_GETTER_REFERENCE,
+        T.STATIC_SETTER_DECLARATION, T.STATIC_SETTER_REFERENCE,
+        T.TOP_LEVEL_GETTER_DECLARATION, T.TOP_LEVEL_GETTER_REFERENCE,
+        T.TOP_LEVEL_SETTER_DECLARATION, T.TOP_LEVEL_SETTER_REFERENCE)),
+    'parameter': ('variable.parameter.dart', (
+        T.PARAMETER, T.PARAMETER_DECLARATION, T.PARAMETER_REFERENCE,
+        T.DYNAMIC_PARAMETER_DECLARATION, T.DYNAMIC_PARAMETER_REFERENCE)),
+    'local': ('variable.other.local.dart', (
+        T.LOCAL_VARIABLE, T.LOCAL_VARIABLE_DECLARATION,
+        T.LOCAL_VARIABLE_REFERENCE,
+        T.DYNAMIC_LOCAL_VARIABLE_DECLARATION,
+        T.DYNAMIC_LOCAL_VARIABLE_REFERENCE)),
+}
+
+_GROUP_BY_TYPE = {t: group for (group, (_, types)) in HIGHLIGHT_GROUPS.items()
+                           for t in types}
+
+# Files with more regions than this get their costs logged every time.
+LARGE_FILE_REGIONS = 5000
+
+
+def region_key(group):
+    return REGION_KEY_PREFIX + group
+
+
+def group_regions(regions):
+    '''Returns a dict mapping groups to sorted tuples of (begin, end) pairs.
+
+    @regions
+      A list of `HighlightRegion`s.
+    '''
+    groups = {}
+    for r in regions:
+        group = _GROUP_BY_TYPE.get(r.type)
+        if group:
+            groups.setdefault(group, []).append((r.offset, r.offset + r.length))
+    return {group: tuple(sorted(spans)) for (group, spans) in groups.items()}
+
+
+def split_visible(spans, begin, end):
+    '''Returns the @spans overlapping [@begin, @end] and whether any were
+    left out.
+
+    @spans
+      Sorted (begin, end) pairs.
+    '''
+    # Highlight regions are short, so a span starting a line or so before
+    # the viewport is the worst case we care about.
+    lo = bisect_left(spans, (max(begin - 200, 0),))
+    hi = bisect_right(spans, (end, float('inf')))
+    visible = [s for s in spans[lo:hi] if s[1] >= begin]
+    return visible, len(visible) < len(spans)
+
+
+class HighlightStats(object):
+    '''Tracks the cost of processing highlights.
+    '''
+
+    def __init__(self):
+        # Time spent grouping and diffing each notification.
+        self.process_ms = Samples()
+        # Time spent painting each notification on the UI thread.
+        self.paint_ms = Samples()
+        # Fraction of region sets re-applied per notification.
+        self.churn = Samples()
+        self.regions_applied = 0
+        self.regions_skipped = 0
+
+    def summary(self):
+        churn = self.churn.mean()
+        return ('process: {}; paint: {}; churn: {}; regions applied/skipped: '
+                '{}/{}').format(
+                    self.process_ms.summary(), self.paint_ms.summary(),
+                    '{:.0%}'.format(churn) if churn is not None else '-',
+                    self.regions_applied, self.regions_skipped)
+
+
+class HighlightsCache(object):
+    '''Remembers the region sets last painted for each file.
+    '''
+
+    def __init__(self):
+        self.lock = Lock()
+        # path -> {group: spans}
+        self._files = {}
+        self.stats = HighlightStats()
+
+    def update(self, path, regions):
+        '''Records the new @regions for @path.
+
+        Returns a dict with the groups whose spans changed and a list of
+        groups that are gone.
+        '''
+        groups = group_regions(regions)
+        with self.lock:
+            old = self._files.get(path, {})
+            self._files[path] = groups
+
+        changed = {group: spans for (group, spans) in groups.items()
+                   if old.get(group) != spans}
+        removed = [group for group in old if group not in groups]
+
+        total = len(set(groups) | set(old))
+        self.stats.churn.add((len(changed) + len(removed)) / total
+                             if total else 0)
+        self.stats.regions_applied += sum(len(s) for s in changed.values())
+        self.stats.regions_skipped += sum(len(s) for (g, s) in groups.items()
+                                          if g not in changed)
+        return changed, removed
+
+    def get(self, path):
+        '''Returns the spans last recorded for @path, by group.
+        '''
+        with self.lock:
+            return dict(self._files.get(path, {}))
+
+    def remove(self, path):
+        with self.lock:
+            self._files.pop(path, None)
@@ -0,0 +1,185 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Caches hover information received from the analysis server.
+'''
+
+from bisect import bisect_left
+from bisect import bisect_right
+from collections import OrderedDict
+from threading import Lock
+import html
+
+
+class HoverRequest(object):
+    '''An `analysis.getHover` request waiting for its response.
+    '''
+
+    def __init__(self, path, version, offset, show):
+        '''
+        @path
+          File the request was made for.
+
+        @version
+          The view's change count when the request was made.
+
+        @offset
+          Offset the request was made for.
+
+        @show
+          Whether the user is waiting for a popup.
+        '''
+        self.path = path
+        self.version = version
+        self.offset = offset
+        self.show = show
+
+
+class FileHovers(object):
+    '''Hover information for a single version of a file.
+
+    The server tells us the span each piece of hover information applies to,
+    so one response covers every offset in that span.
+    '''
+
+    def __init__(self, version):
+        self.version = version
+        # Sorted (start, end, hovers) tuples.
+        self.spans = []
+        # Offsets the server returned no information for.
+        self.misses = set()
+
+    def add(self, offset, hovers):
+        if not hovers:
+            self.misses.add(offset)
+            return
+
+        start = hovers[0].offset
+        end = start + hovers[0].length
+        # A bare (start, end) key sorts before any span with the same bounds.
+        i = bisect_left(self.spans, (start, end))
+        if i < len(self.spans) and self.spans[i][:2] == (start, end):
+            self.spans[i] = (start, end, hovers)
+            return
+        self.spans.insert(i, (start, end, hovers))
+
+    def lookup(self, offset):
+        '''Returns the hover information for @offset.
+
+        Returns `None` if nothing is known about @offset; an empty list if the
+        server had nothing to say about it.
+        '''
+        if offset in self.misses:
+            return []
+
+        i = bisect_right(self.spans, (offset, float('inf')))
+        while i > 0:
+            i -= 1
+            start, end, hovers = self.spans[i]
+            if start <= offset <= end:
+                return hovers
+            if end < offset:
+                # Spans don't nest much; no need to look further back.
+                break
+
+
+class HoverCache(object):
+    '''Hover information keyed by file, file version and offset range.
+
+    Only the most recent version of each file is kept.
+    '''
+
+    MAX_FILES = 20
+    MAX_PENDING = 100
+
+    def __init__(self):
+        self.lock = Lock()
+        self._files = OrderedDict()
+        self._pending = OrderedDict()
+
+    def lookup(self, path, version, offset):
+        '''Returns the cached hover information for @offset, `[]` if there's
+        none, or `None` if we need to ask the server.
+        '''
+        with self.lock:
+            hovers = self._files.get(path)
+            if hovers is None or hovers.version != version:
+                return
+            self._files.move_to_end(path)
+            return hovers.lookup(offset)
+
+    def is_pending(self, path, version, offset):
+        with self.lock:
+            return any((r.path == path and r.version == version and
+                        r.offset == offset)
+                       for r in self._pending.values())
+
+    def add_request(self, request_id, request):
+        with self.lock:
+            self._pending[request_id] = request
+            while len(self._pending) > self.MAX_PENDING:
+                self._pending.popitem(last=False)
+
+    def complete(self, request_id, hovers):
+        '''Stores the @hovers received for @request_id.
+
+        Returns the original `HoverRequest`, or `None` if we don't know about
+        @request_id.
+        '''
+        with self.lock:
+            request = self._pending.pop(request_id, None)
+            if request is None:
+                return
+
+            file_hovers = self._files.get(request.path)
+            if file_hovers is None or file_hovers.version < request.version:
+                file_hovers = FileHovers(request.version)
+                self._files[request.path] = file_hovers
+            elif file_hovers.version > request.version:
+                # Stale response; don't store it.
+                return request
+
+            file_hovers.add(request.offset, hovers)
+            self._files.move_to_end(request.path)
+            while len(self._files) > self.MAX_FILES:
+                self._files.popitem(last=False)
+            return request
+
+    def invalidate(self, path):
+        with self.lock:
+            self._files.pop(path, None)
+
+    def clear(self):
+        '''Forgets the hover information for all files.
+
+        Types and docs shown for a file depend on the files it imports, so
+        any edit may make any entry wrong.
+        '''
+        with self.lock:
+            self._files.clear()
+
+
+def format_hover(hover):
+    '''Returns minihtml for a `HoverInformation`.
+    '''
+    parts = []
+    if hover.elementDescription:
+        parts.append('<b>{}</b>'.format(html.escape(hover.elementDescription)))
+    elif hover.staticType:
+        parts.append('<b>{}</b>'.format(html.escape(hover.staticType)))
+
+    if hover.containingLibraryName:
+        parts.append('<i>{}</i>'.format(html.escape(hover.containingLibraryName)))
+
+    if hover.propagatedType and hover.propagatedType != hover.staticType:
+        parts.append('propagated type: {}'.format(html.escape(hover.propagatedType)))
+
+    if hover.parameter:
+        parts.append('parameter: {}'.format(html.escape(hover.parameter)))
+
+    if hover.dartdoc:
+        parts.append(html.escape(hover.dartdoc).replace('\n', '<br>'))
+
+    return '<br><br>'.join(parts)
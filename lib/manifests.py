@@ -0,0 +1,146 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Parsed pubspec.yaml and pubspec.lock files, shared by the whole plugin.
+
+Parsing YAML in pure Python is slow, and lock files can be large, so each
+file is parsed once and kept until its mtime or size change. Checking that
+costs a `stat` call.
+'''
+
+from threading import Lock
+from threading import Thread
+import os
+
+from Dart.sublime_plugin_lib import PluginLogger
+from Dart.lib.pub_yaml import load
+
+
+_logger = PluginLogger(__name__)
+
+
+def get_stamp(path):
+    '''Returns a value that changes when the file at @path changes.
+
+    Raises `OSError` if the file doesn't exist.
+    '''
+    st = os.stat(path)
+    return (st.st_mtime, st.st_size)
+
+
+def load_yaml(path):
+    with open(path, 'rt', encoding='utf-8') as f:
+        return load(f.read())
+
+
+class LockIndex(object):
+    '''The packages in a pubspec.lock file, by name.
+    '''
+
+    def __init__(self, versions):
+        # name -> version string, or `None`
+        self.versions = versions
+
+    def has(self, name, version=None):
+        '''Returns `True` if @name is locked, and at @version if given.
+        '''
+        if name not in self.versions:
+            return False
+        return version is None or self.versions[name] == version
+
+    def get_version(self, name):
+        return self.versions.get(name)
+
+    @classmethod
+    def from_data(cls, data):
+        packages = (data or {}).get('packages') or {}
+        return cls({name: str(info['version'])
+                            if info and info.get('version') is not None
+                            else None
+                    for (name, info) in packages.items()})
+
+
+def parse_pubspec(path):
+    return load_yaml(path) or {}
+
+
+def parse_lock(path):
+    return LockIndex.from_data(load_yaml(path))
+
+
+class ManifestCache(object):
+    '''Keeps the result of parsing files until they change.
+    '''
+
+    def __init__(self, stamp=get_stamp):
+        self.lock = Lock()
+        self.stamp = stamp
+        # path -> (stamp, parsed data)
+        self._entries = {}
+
+    def get(self, path, parse):
+        '''Returns `parse(path)`, reusing the previous result if the file
+        hasn't changed since.
+
+        Raises `OSError` if the file doesn't exist.
+        '''
+        stamp = self.stamp(path)
+        with self.lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        _logger.debug('parsing %s', path)
+        data = parse(path)
+        with self.lock:
+            self._entries[path] = (stamp, data)
+        return data
+
+    def refresh(self, path, parse):
+        '''Parses @path again now if it has changed, or forgets it if it's
+        gone.
+        '''
+        try:
+            self.get(path, parse)
+        except OSError:
+            self.invalidate(path)
+        except Exception as e:
+            # Probably saved half-way through an edit; parse on next use.
+            _logger.debug('could not parse %s: %r', path, e)
+            self.invalidate(path)
+
+    def refresh_async(self, path, parse):
+        '''Like `refresh`, but in a background thread, so that the next
+        lookup finds the file parsed already.
+        '''
+        t = Thread(target=self.refresh, args=(path, parse),
+                   name='Dart-ManifestRefresh-thread')
+        t.daemon = True
+        t.start()
+        return t
+
+    def invalidate(self, path=None):
+        with self.lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# The plugin's parsed manifests.
+manifests = ManifestCache()
+
+
+def refresh_manifests_async(parent):
+    '''Reparses the pubspec.yaml and pubspec.lock files in @parent in the
+    background.
+    '''
+    return (manifests.refresh_async(os.path.join(parent, 'pubspec.yaml'),
+                                    parse_pubspec),
+            manifests.refresh_async(os.path.join(parent, 'pubspec.lock'),
+                                    parse_lock))
@@ -0,0 +1,133 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Helpers to find out what the plugin keeps in memory.
+
+`tracemalloc` isn't available in the Python version embedded in older
+Sublime Text builds, so object counts by type are also available: they're
+cheaper, and often enough to spot a leak.
+'''
+
+from collections import Counter
+from collections import deque
+import gc
+import sys
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+# Stop walking big structures after this many objects.
+MAX_OBJECTS = 200000
+
+
+def approx_size(obj, limit=MAX_OBJECTS):
+    '''Returns the approximate number of bytes used by @obj and the objects
+    it contains, counting shared objects once.
+
+    Containers and instance attributes are followed; other references
+    aren't.
+    '''
+    seen = set()
+    total = 0
+    pending = [obj]
+    while pending and len(seen) < limit:
+        o = pending.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        try:
+            total += sys.getsizeof(o)
+        except TypeError:
+            continue
+
+        if isinstance(o, (str, bytes, int, float, bool, type(None))):
+            continue
+        try:
+            if isinstance(o, dict):
+                pending.extend(list(o.keys()))
+                pending.extend(list(o.values()))
+            elif isinstance(o, (list, tuple, set, frozenset, deque)):
+                pending.extend(list(o))
+            elif hasattr(o, '__dict__') and not isinstance(o, type):
+                pending.append(o.__dict__)
+        except RuntimeError:
+            # Changed by another thread while we were looking.
+            continue
+    return total
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return '{:.0f}{}'.format(size, unit)
+        size /= 1024
+    return '{:.1f}GB'.format(size)
+
+
+def report_structures(items):
+    '''Returns a table for @items.
+
+    @items
+      (name, count, obj) tuples; the size of obj is estimated.
+    '''
+    lines = ['{:<40} {:>8} {:>10}'.format('structure', 'count', 'approx')]
+    for name, count, obj in items:
+        lines.append('{:<40} {:>8} {:>10}'.format(
+                        name, '-' if count is None else count,
+                        '-' if obj is None else format_size(approx_size(obj))))
+    return '\n'.join(lines)
+
+
+def count_types(prefix='Dart.'):
+    '''Returns a `Counter` of live objects whose class is defined in a
+    module starting with @prefix.
+    '''
+    counts = Counter()
+    for o in gc.get_objects():
+        cls = type(o)
+        module = getattr(cls, '__module__', None)
+        # Some types have descriptors or other odd objects in __module__.
+        if isinstance(module, str) and module.startswith(prefix):
+            counts[module + '.' + cls.__name__] += 1
+    return counts
+
+
+def diff_counts(old, new, top=30):
+    '''Returns (name, count, change) tuples for the types whose counts
+    changed the most between @old and @new.
+    '''
+    changes = [(name, new.get(name, 0), new.get(name, 0) - old.get(name, 0))
+               for name in set(old) | set(new)]
+    changes = [c for c in changes if c[2]]
+    changes.sort(key=lambda c: (-abs(c[2]), c[0]))
+    return changes[:top]
+
+
+def take_snapshot(path_fragment):
+    '''Returns a tracemalloc snapshot of the memory allocated by files whose
+    path contains @path_fragment, or `None` if tracemalloc isn't available.
+
+    Tracing is started if needed; only allocations made after that are seen.
+    '''
+    if tracemalloc is None:
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(10)
+    return tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(True, '*' + path_fragment + '*')])
+
+
+def diff_snapshots(old, new, top=20):
+    '''Returns text lines for the allocation sites that grew the most.
+    '''
+    return [str(stat) for stat in new.compare_to(old, 'lineno')[:top]]
+
+
+def stop_tracing():
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        tracemalloc.stop()
@@ -1,5 +1,6 @@
 import sublime
 
+from Dart.lib.hover import format_hover
 from Dart.sublime_plugin_lib.sublime import after
 
 
@@ -24,6 +25,15 @@ STATUS_TEMPLATE = """
 </div>
 """
 
+HOVER_TEMPLATE = """
+<style type="text/css">
+    html { background-color: #F5F5F5 }
+</style>
+<div>
+    %s
+</div>
+"""
+
 TOOLTIP_ID = 0
 
 
@@ -49,6 +59,10 @@ def show_analysis_tooltip(content, view=None, location=-1, timeout=0):
     show_tooltip(ERROR_TEMPLATE % content, view, location, timeout)
 
 
+def show_hover_tooltip(hover, view=None, location=-1, timeout=0):
+    show_tooltip(HOVER_TEMPLATE % format_hover(hover), view, location, timeout)
+
+
 def show_tooltip(content, view=None, location=-1, timeout=0):
     '''
     Shows a tooltip.
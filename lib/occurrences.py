@@ -0,0 +1,81 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Tables of element occurrences built from `analysis.occurrences`
+notifications.
+'''
+
+from bisect import bisect_right
+from threading import Lock
+
+
+class OccurrenceTable(object):
+    '''Finds all the occurrences of the element at a given offset.
+    '''
+
+    def __init__(self, occurrences):
+        '''
+        @occurrences
+          A list of `Occurrences`.
+        '''
+        # One tuple of (offset, length) pairs per element.
+        self.groups = []
+        spans = []
+        for occ in occurrences:
+            group = tuple((offset, occ.length) for offset in sorted(occ.offsets))
+            for offset, length in group:
+                spans.append((offset, offset + length, len(self.groups)))
+            self.groups.append(group)
+        spans.sort()
+        self.starts = [s[0] for s in spans]
+        self.spans = spans
+
+    def lookup(self, offset):
+        '''Returns the (offset, length) pairs for every occurrence of the
+        element at @offset, or an empty tuple.
+
+        The caret may sit right after the element's name.
+        '''
+        i = bisect_right(self.starts, offset) - 1
+        # Spans don't overlap, but a span can end where the next one starts.
+        while i >= 0:
+            start, end, group = self.spans[i]
+            if end < offset:
+                break
+            if start <= offset <= end:
+                return self.groups[group]
+            i -= 1
+        return ()
+
+
+class OccurrencesCache(object):
+    '''Keeps an `OccurrenceTable` per file.
+    '''
+
+    def __init__(self):
+        self.lock = Lock()
+        self._tables = {}
+
+    def update(self, path, occurrences):
+        table = OccurrenceTable(occurrences)
+        with self.lock:
+            self._tables[path] = table
+        return table
+
+    def get(self, path):
+        with self.lock:
+            return self._tables.get(path)
+
+    def remove(self, path):
+        with self.lock:
+            self._tables.pop(path, None)
+
+    def retain(self, paths):
+        '''Drops the tables for files not in @paths.
+        '''
+        paths = set(paths)
+        with self.lock:
+            for path in [p for p in self._tables if p not in paths]:
+                del self._tables[path]
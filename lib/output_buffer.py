@@ -0,0 +1,104 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Collects process output for output panels to write in batches.
+
+Processes may print faster than the UI thread can write to a view. Chunks
+are collected as they arrive on the reader threads, and the UI thread is
+asked to write them at most every `FLUSH_DELAY_MS`, or sooner once
+`FLUSH_SIZE` bytes are waiting. If the UI thread falls behind, the oldest
+waiting chunks are dropped and counted.
+'''
+
+from threading import Lock
+
+
+# How long to wait for more output before writing to the panel.
+FLUSH_DELAY_MS = 50
+# Write at once when this many bytes are waiting.
+FLUSH_SIZE = 64 * 1024
+# Drop the oldest output when this many bytes are waiting.
+MAX_PENDING = 4 * 1024 * 1024
+
+_NOT_SCHEDULED, _SCHEDULED, _SCHEDULED_NOW = range(3)
+
+
+class OutputBuffer(object):
+    '''Output waiting to be written, in arrival order.
+
+    `add` is called from any thread; `take` from the thread writing the
+    output.
+    '''
+
+    def __init__(self, flush_size=FLUSH_SIZE, max_pending=MAX_PENDING):
+        self.lock = Lock()
+        self.flush_size = flush_size
+        self.max_pending = max_pending
+        # [(source, data)]
+        self._chunks = []
+        self._size = 0
+        self._state = _NOT_SCHEDULED
+        # Bytes dropped since the last `take`.
+        self._dropped = 0
+
+    def add(self, source, data):
+        '''Adds @data, output by @source.
+
+        Returns the delay in milliseconds after which `take` should be
+        called, or `None` if a call has been requested already.
+        '''
+        with self.lock:
+            self._chunks.append((source, data))
+            self._size += len(data)
+            while self._size > self.max_pending and len(self._chunks) > 1:
+                dropped = self._chunks.pop(0)[1]
+                self._size -= len(dropped)
+                self._dropped += len(dropped)
+
+            if self._state == _NOT_SCHEDULED:
+                if self._size >= self.flush_size:
+                    self._state = _SCHEDULED_NOW
+                    return 0
+                self._state = _SCHEDULED
+                return FLUSH_DELAY_MS
+            if self._state == _SCHEDULED and self._size >= self.flush_size:
+                self._state = _SCHEDULED_NOW
+                return 0
+
+    def take(self):
+        '''Returns the waiting output as `[(source, data)]`, with chunks from
+        the same source joined, and the number of bytes dropped.
+        '''
+        with self.lock:
+            chunks, self._chunks = self._chunks, []
+            dropped, self._dropped = self._dropped, 0
+            self._size = 0
+            self._state = _NOT_SCHEDULED
+
+        joined = []
+        for source, data in chunks:
+            if joined and joined[-1][0] is source:
+                joined[-1][1].append(data)
+            else:
+                joined.append((source, [data]))
+        return [(s, b''.join(parts)) for (s, parts) in joined], dropped
+
+    def __len__(self):
+        return self._size
+
+
+def keep_last_lines(text, max_lines):
+    '''Returns the last @max_lines lines in @text, and the number of
+    characters cut off.
+    '''
+    end = len(text)
+    # A final line break doesn't start a line.
+    if text.endswith('\n'):
+        end -= 1
+    for i in range(max_lines):
+        end = text.rfind('\n', 0, end)
+        if end < 0:
+            return text, 0
+    return text[end + 1:], end + 1
@@ -0,0 +1,83 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Applies per-file edits from the server to many files of a package.
+'''
+
+import time
+
+from Dart.lib.error import ChangeConflictError
+from Dart.lib.perf import Samples
+from Dart.lib.source_changes import is_stamp_current
+from Dart.lib.source_edits import apply_edits
+from Dart.lib.source_edits import to_command_args
+
+
+def write_file_edit(path, file_edit):
+    '''Applies @file_edit to the file at @path with one read and one write.
+
+    Returns `True` if the file was written, `False` if there was nothing to
+    change. Raises `ChangeConflictError` if the file changed since the edit
+    was computed or can't be read or written.
+    '''
+    if not file_edit.edits:
+        return False
+
+    if not is_stamp_current(path, file_edit.fileStamp):
+        raise ChangeConflictError('file changed since the edit was computed')
+
+    try:
+        with open(path, 'rt', encoding='utf-8', newline='') as f:
+            text = f.read()
+        new_text = apply_edits(text, to_command_args(file_edit.edits))
+        if new_text == text:
+            return False
+        with open(path, 'wt', encoding='utf-8', newline='') as f:
+            f.write(new_text)
+    except (OSError, UnicodeDecodeError) as e:
+        raise ChangeConflictError(str(e))
+    return True
+
+
+class BatchStats(object):
+    '''Counts the outcome of a package-wide batch of requests and how long
+    they took.
+    '''
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.done = 0
+        self.changed = 0
+        # [(path, message)]
+        self.failed = []
+        self.latencies = Samples(size=1000)
+
+    def add(self, path, ms, changed=False, error=None):
+        self.done += 1
+        self.latencies.add(ms)
+        if error:
+            self.failed.append((path, error))
+        elif changed:
+            self.changed += 1
+
+    @property
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def summary(self, total, elapsed_ms=None):
+        '''Returns a text summary.
+
+        @total
+          Number of files in the batch; fewer may be done if it was
+          cancelled.
+        '''
+        elapsed_ms = self.elapsed_ms if elapsed_ms is None else elapsed_ms
+        rate = self.done / (elapsed_ms / 1000) if elapsed_ms else 0
+        return '\n'.join([
+            '{}/{} files, {} changed, {} failed in {:.0f}ms ({:.1f} files/s)'
+                .format(self.done, total, self.changed, len(self.failed),
+                        elapsed_ms, rate),
+            'Latency: ' + self.latencies.summary(),
+            ])
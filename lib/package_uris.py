@@ -0,0 +1,314 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Maps `package:` and `file:` URIs to paths and back.
+
+Dart tools report locations as URIs, which the editor can't open. Each pub
+package gets a map from package names to `lib` directories, read from its
+.packages file or, for older SDKs, its packages/ directory. Maps are kept
+until pubspec.lock, .packages or packages/ change, and every URI or path
+looked up through a map is remembered, so that output with many locations
+costs a dictionary lookup per location.
+
+URIs the map doesn't know about may be passed on to the analysis server
+(execution.mapUri); answers are added to the map when they arrive.
+'''
+
+from threading import Lock
+from urllib.parse import unquote
+from urllib.parse import urljoin
+from urllib.parse import urlparse
+from urllib.request import pathname2url
+from urllib.request import url2pathname
+import os
+import re
+
+from Dart.sublime_plugin_lib import PluginLogger
+from Dart.lib.manifests import ManifestCache
+from Dart.lib.manifests import get_stamp
+from Dart.lib.project_registry import registry
+
+
+_logger = PluginLogger(__name__)
+
+
+# A `package:` or `file:` URI in tool output, up to the line and column.
+_URI = r'''(?:package:|file://)(?:/[A-Za-z]:)?[^\s():'"]+'''
+_LOCATION = re.compile(_URI)
+# How the VM reported errors before it switched to "uri:line:col".
+_VM_ERROR = re.compile(r"'(" + _URI + r")': error: line (\d+) pos (\d+): ")
+
+# Matches the locations in output rewritten by `rewrite_locations`, as well
+# as "path line:col" locations in traces formatted by package:stack_trace.
+# Only absolute paths at the start of a word count, so that unresolved URIs
+# aren't taken for paths. Suitable for `result_file_regex`.
+LOCATION_REGEX = (r'''(?:^|(?<=[\s('"]))((?:[A-Za-z]:)?[\\/][^:()'"\n]*?'''
+                  r'''\.dart)[: ](\d+):(\d+)(?:: (.*))?''')
+
+
+def file_uri_to_path(uri):
+    return url2pathname(unquote(urlparse(uri).path))
+
+
+def path_to_file_uri(path):
+    url = pathname2url(path)
+    if not url.startswith('//'):
+        url = '//' + url
+    return 'file:' + url
+
+
+def read_dot_packages(path):
+    '''Returns the package name -> `lib` directory map in the .packages
+    file at @path.
+    '''
+    base = path_to_file_uri(os.path.dirname(path)) + '/'
+    packages = {}
+    with open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name, sep, uri = line.partition(':')
+            if not sep:
+                continue
+            uri = urljoin(base, uri)
+            if not uri.startswith('file:'):
+                continue
+            packages[name] = os.path.normpath(file_uri_to_path(uri))
+    return packages
+
+
+def read_packages_dir(path):
+    '''Returns the package name -> `lib` directory map for the packages/
+    directory at @path, whose entries link to `lib` directories.
+    '''
+    packages = {}
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return packages
+    for name in names:
+        target = os.path.join(path, name)
+        if os.path.isdir(target):
+            packages[name] = os.path.realpath(target)
+    return packages
+
+
+class PackageMap(object):
+    '''The packages visible from a pub package, by name.
+    '''
+
+    def __init__(self, root, packages):
+        self.root = root
+        # name -> lib directory
+        self.packages = packages
+        # lib directory -> name
+        self._names = {d: n for (n, d) in packages.items()}
+        # uri -> path, path -> uri
+        self._paths = {}
+        self._uris = {}
+        # URIs the server has been asked about. Kept here so that they're
+        # asked about again once the packages change.
+        self.asked = set()
+
+    def add(self, uri, path):
+        '''Remembers that @uri and @path name the same file.
+        '''
+        self._paths[uri] = path
+        self._uris[path] = uri
+
+    def to_path(self, uri):
+        '''Returns the path @uri refers to, or `None` if it isn't known.
+        '''
+        try:
+            return self._paths[uri]
+        except KeyError:
+            pass
+
+        path = None
+        if uri.startswith('package:'):
+            name, sep, rest = uri[len('package:'):].partition('/')
+            lib = self.packages.get(name)
+            if lib is not None and sep:
+                path = os.path.join(lib, *unquote(rest).split('/'))
+        elif uri.startswith('file:'):
+            path = file_uri_to_path(uri)
+
+        if path is not None:
+            self.add(uri, path)
+        return path
+
+    def to_uri(self, path):
+        '''Returns the `package:` URI for @path if it's in a package's `lib`
+        directory, or else its `file:` URI.
+        '''
+        try:
+            return self._uris[path]
+        except KeyError:
+            pass
+
+        uri = None
+        parts = []
+        d = path
+        while True:
+            d, tail = os.path.split(d)
+            if not tail:
+                break
+            parts.append(tail)
+            name = self._names.get(d)
+            if name is not None:
+                uri = 'package:{}/{}'.format(name, '/'.join(reversed(parts)))
+                break
+
+        if uri is None:
+            uri = path_to_file_uri(path)
+        self.add(uri, path)
+        return uri
+
+    def __len__(self):
+        return len(self._paths)
+
+
+def get_packages_stamp(root):
+    '''Returns a value that changes when the packages visible from @root
+    may have changed.
+    '''
+    stamps = []
+    for name in ('pubspec.lock', '.packages', 'packages'):
+        try:
+            stamps.append(get_stamp(os.path.join(root, name)))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def load_package_map(root):
+    dot_packages = os.path.join(root, '.packages')
+    try:
+        packages = read_dot_packages(dot_packages)
+    except OSError:
+        packages = read_packages_dir(os.path.join(root, 'packages'))
+    return PackageMap(root, packages)
+
+
+class PackageUriResolver(object):
+    '''Keeps a `PackageMap` for each pub package.
+    '''
+
+    def __init__(self, stamp=get_packages_stamp):
+        self.lock = Lock()
+        self._maps = ManifestCache(stamp=stamp)
+        # Called as `server_lookup(root, uri, callback)` for URIs that can't
+        # be resolved locally; the callback takes a path or `None`.
+        self.server_lookup = None
+
+    def get_map(self, root):
+        '''Returns the `PackageMap` for the package at @root, reading it
+        again if it may have changed.
+        '''
+        return self._maps.get(root, load_package_map)
+
+    def to_path(self, uri, root):
+        '''Returns the path for @uri as seen from the package at @root, or
+        `None`.
+        '''
+        package_map = self.get_map(root)
+        path = package_map.to_path(uri)
+        if path is None:
+            self.ask_server(uri, package_map)
+        return path
+
+    def to_uri(self, path, root=None):
+        root = root or registry.find_root(os.path.dirname(path))
+        if root is None:
+            return path_to_file_uri(path)
+        return self.get_map(root).to_uri(path)
+
+    def ask_server(self, uri, package_map):
+        '''Has the server resolve @uri, if there's a server, so that
+        @package_map knows it next time.
+        '''
+        lookup = self.server_lookup
+        if lookup is None or not uri.startswith('package:'):
+            return
+        with self.lock:
+            if uri in package_map.asked:
+                return
+            package_map.asked.add(uri)
+
+        def on_path(path):
+            if path:
+                package_map.add(uri, path)
+
+        lookup(package_map.root, uri, on_path)
+
+    def invalidate(self, root=None):
+        self._maps.invalidate(root)
+
+
+def rewrite_locations(text, package_map):
+    '''Replaces the URIs in @text that @package_map can resolve with paths.
+
+    VM errors reported as "'uri': error: line L pos C: message" are
+    rewritten as "path:L:C: error: message", like other tools report them.
+    '''
+    def vm_error(m):
+        path = package_map.to_path(m.group(1))
+        if path is None:
+            return m.group()
+        return '{}:{}:{}: error: '.format(path, m.group(2), m.group(3))
+
+    def location(m):
+        return package_map.to_path(m.group()) or m.group()
+
+    if "': error: line " in text:
+        text = _VM_ERROR.sub(vm_error, text)
+    if 'package:' in text or 'file:' in text:
+        text = _LOCATION.sub(location, text)
+    return text
+
+
+class LocationRewriter(object):
+    '''Rewrites locations in output that arrives in chunks.
+
+    Text is passed on a line at a time, so that locations split across
+    chunks are seen whole.
+    '''
+
+    def __init__(self, resolver, root):
+        self.resolver = resolver
+        self.root = root
+        self._pending = ''
+
+    def _rewrite(self, text):
+        try:
+            package_map = self.resolver.get_map(self.root)
+        except Exception as e:
+            _logger.debug('cannot read packages for %s: %r', self.root, e)
+            return text
+        text = rewrite_locations(text, package_map)
+        for m in _LOCATION.finditer(text):
+            self.resolver.ask_server(m.group(), package_map)
+        return text
+
+    def feed(self, text):
+        '''Returns the rewritten text up to the last line break seen so far.
+        '''
+        end = text.rfind('\n') + 1
+        if not end:
+            self._pending += text
+            return ''
+        text, self._pending = self._pending + text[:end], text[end:]
+        return self._rewrite(text)
+
+    def flush(self):
+        '''Returns the rest of the text.
+        '''
+        text, self._pending = self._pending, ''
+        return self._rewrite(text) if text else ''
+
+
+# The plugin's resolver.
+uri_resolver = PackageUriResolver()
@@ -3,11 +3,12 @@
 # license that can be found in the LICENSE file.)
 
 from functools import wraps
-import os
 
 from sublime import View
 
 from Dart.sublime_plugin_lib.path import extension_equals
+from Dart.lib.project_registry import realpath
+from Dart.lib.project_registry import registry
 
 
 def is_view_dart_script(view):
@@ -40,31 +41,18 @@ def is_dart_script(path):
     return extension_equals(path, '.dart')
 
 
-# TODO(guillermooo): duplicated (find_pubspec)?
-def find_pubspec_path(path, original=None):
+def find_pubspec_path(path):
     """Locates the directory containing a pubspec.yaml file.
 
-    Returns (str, bool): A path, and whether a pubspec.yaml was found. If no
-    pubspec.yaml was found, the path will be passed-in path.
+    Returns the directory, or `None` if no pubspec.yaml was found. Results
+    are cached by the project registry.
     """
-    if os.path.exists(os.path.join(path, 'pubspec.yaml')):
-        return path
-
-    if original is None:
-        original = path
-
-    p = os.path.dirname(path)
-
-    # Reached drive unit; stop.
-    if p == os.path.dirname(p):
-        return
-
-    return find_pubspec_path(p, original)
+    return registry.find_root(path)
 
 
 def is_path_under(top_level, path):
-    prefix = os.path.realpath(top_level)
-    target = os.path.realpath(path)
+    prefix = realpath(top_level)
+    target = realpath(path)
     return target.startswith(prefix)
 
 
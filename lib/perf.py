@@ -0,0 +1,301 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Helpers to measure how long things take.
+'''
+
+from bisect import bisect_left
+from collections import deque
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+import time
+
+
+class Samples(object):
+    '''Keeps the most recent measurements of something.
+    '''
+
+    def __init__(self, size=200):
+        self.lock = Lock()
+        self._values = deque(maxlen=size)
+        # Number of values ever added.
+        self.total = 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self._values)
+
+    def add(self, value):
+        with self.lock:
+            self._values.append(value)
+            self.total += 1
+
+    def values(self):
+        with self.lock:
+            return list(self._values)
+
+    def percentile(self, p):
+        '''Returns the @p-th percentile (nearest rank) of the samples, or
+        `None` if there are none.
+        '''
+        values = sorted(self.values())
+        if not values:
+            return
+        rank = max(int(round(p / 100 * len(values))) - 1, 0)
+        return values[min(rank, len(values) - 1)]
+
+    def mean(self):
+        values = self.values()
+        if values:
+            return sum(values) / len(values)
+
+    def summary(self, unit='ms'):
+        if not len(self):
+            return 'no samples'
+        return 'n={} p50={:.1f}{unit} p90={:.1f}{unit} max={:.1f}{unit}'.format(
+                    self.total, self.percentile(50), self.percentile(90),
+                    self.percentile(100), unit=unit)
+
+
+class Stopwatch(object):
+    '''Measures the wall time spent in a `with` block in milliseconds.
+    '''
+
+    def __init__(self):
+        self.start = None
+        self.ms = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.ms = (time.perf_counter() - self.start) * 1000
+
+
+# Upper bounds of the histogram buckets, in ms.
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Histogram(object):
+    '''Counts values in fixed buckets, so adding a value costs the same no
+    matter how many have been added.
+
+    Not thread-safe on its own; `Metrics` guards access.
+    '''
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        # The last bucket holds values above the last bound.
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def mean(self):
+        if self.total:
+            return self.sum / self.total
+
+    def format(self):
+        '''Returns a one-line summary listing the non-empty buckets.
+        '''
+        if not self.total:
+            return 'n=0'
+        buckets = []
+        for i, count in enumerate(self.counts):
+            if not count:
+                continue
+            label = ('<={}'.format(self.bounds[i]) if i < len(self.bounds)
+                     else '>{}'.format(self.bounds[-1]))
+            buckets.append('{}:{}'.format(label, count))
+        return 'n={} mean={:.1f} max={:.1f} | {}'.format(
+                    self.total, self.mean(), self.max, ' '.join(buckets))
+
+
+class Rate(object):
+    '''Counts events per second over the last @window seconds.
+
+    Not thread-safe on its own; `Metrics` guards access.
+    '''
+
+    def __init__(self, window=10, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        # [second, count] pairs, oldest first.
+        self.buckets = deque()
+        self.total = 0
+
+    def mark(self, n=1):
+        second = int(self.clock())
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += n
+        else:
+            self.buckets.append([second, n])
+            while self.buckets[0][0] <= second - self.window:
+                self.buckets.popleft()
+        self.total += n
+
+    def per_second(self):
+        start = int(self.clock()) - self.window
+        return sum(c for (s, c) in self.buckets if s > start) / self.window
+
+
+class Metrics(object):
+    '''Registry for measurements taken on hot paths.
+
+    Every write is a dict lookup and a few additions under a lock, so it's
+    cheap enough to do for every request and notification.
+    '''
+
+    # Requests that never get a response mustn't pile up.
+    MAX_PENDING = 1000
+
+    def __init__(self, clock=time.monotonic):
+        self.lock = Lock()
+        self.clock = clock
+        self.counters = {}
+        self.histograms = {}
+        self.rates = {}
+        # thread name -> (alive, since)
+        self.threads = {}
+        # request id -> (method, start)
+        self._pending = OrderedDict()
+
+    def incr(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(value)
+
+    def mark(self, name, n=1):
+        with self.lock:
+            rate = self.rates.get(name)
+            if rate is None:
+                rate = self.rates[name] = Rate(clock=self.clock)
+            rate.mark(n)
+
+    def start_request(self, request_id, method):
+        with self.lock:
+            self._pending[request_id] = (method, self.clock())
+            if len(self._pending) > Metrics.MAX_PENDING:
+                self._pending.popitem(last=False)
+
+    def finish_request(self, request_id):
+        '''Records the latency of the request with @request_id under
+        'request.<method>'.
+        '''
+        with self.lock:
+            pending = self._pending.pop(request_id, None)
+        if pending:
+            method, start = pending
+            self.observe('request.' + method, (self.clock() - start) * 1000)
+
+    def set_thread_alive(self, name, alive):
+        with self.lock:
+            self.threads[name] = (alive, self.clock())
+
+    def timed(self, name):
+        '''Decorator recording the time spent in a function under @name.
+        '''
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        '''Returns a copy of the metrics that's safe to read without
+        locking.
+        '''
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': {name: (h.format(), h.total, h.sum)
+                               for (name, h) in self.histograms.items()},
+                'rates': {name: (r.per_second(), r.total)
+                          for (name, r) in self.rates.items()},
+                'threads': dict(self.threads),
+                'pending': len(self._pending),
+                'now': self.clock(),
+            }
+
+
+# The plugin's registry.
+metrics = Metrics()
+
+
+def format_duration(seconds):
+    if seconds < 60:
+        return '{:.0f}s'.format(seconds)
+    if seconds < 3600:
+        return '{:.0f}m'.format(seconds / 60)
+    return '{:.1f}h'.format(seconds / 3600)
+
+
+def render_stats(snapshot, queues):
+    '''Returns the text for the performance dashboard.
+
+    @queues
+      (name, depth) pairs.
+    '''
+    lines = ['Dart plugin performance', '']
+
+    lines.append('Queues')
+    lines.extend('  {:<24} {:>6}'.format(name, depth)
+                 for (name, depth) in queues)
+    lines.append('  {:<24} {:>6}'.format('awaiting response',
+                                         snapshot['pending']))
+
+    lines.extend(['', 'Threads'])
+    for name, (alive, since) in sorted(snapshot['threads'].items()):
+        lines.append('  {:<24} {} for {}'.format(
+                        name, 'alive' if alive else 'DEAD',
+                        format_duration(snapshot['now'] - since)))
+
+    starts = snapshot['counters'].get('server.starts', 0)
+    lines.extend(['', 'Server',
+                  '  {:<24} {:>6}'.format('restarts', max(starts - 1, 0))])
+
+    def section(title, prefix, show_sum=False):
+        items = sorted((name[len(prefix):], value)
+                       for (name, value) in snapshot['histograms'].items()
+                       if name.startswith(prefix))
+        lines.extend(['', title])
+        if not items:
+            lines.append('  (none)')
+        for name, (text, total, total_ms) in items:
+            extra = '  total={:.0f}ms'.format(total_ms) if show_sum else ''
+            lines.append('  {:<36} {}{}'.format(name, text, extra))
+
+    section('Request latency (ms)', 'request.')
+
+    lines.extend(['', 'Notifications per second'])
+    rates = sorted(snapshot['rates'].items())
+    if not rates:
+        lines.append('  (none)')
+    for name, (per_second, total) in rates:
+        lines.append('  {:<36} {:>7.1f}/s  total={}'.format(name, per_second,
+                                                            total))
+
+    section('UI thread time in handlers (ms)', 'ui.', show_sum=True)
+
+    return '\n'.join(lines) + '\n'
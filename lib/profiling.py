@@ -0,0 +1,244 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+On-demand profiling of the plugin inside a running editor.
+
+Two kinds of profiles can be taken:
+
+- Deterministic (cProfile): threads opt in at the top of their loops with
+  `session.checkpoint()`, and UI callbacks with the `@profiled` decorator.
+  While no profile is being taken, each of those costs one attribute check.
+  Results are saved in pstats format.
+
+- Sampling: a background thread records the stacks of the plugin's threads
+  every few ms. Results are saved as folded stacks, the input format of
+  flamegraph.pl and speedscope.
+'''
+
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+
+
+class _Snapshot(object):
+    '''Lets `pstats.Stats` read a profile that may still be enabled in
+    another thread.
+    '''
+
+    def __init__(self, profile):
+        profile.snapshot_stats()
+        self.stats = profile.stats
+
+    def create_stats(self):
+        pass
+
+
+class ProfileSession(object):
+    '''Collects cProfile profiles from every thread that takes part.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = False
+        # Incremented each time a session starts, so that threads notice
+        # their profile belongs to an old session.
+        self.generation = 0
+        self._profiles = []
+        self._local = threading.local()
+
+    def start(self):
+        with self.lock:
+            self.generation += 1
+            self._profiles = []
+            self.running = True
+
+    def stop(self):
+        '''Stops profiling and returns a `pstats.Stats`, or `None` if no
+        thread took part.
+        '''
+        with self.lock:
+            self.running = False
+            profiles, self._profiles = self._profiles, []
+
+        if not profiles:
+            return
+        return pstats.Stats(*[_Snapshot(p) for p in profiles],
+                            stream=io.StringIO())
+
+    def _get_profile(self):
+        local = self._local
+        if getattr(local, 'generation', None) != self.generation:
+            if getattr(local, 'enabled', False):
+                local.profile.disable()
+            local.profile = cProfile.Profile()
+            local.generation = self.generation
+            local.enabled = False
+            with self.lock:
+                self._profiles.append(local.profile)
+        return local
+
+    def checkpoint(self):
+        '''Profiles the calling thread from now on if a session is running,
+        or stops profiling it otherwise.
+
+        Meant to be called at the top of a thread's main loop.
+        '''
+        if self.running:
+            local = self._get_profile()
+            if not local.enabled:
+                local.enabled = True
+                local.profile.enable()
+        elif getattr(self._local, 'enabled', False):
+            self._local.enabled = False
+            self._local.profile.disable()
+
+    @contextmanager
+    def section(self):
+        '''Profiles the body of the `with` block.
+        '''
+        local = self._get_profile()
+        if local.enabled:
+            # Already profiling this thread.
+            yield
+            return
+
+        local.enabled = True
+        local.profile.enable()
+        try:
+            yield
+        finally:
+            local.profile.disable()
+            local.enabled = False
+
+
+# The plugin's profiling session.
+session = ProfileSession()
+
+
+def profiled(fn):
+    '''Decorator profiling @fn while a session is running.
+    '''
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not session.running:
+            return fn(*args, **kwargs)
+        with session.section():
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def format_frame(frame):
+    code = frame.f_code
+    return '{} ({}:{})'.format(code.co_name, os.path.basename(
+                               code.co_filename), code.co_firstlineno)
+
+
+class Sampler(object):
+    '''Samples the stacks of other threads at a fixed interval.
+    '''
+
+    def __init__(self, interval=0.005, include=lambda frame: True,
+                 max_depth=64):
+        '''
+        @include
+          Called with each frame of a stack; the stack is recorded if it
+          returns `True` for any of them.
+        '''
+        self.interval = interval
+        self.include = include
+        self.max_depth = max_depth
+        # folded stack -> number of samples
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='Dart-Sampler-thread')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        '''Stops sampling and returns the counts of folded stacks.
+        '''
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        return self.counts
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self.sample(names.get(ident, str(ident)), frame)
+            self.samples += 1
+
+    def sample(self, thread_name, frame):
+        stack = []
+        included = False
+        while frame is not None and len(stack) < self.max_depth:
+            included = included or self.include(frame)
+            stack.append(format_frame(frame))
+            frame = frame.f_back
+        if included:
+            stack.append(thread_name)
+            self.counts[';'.join(reversed(stack))] += 1
+
+
+def to_folded(counts):
+    '''Returns @counts in the folded stacks format: one "frame;frame count"
+    line per stack.
+    '''
+    return ''.join('{} {}\n'.format(stack, count)
+                   for (stack, count) in sorted(counts.items()))
+
+
+def top_sampled(counts, n=20):
+    '''Returns a text table of the @n functions seen most often at the top
+    of the sampled stacks.
+    '''
+    total = sum(counts.values())
+    if not total:
+        return 'No samples.'
+    leaves = Counter()
+    for stack, count in counts.items():
+        leaves[stack.rsplit(';', 1)[-1]] += count
+
+    lines = ['{} samples'.format(total), '']
+    for name, count in leaves.most_common(n):
+        lines.append('{:>6.1f}%  {:>6}  {}'.format(count * 100 / total, count,
+                                                   name))
+    return '\n'.join(lines)
+
+
+def top_stats(stats, n=20, sort='cumulative'):
+    '''Returns the usual pstats listing of the top @n functions.
+    '''
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats(sort).print_stats(n)
+    return stream.getvalue()
+
+
+def make_profile_path(directory, extension, now=None):
+    now = time.localtime() if now is None else now
+    name = time.strftime('dart-%Y%m%d-%H%M%S', now) + extension
+    return os.path.join(directory, name)
@@ -0,0 +1,148 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Remembers where pub packages are and what their top-level directories are.
+
+Finding the pubspec.yaml for a file means checking every directory up to
+the file system root, and the predicates asking whether a file is part of a
+web app or a command line app do that several times per call. With the
+registry, most lookups are dictionary lookups.
+
+Entries are rechecked after `ttl` seconds: package roots are searched for
+again, and top-level directories are listed again only if the mtime of the
+package root has changed. `invalidate()` forgets entries at once, for when
+we know a pubspec.yaml has been created or deleted.
+'''
+
+from functools import lru_cache
+from threading import Lock
+import os
+import time
+
+
+class ProjectLayout(object):
+    '''The entries at the top level of a pub package.
+    '''
+
+    def __init__(self, root, mtime, names, checked_at):
+        self.root = root
+        self.mtime = mtime
+        self.names = names
+        self.checked_at = checked_at
+
+    def get(self, name):
+        '''Returns the path to the top-level entry @name, or `None` if it
+        doesn't exist.
+        '''
+        if name in self.names:
+            return os.path.join(self.root, name)
+
+
+class ProjectRegistry(object):
+    # Forget everything beyond this many cached paths.
+    MAX_ENTRIES = 20000
+
+    def __init__(self, ttl=5.0, clock=time.monotonic):
+        self.lock = Lock()
+        self.ttl = ttl
+        self.clock = clock
+        # path -> (package root or None, time checked)
+        self._roots = {}
+        # package root -> ProjectLayout
+        self._layouts = {}
+
+    def find_root(self, path):
+        '''Returns the closest directory containing a pubspec.yaml, starting
+        at @path and going up, or `None`.
+        '''
+        now = self.clock()
+        with self.lock:
+            visited = []
+            p = path
+            while True:
+                entry = self._roots.get(p)
+                if entry is not None and now - entry[1] < self.ttl:
+                    root = entry[0]
+                    break
+
+                visited.append(p)
+                if os.path.exists(os.path.join(p, 'pubspec.yaml')):
+                    root = p
+                    break
+
+                parent = os.path.dirname(p)
+                # Reached drive unit; stop.
+                if parent == os.path.dirname(parent):
+                    root = None
+                    break
+                p = parent
+
+            if len(self._roots) + len(visited) > ProjectRegistry.MAX_ENTRIES:
+                self._roots.clear()
+            # Everything we've seen on the way up belongs to the same package.
+            for p in visited:
+                self._roots[p] = (root, now)
+            return root
+
+    def get_layout(self, root):
+        '''Returns the `ProjectLayout` for the package at @root.
+        '''
+        now = self.clock()
+        with self.lock:
+            layout = self._layouts.get(root)
+            if layout is not None and now - layout.checked_at < self.ttl:
+                return layout
+
+            try:
+                mtime = os.stat(root).st_mtime
+            except OSError:
+                mtime = None
+
+            if layout is not None and layout.mtime == mtime:
+                layout.checked_at = now
+                return layout
+
+            try:
+                names = frozenset(os.listdir(root))
+            except OSError:
+                names = frozenset()
+            layout = self._layouts[root] = ProjectLayout(root, mtime, names,
+                                                         now)
+            return layout
+
+    def get_top_level_dir(self, root, name):
+        return self.get_layout(root).get(name)
+
+    def invalidate(self, path=None):
+        '''Forgets what's known about paths under @path, or everything.
+
+        @path
+          A directory; typically one where a pubspec.yaml has been created
+          or deleted.
+        '''
+        with self.lock:
+            if path is None:
+                self._roots.clear()
+                self._layouts.clear()
+            else:
+                prefix = os.path.join(path, '')
+                for key in [k for k in self._roots
+                            if k == path or k.startswith(prefix)]:
+                    del self._roots[key]
+                for key in [k for k in self._layouts
+                            if k == path or k.startswith(prefix)]:
+                    del self._layouts[key]
+        realpath.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def realpath(path):
+    '''Cached `os.path.realpath`. Cleared by `ProjectRegistry.invalidate`.
+    '''
+    return os.path.realpath(path)
+
+
+# The plugin's registry.
+registry = ProjectRegistry()
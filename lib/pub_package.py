@@ -7,10 +7,15 @@ import sublime
 import os
 
 from Dart.sublime_plugin_lib import PluginLogger
-from Dart.out_there.yaml import load
-from Dart.sublime_plugin_lib.path import find_file
 from Dart.sublime_plugin_lib.path import is_prefix
+from Dart.lib.path import find_pubspec_path
 from Dart.lib.path import is_view_dart_script
+from Dart.lib.directives import directive_cache
+from Dart.lib.directives import HEADER_SIZE
+from Dart.lib.manifests import manifests
+from Dart.lib.manifests import parse_lock
+from Dart.lib.manifests import parse_pubspec
+from Dart.lib.project_registry import registry
 from Dart.sublime_plugin_lib.path import to_platform_path
 
 
@@ -18,10 +23,9 @@ _logger = PluginLogger(__name__)
 
 
 def find_pubspec(start):
-    try:
-        return find_file(start, 'pubspec.yaml')
-    except Exception as e:
-        _logger.debug('error finding pubspec: %s', e)
+    root = find_pubspec_path(start)
+    if root:
+        return os.path.join(root, 'pubspec.yaml')
 
 
 class PubPackage(object):
@@ -29,13 +33,14 @@ class PubPackage(object):
         self.pubspec = pubspec
 
     def _get_top_level_dir(self, name):
-        p = os.path.join(self.pubspec.parent, name)
-        if os.path.exists(p):
+        p = registry.get_top_level_dir(self.pubspec.parent, name)
+        if p:
             return p
-        _logger.debug('path not found in project: %s', p)
+        _logger.debug('path not found in project: %s', name)
 
     def make_top_level_dir(self, name):
         os.mkdir(os.path.join(self.pubspec.parent, name))
+        registry.invalidate(self.pubspec.parent)
 
     def is_prefix(self, prefix, path):
         assert prefix and path, 'cannot call with None params'
@@ -92,7 +97,6 @@ class PubspecLockFile(object):
     '''
     def __init__(self, pubspec):
         self.path = os.path.join(pubspec.parent, 'pubspec.lock')
-        self._data = None
     @property
     def path_to_web(self):
         return self._get_top_level_dir('web')
@@ -101,14 +105,17 @@ class PubspecLockFile(object):
     def parent(self):
         return os.path.dirname(self.path)
 
-    def _load(self):
-        if self._data is not None:
-            return
-        self._data = load(open(self.path, 'rt'))
+    @property
+    def index(self):
+        '''The `LockIndex` for the file, parsed again only if it changed.
+        '''
+        return manifests.get(self.path, parse_lock)
 
     def has_dependency(self, name, version=None):
-        self._load()
-        return name in self._data['packages']
+        return self.index.has(name, version)
+
+    def get_version(self, name):
+        return self.index.get_version(name)
 
     @classmethod
     def from_pubspec(cls, pubspec):
@@ -124,19 +131,19 @@ class PubspecFile(object):
     '''
     def __init__(self, path):
         self.path = path
-        self._data = None
 
     @property
     def parent(self):
         return os.path.dirname(self.path)
 
-    def _load(self):
-        if self._data is not None:
-            return
-        self._data = load(open(self.path, 'rt'))
+    @property
+    def data(self):
+        '''The parsed file, parsed again only if it changed.
+        '''
+        return manifests.get(self.path, parse_pubspec)
 
     def get_pubspec_lock(self):
-        # TODO(guillermooo): cache this?
+        # Cheap; the parsed lock file is shared through `manifests`.
         return PubspecLockFile.from_pubspec(self)
 
     @classmethod
@@ -161,6 +168,8 @@ class DartFile(object):
         '''
         self.view = None
         self.path = None
+        self._project = None
+        self._project_looked_up = False
         if isinstance(view, sublime.View):
             self.view = view
             self.path = view.file_name()
@@ -176,22 +185,34 @@ class DartFile(object):
         dart_view.path = path
         return dart_view
 
-    def _get_top_lines(self):
-        end = self.view.full_line(80 * 50).end()
-        region = sublime.Region(0, end)
-        lines = self.view.lines(region)
-        yield from (self.view.substr(line) for line in lines)
-
-    def _find_at_top(self, *sought_terms):
-        for line in self._get_top_lines():
-            for term in  sought_terms:
-                if term in line:
-                    return True
+    @property
+    def directives(self):
+        '''The directives at the top of the file, parsed again only if the
+        buffer or the file changed. Files that aren't open are read from
+        disk.
+        '''
+        view = self.view
+        if view:
+            return directive_cache.get_for_buffer(
+                        view.buffer_id(), view.change_count(),
+                        lambda: view.substr(sublime.Region(
+                                    0, min(view.size(), HEADER_SIZE))))
+        return directive_cache.get_for_path(self.path)
 
     def has_prefix(self, prefix):
         assert prefix, 'cannot call with empty prefix'
         return is_prefix(prefix, self.path)
 
+    @property
+    def project(self):
+        '''The `PubPackage` containing the file, or `None`. Looked up once
+        per `DartFile`.
+        '''
+        if not self._project_looked_up:
+            self._project = PubPackage.from_path(self.path)
+            self._project_looked_up = True
+        return self._project
+
     @property
     def is_runnable(self):
         '''Returns `True` if the file is a pubspec.yaml or a .dart file, or if
@@ -202,7 +223,7 @@ class DartFile(object):
         If a file is under any of those dirs, we consider it runnable as part
         of a web app or a cli program.
         '''
-        project = PubPackage.from_path(self.path)
+        project = self.project
         return any((self.is_dart_file,
                     self.is_pubspec,
                     (project and
@@ -226,7 +247,7 @@ class DartFile(object):
         if not self.path.endswith('.html'):
             return
 
-        project = PubPackage.from_path(self.path)
+        project = self.project
         path = None
         if self.is_example:
             path = self.path[len(project.path_to_example)+1:]
@@ -236,7 +257,7 @@ class DartFile(object):
 
     @property
     def is_server_app(self):
-        project = PubPackage.from_path(self.path)
+        project = self.project
         if not project:
             return False
 
@@ -250,16 +271,17 @@ class DartFile(object):
             self.has_prefix(project.path_to_example)):
                 # TODO(guillermooo): improve detection of cli apps under
                 # 'example'.
-                is_cli_script = self._find_at_top('dart:io')
+                directives = self.directives
+                is_cli_script = directives.has_import('dart:io')
                 is_not_web_file = (self.is_dart_file and
-                                   not self._find_at_top('import:html'))
+                                   not directives.has_import('dart:html'))
                 return (is_cli_script or is_not_web_file)
 
         return False
 
     @property
     def is_web_app(self):
-        project = PubPackage.from_path(self.path)
+        project = self.project
         if not project:
             return False
 
@@ -281,7 +303,7 @@ class DartFile(object):
         '''Returns `True` if the view's path is under the 'example' dir.
         '''
         assert self.path, 'view has not been saved yet'
-        project = PubPackage.from_path(self.path)
+        project = self.project
         if not (project and project.path_to_example):
             return False
         return self.has_prefix(project.path_to_example)
@@ -0,0 +1,270 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Fast loader for the YAML that pub reads and writes.
+
+pubspec.yaml and pubspec.lock files use a small part of YAML: block
+mappings, block sequences, and scalars that fit on a line (plain scalars may
+continue on more indented lines). This module parses that part line by line,
+which is much faster than the vendored PyYAML, and hands anything else over
+to PyYAML. Plain scalars are resolved by PyYAML's own resolver and
+constructors, so the results are the same as `out_there.yaml.load`'s.
+'''
+
+import re
+
+from Dart.out_there.yaml import load as yaml_load
+from Dart.out_there.yaml.constructor import Constructor
+from Dart.out_there.yaml.nodes import ScalarNode
+from Dart.out_there.yaml.resolver import Resolver
+
+
+class Unsupported(Exception):
+    '''Raised when the text uses YAML features the fast loader doesn't
+    handle.
+    '''
+
+
+# Characters PyYAML rejects; also tabs, BOMs and unusual line breaks.
+_UNSUPPORTED_CHARS = re.compile('[^\n\x20-\x7E\xA0-\u2027\u202A-\uD7FF'
+                                '\uE000-\uFEFE\uFF00-\uFFFD]')
+
+# Plain scalars can't start with these.
+_INDICATORS = frozenset('[]{}#&*!|>\'"%@`')
+
+_STR_TAG = 'tag:yaml.org,2002:str'
+# Tags of plain scalars we can construct without any context.
+_SCALAR_TAGS = frozenset((
+    'tag:yaml.org,2002:bool',
+    'tag:yaml.org,2002:float',
+    'tag:yaml.org,2002:int',
+    'tag:yaml.org,2002:null',
+    'tag:yaml.org,2002:timestamp',
+))
+
+_resolver = Resolver()
+_constructor = Constructor()
+
+
+class _Line(object):
+    __slots__ = ('indent', 'text', 'after_gap')
+
+    def __init__(self, indent, text, after_gap):
+        self.indent = indent
+        self.text = text
+        # Whether blank lines or comments come right before this line.
+        self.after_gap = after_gap
+
+
+def _resolve(value):
+    tag = _resolver.resolve(ScalarNode, value, (True, False))
+    if tag == _STR_TAG:
+        return value
+    if tag not in _SCALAR_TAGS:
+        raise Unsupported(tag)
+    return _constructor.yaml_constructors[tag](_constructor,
+                                               ScalarNode(tag, value))
+
+
+def _check_plain(text):
+    if not text:
+        raise Unsupported('empty scalar')
+    if text[0] in _INDICATORS:
+        raise Unsupported(text)
+    if text[0] in '-?:' and (len(text) == 1 or text[1] == ' '):
+        raise Unsupported(text)
+    if ': ' in text or text.endswith(':'):
+        raise Unsupported(text)
+
+
+def _is_sequence_entry(text):
+    return text == '-' or text.startswith('- ')
+
+
+def _split_quoted(text):
+    '''Returns the quoted scalar at the start of @text and the text after
+    it.
+    '''
+    quote = text[0]
+    if quote == '"':
+        end = text.find('"', 1)
+        if end < 0 or '\\' in text[1:end]:
+            raise Unsupported(text)
+        return text[1:end], text[end + 1:]
+
+    start = 1
+    while True:
+        end = text.find("'", start)
+        if end < 0:
+            raise Unsupported(text)
+        if text[end + 1:end + 2] != "'":
+            return text[1:end].replace("''", "'"), text[end + 1:]
+        start = end + 2
+
+
+def _split_entry(text):
+    '''Returns the key of a "key: value" line and the text after the colon,
+    or `None` if @text isn't a mapping entry.
+    '''
+    if text[0] in '\'"':
+        key, rest = _split_quoted(text)
+        if not (rest == ':' or rest.startswith(': ')):
+            return
+        return key, rest[1:]
+
+    end = text.find(': ')
+    if end < 0:
+        if not text.endswith(':'):
+            return
+        end = len(text) - 1
+    key = text[:end].rstrip(' ')
+    if ' #' in key:
+        raise Unsupported(text)
+    _check_plain(key)
+    return _resolve(key), text[end + 1:]
+
+
+def _split_value(rest):
+    '''Returns the kind of the value in @rest, the text after a colon or a
+    dash, and the value: ('empty', None), ('quoted', str), ('plain', str),
+    or ('commented', str) for plain scalars ended by a comment.
+    '''
+    text = rest.lstrip(' ')
+    if not text or text[0] == '#':
+        return 'empty', None
+
+    if text[0] in '\'"':
+        value, after = _split_quoted(text)
+        tail = after.lstrip(' ')
+        if tail and not (tail[0] == '#' and tail != after):
+            raise Unsupported(text)
+        return 'quoted', value
+
+    kind = 'plain'
+    comment = text.find(' #')
+    if comment >= 0:
+        text = text[:comment]
+        kind = 'commented'
+    text = text.rstrip(' ')
+    _check_plain(text)
+    return kind, text
+
+
+def _parse_value(lines, i, indent, rest, in_mapping):
+    '''Parses the value starting after the colon or dash of line @i.
+
+    Returns the value and the index of the next line to parse.
+    '''
+    kind, value = _split_value(rest)
+    i += 1
+    if kind == 'empty':
+        if i < len(lines):
+            line = lines[i]
+            if line.indent > indent:
+                return _parse_block(lines, i)
+            # Sequences may be indented as much as the key they belong to.
+            if (in_mapping and line.indent == indent and
+                    _is_sequence_entry(line.text)):
+                return _parse_sequence(lines, i)
+        return None, i
+
+    if kind == 'quoted':
+        return value, i
+    if kind == 'commented':
+        return _resolve(value), i
+
+    # Plain scalars may continue on more indented lines.
+    parts = [value]
+    while i < len(lines) and lines[i].indent > indent:
+        line = lines[i]
+        if line.after_gap or '#' in line.text:
+            raise Unsupported(line.text)
+        _check_plain(line.text)
+        parts.append(line.text)
+        i += 1
+    return _resolve(' '.join(parts)), i
+
+
+def _parse_sequence(lines, i):
+    indent = lines[i].indent
+    result = []
+    while (i < len(lines) and lines[i].indent == indent and
+            _is_sequence_entry(lines[i].text)):
+        rest = lines[i].text[1:]
+        item = rest.lstrip(' ')
+        # Compact nested collections, as in "- key: value".
+        if item and (_is_sequence_entry(item) or _split_entry(item)):
+            raise Unsupported(item)
+        value, i = _parse_value(lines, i, indent, rest, in_mapping=False)
+        result.append(value)
+
+    if i < len(lines) and lines[i].indent > indent:
+        raise Unsupported(lines[i].text)
+    return result, i
+
+
+def _parse_mapping(lines, i):
+    indent = lines[i].indent
+    result = {}
+    while i < len(lines) and lines[i].indent == indent:
+        entry = _split_entry(lines[i].text)
+        if entry is None:
+            raise Unsupported(lines[i].text)
+        key, rest = entry
+        value, i = _parse_value(lines, i, indent, rest, in_mapping=True)
+        result[key] = value
+
+    if i < len(lines) and lines[i].indent > indent:
+        raise Unsupported(lines[i].text)
+    return result, i
+
+
+def _parse_block(lines, i):
+    if _is_sequence_entry(lines[i].text):
+        return _parse_sequence(lines, i)
+    return _parse_mapping(lines, i)
+
+
+def _split_lines(text):
+    if _UNSUPPORTED_CHARS.search(text):
+        raise Unsupported('unsupported characters')
+
+    lines = []
+    after_gap = False
+    for raw in text.split('\n'):
+        stripped = raw.strip(' ')
+        if not stripped or stripped[0] == '#':
+            after_gap = True
+            continue
+        if stripped[0] == '%' or stripped[:3] in ('---', '...'):
+            raise Unsupported(stripped)
+        lines.append(_Line(len(raw) - len(raw.lstrip(' ')), stripped,
+                           after_gap))
+        after_gap = False
+    return lines
+
+
+def load_fast(text):
+    '''Parses @text, raising `Unsupported` if it uses YAML features beyond
+    what pub uses.
+    '''
+    lines = _split_lines(text.replace('\r\n', '\n'))
+    if not lines:
+        return
+
+    value, i = _parse_block(lines, 0)
+    if i < len(lines):
+        raise Unsupported(lines[i].text)
+    return value
+
+
+def load(text):
+    '''Parses @text like `out_there.yaml.load` does, only faster for the
+    files pub writes.
+    '''
+    try:
+        return load_fast(text)
+    except Unsupported:
+        return yaml_load(text)
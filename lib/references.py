@@ -0,0 +1,101 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Helpers to turn search results into lines of text.
+'''
+
+from bisect import bisect_right
+from collections import OrderedDict
+from threading import Lock
+
+
+# Matches the lines produced by `format_reference`.
+RESULT_FILE_REGEX = r'^(.+):(\d+):(\d+): '
+
+# Longest snippet of source code shown for a reference.
+MAX_SNIPPET_LENGTH = 120
+
+
+class OffsetTable(object):
+    '''Maps offsets in a text to rows and columns.
+    '''
+
+    def __init__(self, text):
+        self.text = text
+        self.line_starts = [0]
+        pos = text.find('\n')
+        while pos != -1:
+            self.line_starts.append(pos + 1)
+            pos = text.find('\n', pos + 1)
+
+    def row_col(self, offset):
+        '''Returns the 1-based (row, col) for @offset.
+        '''
+        row = bisect_right(self.line_starts, offset) - 1
+        return row + 1, offset - self.line_starts[row] + 1
+
+    def line(self, row):
+        '''Returns the text of the 1-based @row without the line terminator.
+        '''
+        start = self.line_starts[row - 1]
+        try:
+            end = self.line_starts[row] - 1
+        except IndexError:
+            end = len(self.text)
+        return self.text[start:end].rstrip('\r')
+
+
+class OffsetTableCache(object):
+    '''Keeps `OffsetTable`s for the most recently used files.
+
+    A table is rebuilt when the file's version (mtime or buffer change count)
+    changes.
+    '''
+
+    MAX_FILES = 50
+
+    def __init__(self):
+        self.lock = Lock()
+        # path -> (version, OffsetTable)
+        self._tables = OrderedDict()
+
+    def get(self, path, version, load):
+        '''Returns the table for @path at @version.
+
+        @load
+          Called without arguments to get the file's text if the table isn't
+          cached. May return `None` if the file can't be read.
+        '''
+        with self.lock:
+            cached = self._tables.get(path)
+            if cached and cached[0] == version:
+                self._tables.move_to_end(path)
+                return cached[1]
+
+        text = load()
+        if text is None:
+            return
+
+        table = OffsetTable(text)
+        with self.lock:
+            self._tables[path] = (version, table)
+            self._tables.move_to_end(path)
+            while len(self._tables) > self.MAX_FILES:
+                self._tables.popitem(last=False)
+        return table
+
+    def invalidate(self, path):
+        with self.lock:
+            self._tables.pop(path, None)
+
+
+def format_reference(path, row, col, kind, snippet='', potential=False):
+    '''Returns a line for the references panel.
+    '''
+    snippet = snippet.strip()
+    if len(snippet) > MAX_SNIPPET_LENGTH:
+        snippet = snippet[:MAX_SNIPPET_LENGTH] + '...'
+    kind = kind.lower() + ('?' if potential else '')
+    return '{}:{}:{}: [{}] {}'.format(path, row, col, kind, snippet)
@@ -250,6 +250,26 @@ class DartFormat(object):
         dart_fmt = TextFilter([self.path])
         return dart_fmt.filter(text).rstrip()
 
+    def format_source(self, text, timeout=60):
+        '''Returns @text formatted, leaving trailing whitespace as dartfmt
+        produces it.
+
+        Raises `ValueError` if dartfmt fails, e.g. because of syntax errors.
+        '''
+        proc = Popen([self.path], stdin=PIPE, stdout=PIPE, stderr=PIPE,
+                     startupinfo=supress_window())
+        try:
+            out, err = proc.communicate(text.encode('utf-8'), timeout=timeout)
+        except TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise ValueError('dartfmt timed out')
+
+        if proc.returncode != 0:
+            message = decode_and_clean(err).strip().splitlines()
+            raise ValueError(message[0] if message else 'dartfmt failed')
+        return out.decode('utf-8')
+
 
 class RunDartWithObservatory(object):
     def __init__(self, path, cwd=None, listener=None):
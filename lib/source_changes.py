@@ -0,0 +1,136 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Applies `SourceChange`s spanning many files.
+
+Files open in the editor are edited through their views; the rest are
+rewritten on disk with one write per file, without opening them.
+'''
+
+from collections import OrderedDict
+import os
+
+from Dart.lib.error import ChangeConflictError
+from Dart.lib.source_edits import apply_edits
+
+
+# The server uses this stamp for files that don't exist yet.
+NEW_FILE_STAMP = -1
+
+
+class FileEdits(object):
+    '''All the edits a `SourceChange` makes to a single file.
+    '''
+
+    def __init__(self, path, stamp):
+        self.path = path
+        self.stamp = stamp
+        # [offset, length, replacement] lists.
+        self.edits = []
+
+
+def group_by_file(change):
+    '''Returns an ordered dict mapping paths to `FileEdits`.
+
+    A change may contain more than one `SourceFileEdit` for the same file.
+    '''
+    files = OrderedDict()
+    for file_edit in change.edits:
+        entry = files.get(file_edit.file)
+        if entry is None:
+            entry = files[file_edit.file] = FileEdits(file_edit.file,
+                                                      file_edit.fileStamp)
+        entry.edits.extend([e.offset, e.length, e.replacement]
+                           for e in file_edit.edits)
+    return files
+
+
+def get_stamp(path):
+    '''Returns the modification stamp of @path the way the server computes
+    it: milliseconds since the epoch, or `NEW_FILE_STAMP` if it doesn't exist.
+    '''
+    try:
+        return int(os.stat(path).st_mtime * 1000)
+    except FileNotFoundError:
+        return NEW_FILE_STAMP
+
+
+def is_stamp_current(path, stamp):
+    current = get_stamp(path)
+    if stamp == NEW_FILE_STAMP or current == NEW_FILE_STAMP:
+        return current == stamp
+    # Allow for rounding differences.
+    return abs(current - stamp) <= 1
+
+
+class ChangePlan(object):
+    '''Everything needed to apply a `SourceChange`, checked up front so that
+    either all files are changed or none is.
+    '''
+
+    def __init__(self, change, is_open):
+        '''
+        @is_open
+          Called with a path; returns `True` if the file is open in a view.
+          Open files may contain unsaved changes, so their stamps can't be
+          checked against the file system; the caller must check them.
+        '''
+        self.files = group_by_file(change)
+        # path -> [[offset, length, replacement]]
+        self.view_edits = OrderedDict()
+        # [(path, new text)]
+        self.writes = []
+
+        stale = []
+        for path, entry in self.files.items():
+            if is_open(path):
+                self.view_edits[path] = entry.edits
+                continue
+
+            if not is_stamp_current(path, entry.stamp):
+                stale.append(path)
+                continue
+
+            text = ''
+            if entry.stamp != NEW_FILE_STAMP:
+                text = self.read(path)
+            self.writes.append((path, apply_edits(text, entry.edits)))
+
+        if stale:
+            raise ChangeConflictError(
+                    'files changed since the change was computed: ' +
+                    ', '.join(stale))
+
+    def read(self, path):
+        try:
+            with open(path, 'rt', encoding='utf-8', newline='') as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            raise ChangeConflictError('cannot read {}: {}'.format(path, e))
+
+    def write_files(self):
+        '''Writes the files that aren't open.
+
+        All new contents are written to temporary files first and only then
+        moved into place, so a failure halfway leaves the originals intact.
+        '''
+        written = []
+        try:
+            for path, text in self.writes:
+                tmp = path + '.dart-tmp'
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                written.append((tmp, path))
+                with open(tmp, 'wt', encoding='utf-8', newline='') as f:
+                    f.write(text)
+        except OSError as e:
+            for tmp, _ in written:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            raise ChangeConflictError('cannot write {}: {}'.format(path, e))
+
+        for tmp, path in written:
+            os.replace(tmp, path)
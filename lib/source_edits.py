@@ -0,0 +1,43 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Helpers to apply `SourceEdit`s received from the analysis server.
+'''
+
+from Dart.lib.perf import Samples
+
+
+# Time spent applying each edit list, in ms.
+apply_times = Samples()
+
+
+def to_command_args(source_edits):
+    '''Returns @source_edits as [offset, length, replacement] lists that can
+    be passed to `dart_apply_source_edits`.
+
+    @source_edits
+      A list of `SourceEdit`s.
+    '''
+    return [[e.offset, e.length, e.replacement] for e in source_edits]
+
+
+def sort_edits(edits):
+    '''Returns @edits sorted so that applying them in order doesn't shift
+    the offsets of those yet to be applied.
+
+    Edits at the same offset keep their relative order.
+
+    @edits
+      A list of (offset, length, replacement) sequences.
+    '''
+    return sorted(edits, key=lambda e: e[0], reverse=True)
+
+
+def apply_edits(text, edits):
+    '''Returns @text with @edits applied.
+    '''
+    for offset, length, replacement in sort_edits(edits):
+        text = text[:offset] + replacement + text[offset + length:]
+    return text
@@ -0,0 +1,216 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Symbol index built from `analysis.outline` notifications.
+'''
+
+from threading import Lock
+import bisect
+
+from Dart.lib.analyzer.api.protocol import ElementKind
+
+
+# Outline nodes that don't make sense as go-to targets.
+IGNORED_KINDS = (ElementKind.COMPILATION_UNIT,
+                 ElementKind.LIBRARY,
+                 ElementKind.UNKNOWN)
+
+
+class Symbol(object):
+    '''A declaration found in a file's outline.
+    '''
+
+    def __init__(self, path, name, kind, container, parameters, offset,
+                 row, col):
+        self.path = path
+        self.name = name
+        self.kind = kind
+        # Name of the enclosing declaration, if any.
+        self.container = container
+        self.parameters = parameters
+        self.offset = offset
+        # 1-based row and column.
+        self.row = row
+        self.col = col
+
+    @property
+    def key(self):
+        '''Identifies a symbol across outline updates for the same file.
+        '''
+        return (self.container, self.name, self.kind)
+
+    @property
+    def sort_key(self):
+        '''Orders symbols in the project-wide list. Doesn't change across
+        outline updates.
+        '''
+        return (self.name.lower(), self.path)
+
+    @property
+    def qualified_name(self):
+        if self.container:
+            return self.container + '.' + self.name
+        return self.name
+
+    def differs_from(self, other):
+        return (self.offset != other.offset or
+                self.parameters != other.parameters)
+
+    def move_to(self, other):
+        self.offset = other.offset
+        self.row = other.row
+        self.col = other.col
+        self.parameters = other.parameters
+
+    def to_quick_panel_item(self):
+        return [self.qualified_name + (self.parameters or ''),
+                '{} {}:{}'.format(self.kind.lower(), self.path, self.row)]
+
+
+def flatten_outline(path, outline, container=''):
+    '''Yields `Symbol`s for @outline and its descendants.
+
+    @outline
+      An `Outline`.
+    '''
+    element = outline.element
+    name = container
+    if element.kind not in IGNORED_KINDS and element.name:
+        loc = element.location
+        if loc:
+            offset, row, col = loc.offset, loc.startLine, loc.startColumn
+        else:
+            offset, row, col = outline.offset, 0, 0
+
+        yield Symbol(path, element.name, element.kind, container,
+                     element.parameters, offset, row, col)
+        name = element.name if not container else container + '.' + element.name
+
+    for child in (outline.children or []):
+        yield from flatten_outline(path, child, name)
+
+
+def fuzzy_score(pattern, text):
+    '''Returns a score for how well @pattern matches @text as a subsequence,
+    or `None` if it doesn't match. Lower is better.
+    '''
+    pattern = pattern.lower()
+    text = text.lower()
+    score = 0
+    pos = -1
+    for c in pattern:
+        found = text.find(c, pos + 1)
+        if found == -1:
+            return
+        # Penalize gaps between matched chars.
+        score += found - pos - 1
+        pos = found
+    return score + (len(text) - len(pattern))
+
+
+class SymbolIndex(object):
+    '''Per-file symbol trees merged into a project-wide index.
+
+    Outline updates for a file are applied as a diff against the symbols we
+    already know for it, and to the sorted list of all symbols, once built.
+    '''
+
+    def __init__(self):
+        self.lock = Lock()
+        # path -> {key: Symbol}
+        self._files = {}
+        # All symbols ordered by `Symbol.sort_key`, and their keys.
+        self._sorted = None
+        self._sort_keys = None
+
+    def _insert(self, symbol):
+        k = symbol.sort_key
+        i = bisect.bisect_right(self._sort_keys, k)
+        self._sort_keys.insert(i, k)
+        self._sorted.insert(i, symbol)
+
+    def _discard(self, symbol):
+        k = symbol.sort_key
+        i = bisect.bisect_left(self._sort_keys, k)
+        while i < len(self._sorted) and self._sort_keys[i] == k:
+            if self._sorted[i] is symbol:
+                del self._sort_keys[i]
+                del self._sorted[i]
+                return
+            i += 1
+
+    def update(self, path, outline):
+        '''Applies a new @outline for @path.
+
+        Returns a tuple with the number of symbols added, removed and moved
+        (or otherwise changed, like their parameters).
+        '''
+        new_symbols = {}
+        for symbol in flatten_outline(path, outline):
+            # Overloads don't exist in Dart, but invalid code may produce
+            # duplicates; keep the first one.
+            new_symbols.setdefault(symbol.key, symbol)
+
+        with self.lock:
+            old_symbols = self._files.setdefault(path, {})
+
+            removed = [key for key in old_symbols if key not in new_symbols]
+            for key in removed:
+                symbol = old_symbols.pop(key)
+                if self._sorted is not None:
+                    self._discard(symbol)
+
+            added = moved = 0
+            for key, symbol in new_symbols.items():
+                current = old_symbols.get(key)
+                if current is None:
+                    old_symbols[key] = symbol
+                    if self._sorted is not None:
+                        self._insert(symbol)
+                    added += 1
+                elif current.differs_from(symbol):
+                    current.move_to(symbol)
+                    moved += 1
+
+            return added, len(removed), moved
+
+    def remove(self, path):
+        '''Forgets the symbols for @path.
+        '''
+        with self.lock:
+            if self._files.pop(path, None) and self._sorted is not None:
+                kept = [i for (i, s) in enumerate(self._sorted)
+                        if s.path != path]
+                self._sorted = [self._sorted[i] for i in kept]
+                self._sort_keys = [self._sort_keys[i] for i in kept]
+
+    def get_file_symbols(self, path):
+        with self.lock:
+            symbols = list(self._files.get(path, {}).values())
+        return sorted(symbols, key=lambda s: s.offset)
+
+    def get_all_symbols(self):
+        with self.lock:
+            if self._sorted is None:
+                self._sorted = sorted(
+                    (s for symbols in self._files.values()
+                       for s in symbols.values()),
+                    key=lambda s: s.sort_key)
+                self._sort_keys = [s.sort_key for s in self._sorted]
+            return list(self._sorted)
+
+    def find(self, pattern, limit=100):
+        '''Returns the symbols fuzzy-matching @pattern, best matches first.
+        '''
+        if not pattern:
+            return self.get_all_symbols()[:limit]
+
+        scored = []
+        for symbol in self.get_all_symbols():
+            score = fuzzy_score(pattern, symbol.qualified_name)
+            if score is not None:
+                scored.append((score, symbol.qualified_name, symbol))
+        scored.sort(key=lambda x: x[:2])
+        return [symbol for (_, _, symbol) in scored[:limit]]
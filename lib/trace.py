@@ -0,0 +1,94 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''
+Always-on record of the messages exchanged with the analysis server.
+
+Only metadata is kept, and nothing is formatted until the trace is dumped,
+so recording a message costs about as much as appending a tuple to a list.
+'''
+
+from collections import deque
+from datetime import datetime
+from threading import Lock
+import time
+
+
+SENT = '>'
+RECEIVED = '<'
+
+
+class ProtocolTrace(object):
+    '''Ring buffer with the last @size messages.
+    '''
+
+    def __init__(self, size=2000, clock=time.time):
+        self.lock = Lock()
+        self.clock = clock
+        self._entries = deque(maxlen=size)
+
+    def record(self, direction, name, request_id, size):
+        '''
+        @direction
+          `SENT` or `RECEIVED`.
+
+        @name
+          Method, event, or `None` for responses.
+        '''
+        entry = (self.clock(), direction, name, request_id, size)
+        with self.lock:
+            self._entries.append(entry)
+
+    def sent(self, message, size):
+        self.record(SENT, message.get('method'), message.get('id'), size)
+
+    def received(self, message, size):
+        self.record(RECEIVED, message.get('event'), message.get('id'), size)
+
+    def last(self, n):
+        with self.lock:
+            entries = list(self._entries)
+        return entries[-n:] if n else entries
+
+
+def format_trace(entries, now=None):
+    '''Returns a text dump of the trace @entries.
+
+    Responses are matched with their requests to show latencies, and
+    requests still waiting for a response are listed at the end; those are
+    usually what a hang is about.
+    '''
+    now = time.time() if now is None else now
+    # id -> (time, method)
+    requests = {}
+    lines = []
+    for (at, direction, name, request_id, size) in entries:
+        stamp = datetime.fromtimestamp(at).strftime('%H:%M:%S.%f')[:-3]
+        if direction == SENT:
+            requests[request_id] = (at, name)
+            desc = '{} #{}'.format(name, request_id)
+        elif request_id is not None:
+            sent = requests.pop(request_id, None)
+            if sent:
+                desc = 'response #{} to {} ({:.0f}ms)'.format(
+                            request_id, sent[1], (at - sent[0]) * 1000)
+            else:
+                desc = 'response #{}'.format(request_id)
+        else:
+            desc = name
+        lines.append('{} {} {:<60} {:>8}B'.format(stamp, direction, desc,
+                                                  size))
+
+    pending = sorted(requests.items(), key=lambda item: item[1][0])
+    if pending:
+        lines.append('')
+        lines.append('Waiting for a response:')
+        lines.extend('  {} #{} for {:.0f}ms'.format(method, request_id,
+                                                    (now - at) * 1000)
+                     for (request_id, (at, method)) in pending)
+    return '\n'.join(lines) + '\n'
+
+
+# The plugin's trace.
+trace = ProtocolTrace()
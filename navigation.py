@@ -50,6 +50,47 @@ class DartGoToDeclaration(sublime_plugin.WindowCommand):
         self.window.open_file("{}:{}:{}".format(fname, row, col), sublime.ENCODED_POSITION)
 
 
+class DartGoToSymbol(sublime_plugin.WindowCommand):
+    '''Shows the symbols known from analysis outlines in a quick panel.
+    '''
+    def run(self, scope='project', query=None):
+        '''
+        @scope
+          One of: project, file.
+
+        @query
+          If given, only symbols fuzzy-matching it are listed, best first.
+        '''
+        index = editor_context.symbol_index
+
+        if scope == 'file':
+            view = self.window.active_view()
+            if not (view and view.file_name()):
+                return
+            symbols = index.get_file_symbols(view.file_name())
+        elif query:
+            symbols = index.find(query)
+        else:
+            symbols = index.get_all_symbols()
+
+        if not symbols:
+            sublime.status_message('Dart: No symbols available.')
+            return
+
+        self.symbols = symbols
+        self.window.show_quick_panel(
+                [s.to_quick_panel_item() for s in symbols], self.on_done)
+
+    def on_done(self, idx):
+        if idx == -1:
+            return
+
+        symbol = self.symbols[idx]
+        self.window.open_file("{}:{}:{}".format(symbol.path, symbol.row,
+                                                symbol.col),
+                              sublime.ENCODED_POSITION)
+
+
 class ErrorNavigator(object):
     '''
     Navigates the errors received from the analysis server and stored in the
@@ -0,0 +1,36 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Highlights the occurrences of the element under the caret.
+'''
+
+import sublime
+import sublime_plugin
+
+from Dart._init_ import editor_context
+from Dart.lib.analyzer import actions
+from Dart.lib.path import is_view_dart_script
+
+
+def occurrences_enabled():
+    setts = sublime.load_settings('Dart - Plugin Settings.sublime-settings')
+    return setts.get('dart_highlight_occurrences') is not False
+
+
+class DartOccurrencesListener(sublime_plugin.EventListener):
+    '''Serves occurrences from the tables built from the analysis server's
+    notifications; moving the caret never results in a request.
+    '''
+
+    def on_selection_modified(self, view):
+        if not is_view_dart_script(view) or not occurrences_enabled():
+            return
+        actions.show_occurrences(view)
+
+    def on_modified(self, view):
+        if not is_view_dart_script(view):
+            return
+        # Offsets are off now; wait for the server to send new ones.
+        editor_context.occurrences.remove(view.file_name())
+        view.erase_regions(actions.DAS_UI_REGIONS_OCCURRENCES)
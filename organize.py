@@ -0,0 +1,189 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Organizes directives and sorts members across a whole pub package.
+'''
+
+import os
+import threading
+import time
+
+import sublime
+import sublime_plugin
+
+from Dart.sublime_plugin_lib import PluginLogger
+from Dart.sublime_plugin_lib.panels import OutputPanel
+from Dart.sublime_plugin_lib.sublime import after
+
+from Dart import analyzer
+from Dart.lib.analyzer.analyzer import AnalysisServer
+from Dart.lib.analyzer.batch import RequestWindow
+from Dart.lib.analyzer.queue import TaskPriority
+from Dart.lib.batch_format import find_dart_files
+from Dart.lib.error import ChangeConflictError
+from Dart.lib.package_edits import BatchStats
+from Dart.lib.package_edits import write_file_edit
+from Dart.lib.path import find_pubspec_path
+from Dart.lib.path import is_view_dart_script
+from Dart.lib.source_edits import to_command_args
+
+
+_logger = PluginLogger(__name__)
+
+
+# Max. number of requests in flight.
+MAX_IN_FLIGHT = 16
+
+EDITED_MEANWHILE = 'file edited meanwhile; not changed'
+
+ACTIONS = {
+    'organize_directives': 'Organizing directives',
+    'sort_members': 'Sorting members',
+}
+
+
+class DartOrganizePackageCommand(sublime_plugin.WindowCommand):
+    '''Organizes the directives or sorts the members of every .dart file in
+    the current pub package.
+
+    Files that aren't open are rewritten on disk as their edits arrive.
+    '''
+
+    # Whether a run is in progress.
+    running = False
+    # The batch of requests in progress, if any.
+    window_in_flight = None
+
+    def run(self, action='organize_directives'):
+        '''
+        @action
+          One of: organize_directives, sort_members.
+        '''
+        view = self.window.active_view()
+        if not (view and view.file_name()):
+            return
+
+        root = find_pubspec_path(view.file_name())
+        if not root:
+            sublime.status_message('Dart: Not in a pub package.')
+            return
+
+        if not AnalysisServer.ping():
+            return
+
+        if DartOrganizePackageCommand.running:
+            sublime.status_message('Dart: Already organizing files.')
+            return
+
+        # Edits are computed from the files on disk.
+        open_views = {}
+        for w in sublime.windows():
+            for v in w.views():
+                if not (v.file_name() and is_view_dart_script(v)):
+                    continue
+                if v.is_dirty():
+                    sublime.status_message('Dart: Save all files first.')
+                    return
+                open_views[v.file_name()] = (v, v.change_count())
+
+        DartOrganizePackageCommand.running = True
+        self.action = action
+        self.root = root
+        self.open_views = open_views
+        self.panel = OutputPanel('dart.organize')
+        self.panel.show()
+        self.panel.write('{} in {}...\n'.format(ACTIONS[action], root))
+
+        threading.Thread(target=self.start).start()
+
+    def write(self, text):
+        after(0, self.panel.write, text)
+
+    def start(self):
+        try:
+            self.start_batch()
+        except Exception as e:
+            _logger.error('cannot %s: %r', self.action, e)
+            DartOrganizePackageCommand.window_in_flight = None
+            DartOrganizePackageCommand.running = False
+            self.write('Error: {}\n'.format(e))
+
+    def start_batch(self):
+        paths = find_dart_files(self.root)
+        self.write('{} files\n'.format(len(paths)))
+        stats = BatchStats()
+        sent_at = {}
+
+        if self.action == 'sort_members':
+            send_request = analyzer.g_server.send_sort_members
+        else:
+            send_request = analyzer.g_server.send_organize_directives
+
+        def send(path, callback):
+            sent_at[path] = time.perf_counter()
+            send_request(path, callback, priority=TaskPriority.LOW)
+
+        def on_response(path, result, error):
+            ms = (time.perf_counter() - sent_at.pop(path)) * 1000
+            rel = os.path.relpath(path, self.root)
+            if error:
+                stats.add(path, ms, error=error.get('message'))
+                self.write('Error    {}: {}\n'.format(rel, error.get('message')))
+                return
+
+            if path in self.open_views:
+                view, change_count = self.open_views[path]
+                # The edits were computed from the buffer as it was when we
+                # started.
+                if view.change_count() != change_count:
+                    stats.add(path, ms, error=EDITED_MEANWHILE)
+                    self.write('Error    {}: {}\n'.format(rel, EDITED_MEANWHILE))
+                    return
+                edits = to_command_args(result.edit.edits)
+                if edits:
+                    after(0, self.apply_to_view, path, edits)
+                stats.add(path, ms, changed=bool(edits))
+                return
+
+            try:
+                changed = write_file_edit(path, result.edit)
+            except ChangeConflictError as e:
+                stats.add(path, ms, error=str(e))
+                self.write('Error    {}: {}\n'.format(rel, e))
+                return
+            stats.add(path, ms, changed=changed)
+
+        def on_done():
+            DartOrganizePackageCommand.window_in_flight = None
+            DartOrganizePackageCommand.running = False
+            summary = stats.summary(len(paths))
+            _logger.info('%s: %s', self.action, summary)
+            if batch.cancelled:
+                summary = 'Cancelled.\n' + summary
+            self.write('\n' + summary + '\n')
+            after(0, sublime.status_message, 'Dart: Changed {} files.'.format(
+                                                stats.changed))
+
+        batch = RequestWindow(paths, send, on_response, on_done,
+                              size=MAX_IN_FLIGHT)
+        DartOrganizePackageCommand.window_in_flight = batch
+        batch.start()
+
+    def apply_to_view(self, path, edits):
+        view, change_count = self.open_views[path]
+        # Check again; the buffer may have changed since the response came.
+        if view.change_count() != change_count:
+            self.write('Error    {}: {}\n'.format(
+                       os.path.relpath(path, self.root), EDITED_MEANWHILE))
+            return
+        view.run_command('dart_apply_source_edits', {'edits': edits})
+
+
+class DartCancelOrganizePackageCommand(sublime_plugin.WindowCommand):
+    def run(self):
+        if DartOrganizePackageCommand.window_in_flight:
+            DartOrganizePackageCommand.window_in_flight.cancel()
+
+    def is_enabled(self):
+        return DartOrganizePackageCommand.window_in_flight is not None
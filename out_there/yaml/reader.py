@@ -12,6 +12,8 @@
 # Reader provides the following methods and attributes:
 #   reader.peek(length=1) - return the next `length` characters
 #   reader.forward(length=1) - move the current position to `length` characters.
+#   reader.run_length(pattern) - the number of characters `pattern` matches
+#       at the current position.
 #   reader.index - the number of the current character.
 #   reader.line, stream.column - the line and the column of the current character.
 
@@ -21,6 +23,9 @@ from .error import YAMLError, Mark
 
 import codecs, re
 
+# Characters that change the line or the column in an unusual way.
+LINE_CHANGERS = re.compile('[\r\n\x85\u2028\u2029\uFEFF]')
+
 class ReaderError(YAMLError):
 
     def __init__(self, name, position, character, encoding, reason):
@@ -54,7 +59,8 @@ class Reader(object):
     #  - a file-like object with its `read` method returning `str`,
     #  - a file-like object with its `read` method returning `unicode`.
 
-    # Yeah, it's ugly and slow.
+    # Runs of characters are measured with regular expressions and moved
+    # over in one step; see `run_length` and `forward`.
 
     def __init__(self, stream):
         self.name = None
@@ -96,9 +102,26 @@ class Reader(object):
             self.update(length)
         return self.buffer[self.pointer:self.pointer+length]
 
+    def run_length(self, pattern):
+        # Returns the length of the match of the compiled `pattern` at the
+        # current position. The pattern must stop at '\0', which ends the
+        # buffer once the whole stream has been read.
+        while True:
+            end = pattern.match(self.buffer, self.pointer).end()
+            if end < len(self.buffer) or self.raw_buffer is None:
+                return end-self.pointer
+            self.update(end-self.pointer+1)
+
     def forward(self, length=1):
         if self.pointer+length+1 >= len(self.buffer):
             self.update(length+1)
+        if LINE_CHANGERS.search(self.buffer, self.pointer,
+                self.pointer+length) is None:
+            # Same line; every character takes one column.
+            self.pointer += length
+            self.index += length
+            self.column += length
+            return
         while length:
             ch = self.buffer[self.pointer]
             self.pointer += 1
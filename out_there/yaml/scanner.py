@@ -29,6 +29,23 @@ __all__ = ['Scanner', 'ScannerError']
 from .error import MarkedYAMLError
 from .tokens import *
 
+import re
+
+# Runs of characters the scanners skip or take in one step; see
+# `Reader.run_length`. None of them match '\0'.
+SPACES = re.compile(' *')
+SPACES_AND_TABS = re.compile('[ \t]*')
+NON_BREAKS = re.compile('[^\0\r\n\x85\u2028\u2029]*')
+# Plain scalar text up to a space, a break or ': ' (block context) ...
+PLAIN_BLOCK = re.compile('[^\0 \t\r\n\x85\u2028\u2029:]*'
+        '(?::(?![\0 \t\r\n\x85\u2028\u2029])[^\0 \t\r\n\x85\u2028\u2029:]*)*')
+# ... or up to a space, a break or one of ',:?[]{}' (flow context).
+PLAIN_FLOW = re.compile('[^\0 \t\r\n\x85\u2028\u2029,:?\\[\\]{}]*')
+# Characters that may start a token other than a plain scalar.
+INDICATORS = frozenset('\0%-.[{]},?:*&!|>\'\"')
+
+QUOTED_NON_SPACES = re.compile('[^\'\"\\\\\0 \t\r\n\x85\u2028\u2029]*')
+
 class ScannerError(MarkedYAMLError):
     pass
 
@@ -144,6 +161,8 @@ class Scanner:
             return False
         if not self.tokens:
             return True
+        if not self.possible_simple_keys:
+            return False
         # The current token may be a potential simple key, so we
         # need to look further.
         self.stale_possible_simple_keys()
@@ -165,6 +184,15 @@ class Scanner:
         # Peek the next character.
         ch = self.peek()
 
+        # Most tokens are plain scalars; don't check for indicators they
+        # can't start with.
+        if ch not in INDICATORS:
+            if self.check_plain():
+                return self.fetch_plain()
+            raise ScannerError("while scanning for the next token", None,
+                    "found character %r that cannot start any token" % ch,
+                    self.get_mark())
+
         # Is it the end of stream?
         if ch == '\0':
             return self.fetch_stream_end()
@@ -774,11 +802,11 @@ class Scanner:
             self.forward()
         found = False
         while not found:
-            while self.peek() == ' ':
-                self.forward()
+            length = self.run_length(SPACES)
+            if length:
+                self.forward(length)
             if self.peek() == '#':
-                while self.peek() not in '\0\r\n\x85\u2028\u2029':
-                    self.forward()
+                self.forward(self.run_length(NON_BREAKS))
             if self.scan_line_break():
                 if not self.flow_level:
                     self.allow_simple_key = True
@@ -888,8 +916,7 @@ class Scanner:
         while self.peek() == ' ':
             self.forward()
         if self.peek() == '#':
-            while self.peek() not in '\0\r\n\x85\u2028\u2029':
-                self.forward()
+            self.forward(self.run_length(NON_BREAKS))
         ch = self.peek()
         if ch not in '\0\r\n\x85\u2028\u2029':
             raise ScannerError("while scanning a directive", start_mark,
@@ -1006,9 +1033,7 @@ class Scanner:
         while self.column == indent and self.peek() != '\0':
             chunks.extend(breaks)
             leading_non_space = self.peek() not in ' \t'
-            length = 0
-            while self.peek(length) not in '\0\r\n\x85\u2028\u2029':
-                length += 1
+            length = self.run_length(NON_BREAKS)
             chunks.append(self.prefix(length))
             self.forward(length)
             line_break = self.scan_line_break()
@@ -1095,8 +1120,7 @@ class Scanner:
         while self.peek() == ' ':
             self.forward()
         if self.peek() == '#':
-            while self.peek() not in '\0\r\n\x85\u2028\u2029':
-                self.forward()
+            self.forward(self.run_length(NON_BREAKS))
         ch = self.peek()
         if ch not in '\0\r\n\x85\u2028\u2029':
             raise ScannerError("while scanning a block scalar", start_mark,
@@ -1114,7 +1138,7 @@ class Scanner:
                 chunks.append(self.scan_line_break())
                 end_mark = self.get_mark()
             else:
-                self.forward()
+                self.forward(self.run_length(SPACES))
                 if self.column > max_indent:
                     max_indent = self.column
         return chunks, max_indent, end_mark
@@ -1123,15 +1147,20 @@ class Scanner:
         # See the specification for details.
         chunks = []
         end_mark = self.get_mark()
-        while self.column < indent and self.peek() == ' ':
-            self.forward()
+        self.skip_indentation(indent)
         while self.peek() in '\r\n\x85\u2028\u2029':
             chunks.append(self.scan_line_break())
             end_mark = self.get_mark()
-            while self.column < indent and self.peek() == ' ':
-                self.forward()
+            self.skip_indentation(indent)
         return chunks, end_mark
 
+    def skip_indentation(self, indent):
+        # Skips spaces up to the column `indent`.
+        if self.column < indent:
+            length = min(self.run_length(SPACES), indent-self.column)
+            if length:
+                self.forward(length)
+
     def scan_flow_scalar(self, style):
         # See the specification for details.
         # Note that we loose indentation rules for quoted scalars. Quoted
@@ -1186,9 +1215,7 @@ class Scanner:
         # See the specification for details.
         chunks = []
         while True:
-            length = 0
-            while self.peek(length) not in '\'\"\\\0 \t\r\n\x85\u2028\u2029':
-                length += 1
+            length = self.run_length(QUOTED_NON_SPACES)
             if length:
                 chunks.append(self.prefix(length))
                 self.forward(length)
@@ -1228,9 +1255,7 @@ class Scanner:
     def scan_flow_scalar_spaces(self, double, start_mark):
         # See the specification for details.
         chunks = []
-        length = 0
-        while self.peek(length) in ' \t':
-            length += 1
+        length = self.run_length(SPACES_AND_TABS)
         whitespaces = self.prefix(length)
         self.forward(length)
         ch = self.peek()
@@ -1260,8 +1285,9 @@ class Scanner:
                     and self.peek(3) in '\0 \t\r\n\x85\u2028\u2029':
                 raise ScannerError("while scanning a quoted scalar", start_mark,
                         "found unexpected document separator", self.get_mark())
-            while self.peek() in ' \t':
-                self.forward()
+            length = self.run_length(SPACES_AND_TABS)
+            if length:
+                self.forward(length)
             if self.peek() in '\r\n\x85\u2028\u2029':
                 chunks.append(self.scan_line_break())
             else:
@@ -1283,17 +1309,13 @@ class Scanner:
         #    indent = 1
         spaces = []
         while True:
-            length = 0
             if self.peek() == '#':
                 break
-            while True:
-                ch = self.peek(length)
-                if ch in '\0 \t\r\n\x85\u2028\u2029'    \
-                        or (not self.flow_level and ch == ':' and
-                                self.peek(length+1) in '\0 \t\r\n\x85\u2028\u2029') \
-                        or (self.flow_level and ch in ',:?[]{}'):
-                    break
-                length += 1
+            if self.flow_level:
+                length = self.run_length(PLAIN_FLOW)
+            else:
+                length = self.run_length(PLAIN_BLOCK)
+            ch = self.peek(length)
             # It's not clear what we should do with ':' in the flow context.
             if (self.flow_level and ch == ':'
                     and self.peek(length+1) not in '\0 \t\r\n\x85\u2028\u2029,[]{}'):
@@ -1319,9 +1341,7 @@ class Scanner:
         # The specification is really confusing about tabs in plain scalars.
         # We just forbid them completely. Do not use tabs in YAML!
         chunks = []
-        length = 0
-        while self.peek(length) in ' ':
-            length += 1
+        length = self.run_length(SPACES)
         whitespaces = self.prefix(length)
         self.forward(length)
         ch = self.peek()
@@ -1335,7 +1355,7 @@ class Scanner:
             breaks = []
             while self.peek() in ' \r\n\x85\u2028\u2029':
                 if self.peek() == ' ':
-                    self.forward()
+                    self.forward(self.run_length(SPACES))
                 else:
                     breaks.append(self.scan_line_break())
                     prefix = self.prefix(3)
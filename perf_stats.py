@@ -0,0 +1,248 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Shows what the plugin is busy with, and how long it takes.
+'''
+
+import os
+
+import sublime
+import sublime_plugin
+
+from Dart.sublime_plugin_lib import PluginLogger
+from Dart.sublime_plugin_lib.panels import OutputPanel
+from Dart.sublime_plugin_lib.sublime import after
+
+from Dart import analyzer
+from Dart._init_ import editor_context
+from Dart.lib.memory import count_types
+from Dart.lib.memory import diff_counts
+from Dart.lib.memory import diff_snapshots
+from Dart.lib.memory import report_structures
+from Dart.lib.memory import stop_tracing
+from Dart.lib.memory import take_snapshot
+from Dart.lib.perf import metrics
+from Dart.lib.perf import render_stats
+from Dart.lib.profiling import make_profile_path
+from Dart.lib.profiling import Sampler
+from Dart.lib.profiling import session as profiling_session
+from Dart.lib.profiling import to_folded
+from Dart.lib.profiling import top_sampled
+from Dart.lib.profiling import top_stats
+from Dart.lib.trace import format_trace
+from Dart.lib.trace import trace
+
+
+_logger = PluginLogger(__name__)
+
+
+# How often the dashboard is updated, in ms.
+REFRESH_INTERVAL = 1000
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_queue_depths():
+    server = analyzer.g_server
+    if not server:
+        return []
+    return [(server.requests.name, server.requests.qsize()),
+            (server.responses.name, server.responses.qsize())]
+
+
+class DartShowPerfStatsCommand(sublime_plugin.WindowCommand):
+    '''Opens a scratch view with live performance stats: queue depths,
+    request latencies, notification rates, UI thread time in handlers and
+    the state of the server threads.
+    '''
+
+    # The dashboard, if open.
+    view = None
+
+    def run(self):
+        view = DartShowPerfStatsCommand.view
+        if view and view.window():
+            view.window().focus_view(view)
+            return
+
+        view = self.window.new_file()
+        view.set_name('Dart - Performance')
+        view.set_scratch(True)
+        view.set_read_only(True)
+        view.settings().set('word_wrap', False)
+        DartShowPerfStatsCommand.view = view
+        update(view)
+
+
+def update(view):
+    # Stop once the view is closed.
+    if not view.window() or view != DartShowPerfStatsCommand.view:
+        return
+
+    text = render_stats(metrics.snapshot(), get_queue_depths())
+    view.set_read_only(False)
+    view.run_command('dart_replace_view_text', {'text': text})
+    view.set_read_only(True)
+    after(REFRESH_INTERVAL, update, view)
+
+
+class DartDumpProtocolTraceCommand(sublime_plugin.WindowCommand):
+    '''Opens a scratch view with the last messages exchanged with the
+    analysis server. Useful to attach to bug reports about hangs.
+    '''
+
+    def run(self, count=200):
+        view = self.window.new_file()
+        view.set_name('Dart - Protocol Trace')
+        view.set_scratch(True)
+        view.settings().set('word_wrap', False)
+        view.run_command('dart_replace_view_text',
+                         {'text': format_trace(trace.last(count))})
+
+
+def is_plugin_frame(frame):
+    return frame.f_code.co_filename.startswith(_PACKAGE_DIR)
+
+
+def get_profiles_dir():
+    return os.path.join(sublime.packages_path(), 'User', 'Dart', 'profiles')
+
+
+class DartStartProfilerCommand(sublime_plugin.WindowCommand):
+    '''Starts profiling the plugin's threads and UI callbacks.
+
+    Nothing is measured until this command runs, so the hooks can stay in
+    place in normal use.
+    '''
+
+    # The running `Sampler`, if sampling.
+    sampler = None
+
+    def run(self, mode='deterministic', interval=5):
+        '''
+        @mode
+          One of: deterministic, sampling.
+
+        @interval
+          Sampling interval in ms.
+        '''
+        if mode == 'sampling':
+            sampler = Sampler(interval=interval / 1000,
+                              include=is_plugin_frame)
+            sampler.start()
+            DartStartProfilerCommand.sampler = sampler
+        else:
+            profiling_session.start()
+        _logger.info('started %s profiler', mode)
+        sublime.status_message('Dart: Profiling ({})...'.format(mode))
+
+    def is_enabled(self):
+        return not (profiling_session.running or DartStartProfilerCommand.sampler)
+
+
+class DartStopProfilerCommand(sublime_plugin.WindowCommand):
+    '''Stops profiling, saves the profile under User/Dart/profiles and
+    shows the top functions in a panel.
+    '''
+
+    def run(self, top=30):
+        sampler = DartStartProfilerCommand.sampler
+        DartStartProfilerCommand.sampler = None
+
+        os.makedirs(get_profiles_dir(), exist_ok=True)
+        if sampler:
+            counts = sampler.stop()
+            path = make_profile_path(get_profiles_dir(), '.folded')
+            with open(path, 'wt', encoding='utf-8') as f:
+                f.write(to_folded(counts))
+            summary = top_sampled(counts, top)
+        else:
+            stats = profiling_session.stop()
+            if stats is None:
+                sublime.status_message('Dart: Nothing was profiled.')
+                return
+            path = make_profile_path(get_profiles_dir(), '.pstats')
+            stats.dump_stats(path)
+            summary = top_stats(stats, top)
+
+        _logger.info('saved profile to %s', path)
+        panel = OutputPanel('dart.profile')
+        panel.write('Profile saved to {}\n\n'.format(path))
+        panel.write(summary)
+        panel.show()
+
+    def is_enabled(self):
+        return bool(profiling_session.running or DartStartProfilerCommand.sampler)
+
+
+def get_server_memory_items():
+    server = analyzer.g_server
+    if not server:
+        return []
+
+    items = [('pending ids ({})'.format('any view' if view_id is None
+                                        else 'view {}'.format(view_id)),
+              count, None)
+             for (view_id, count) in sorted(
+                server.request_ids.pending_counts().items(), key=str)]
+    items.extend([
+        ('request ids', None, server.request_ids),
+        ('request callbacks', len(server.callbacks), server.callbacks),
+        ('overlays', None, server.overlays),
+        ('searches', None, server.searches),
+        ('queue backlog (requests)', server.requests.qsize(), None),
+        ('queue backlog (responses)', server.responses.qsize(), None),
+    ])
+    return items
+
+
+class DartMemorySnapshotCommand(sublime_plugin.WindowCommand):
+    '''Reports the size of the main structures the plugin holds, and what
+    has grown since the previous snapshot.
+
+    The first run starts tracemalloc where available; run with `stop` to
+    stop tracing and forget the snapshots.
+    '''
+
+    # Previous type counts and tracemalloc snapshot.
+    previous = None
+
+    def run(self, stop=False):
+        if stop:
+            stop_tracing()
+            DartMemorySnapshotCommand.previous = None
+            sublime.status_message('Dart: Stopped memory tracing.')
+            return
+
+        panel = OutputPanel('dart.memory')
+        panel.write(report_structures(editor_context.get_memory_items() +
+                                      get_server_memory_items()) + '\n')
+
+        counts = count_types()
+        snapshot = take_snapshot(_PACKAGE_DIR)
+        previous = DartMemorySnapshotCommand.previous
+        DartMemorySnapshotCommand.previous = (counts, snapshot)
+
+        if previous is None:
+            panel.write('\nSnapshot taken; run again to see what changed.\n')
+            if snapshot is None:
+                panel.write('(tracemalloc is not available; counting objects '
+                            'only.)\n')
+            panel.show()
+            return
+
+        panel.write('\nObjects by type (count, change):\n')
+        for name, count, change in diff_counts(previous[0], counts):
+            panel.write('  {:<60} {:>8} {:>+8}\n'.format(name, count, change))
+
+        if snapshot is not None and previous[1] is not None:
+            panel.write('\nAllocations by line:\n')
+            for line in diff_snapshots(previous[1], snapshot):
+                panel.write('  ' + line + '\n')
+        panel.show()
+
+
+class DartReplaceViewText(sublime_plugin.TextCommand):
+    def run(self, edit, text):
+        self.view.replace(edit, sublime.Region(0, self.view.size()), text)
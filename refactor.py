@@ -0,0 +1,172 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Refactorings provided by the analysis server.
+'''
+
+import sublime
+import sublime_plugin
+
+from Dart.sublime_plugin_lib import PluginLogger
+from Dart.sublime_plugin_lib.sublime import after
+
+from Dart import analyzer
+from Dart.lib.analyzer.analyzer import AnalysisServer
+from Dart.lib.analyzer.api.protocol import ExtractLocalVariableOptions
+from Dart.lib.analyzer.api.protocol import InlineMethodOptions
+from Dart.lib.analyzer.api.protocol import RefactoringKind
+from Dart.lib.analyzer.api.protocol import RefactoringProblemSeverity
+from Dart.lib.analyzer.api.protocol import RenameOptions
+from Dart.lib.error import ChangeConflictError
+from Dart.lib.path import is_view_dart_script
+from Dart.lib.perf import Stopwatch
+from Dart.lib.source_changes import ChangePlan
+
+
+_logger = PluginLogger(__name__)
+
+
+# Refactorings that need a name from the user, and how to ask for it.
+NAMED_KINDS = {
+    RefactoringKind.RENAME: 'New name:',
+    RefactoringKind.EXTRACT_LOCAL_VARIABLE: 'Variable name:',
+}
+
+
+def make_options(kind, name=None):
+    if kind == RefactoringKind.RENAME:
+        return RenameOptions(name)
+    if kind == RefactoringKind.EXTRACT_LOCAL_VARIABLE:
+        return ExtractLocalVariableOptions(name, True)
+    if kind == RefactoringKind.INLINE_METHOD:
+        return InlineMethodOptions(True, True)
+
+
+def find_open_views(path):
+    return [v for w in sublime.windows() for v in w.views()
+            if v.file_name() == path]
+
+
+def get_open_dart_views():
+    return [v for w in sublime.windows() for v in w.views()
+            if v.file_name() and is_view_dart_script(v)]
+
+
+def apply_source_change(change, versions):
+    '''Applies @change to open views and files on disk, or to nothing at all
+    if any of them has changed since the change was computed.
+
+    @versions
+      Maps paths of open files to their views' change counts when the
+      change was requested.
+
+    Returns the number of files changed.
+    '''
+    with Stopwatch() as sw:
+        plan = ChangePlan(change, lambda path: bool(find_open_views(path)))
+
+        views = {}
+        for path in plan.view_edits:
+            view = find_open_views(path)[0]
+            if view.change_count() != versions.get(path):
+                raise ChangeConflictError('{} has changed'.format(path))
+            views[path] = view
+
+        plan.write_files()
+        for path, edits in plan.view_edits.items():
+            views[path].run_command('dart_apply_source_edits',
+                                    {'edits': edits})
+
+    _logger.info('applied change to %d files (%d open) in %.0fms',
+                 len(plan.files), len(plan.view_edits), sw.ms)
+    return len(plan.files)
+
+
+class DartRefactorCommand(sublime_plugin.WindowCommand):
+    '''Runs a refactoring on the selection or the element under the caret.
+
+    Changes to files that aren't open are written to disk directly, so
+    renaming a widely used element doesn't open lots of views.
+    '''
+
+    def run(self, kind=RefactoringKind.RENAME, name=None):
+        '''
+        @kind
+          A `RefactoringKind`.
+
+        @name
+          The name for refactorings that need one. If missing, the user is
+          prompted for it.
+        '''
+        view = self.window.active_view()
+        if not (view and view.file_name() and is_view_dart_script(view)):
+            return
+
+        if not AnalysisServer.ping():
+            return
+
+        try:
+            sel = view.sel()[0]
+        except IndexError:
+            return
+
+        if kind in NAMED_KINDS and not name:
+            initial = ''
+            if kind == RefactoringKind.RENAME:
+                initial = view.substr(view.word(sel.b))
+            self.window.show_input_panel(NAMED_KINDS[kind], initial,
+                    lambda text: self.run(kind=kind, name=text), None, None)
+            return
+
+        # The server must see what we see.
+        versions = {}
+        for v in get_open_dart_views():
+            if v.is_dirty():
+                analyzer.g_server.send_change_content(v)
+            versions[v.file_name()] = v.change_count()
+
+        def callback(result, error):
+            after(0, self.on_result, kind, result, error, versions)
+
+        analyzer.g_server.send_get_refactoring(kind, view.file_name(),
+                                               sel.begin(), sel.size(),
+                                               make_options(kind, name),
+                                               callback)
+
+    def on_result(self, kind, result, error, versions):
+        title = kind.replace('_', ' ').lower()
+        if error:
+            sublime.status_message('Dart: Cannot {}: {}'.format(
+                                   title, error.get('message')))
+            return
+
+        problems = (result.initialProblems + result.optionsProblems +
+                    result.finalProblems)
+        blocking = [p for p in problems if p.severity in
+                    (RefactoringProblemSeverity.ERROR,
+                     RefactoringProblemSeverity.FATAL)]
+        if blocking:
+            sublime.error_message('Dart: Cannot {}:\n\n{}'.format(
+                                  title, '\n'.join(p.message for p in blocking)))
+            return
+
+        warnings = [p for p in problems
+                    if p.severity == RefactoringProblemSeverity.WARNING]
+        if warnings and not sublime.ok_cancel_dialog(
+                '\n'.join(p.message for p in warnings) + '\n\nContinue?'):
+            return
+
+        if not result.change:
+            sublime.status_message('Dart: Nothing to change.')
+            return
+
+        try:
+            count = apply_source_change(result.change, versions)
+        except ChangeConflictError as e:
+            sublime.error_message('Dart: Cannot {}; {}. Try again.'.format(
+                                  title, e))
+            return
+
+        sublime.status_message('Dart: {} ({} files changed)'.format(
+                               result.change.message, count))
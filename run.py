@@ -24,6 +24,9 @@ from Dart.sublime_plugin_lib.sublime import after
 from Dart.sublime_plugin_lib.subprocess import GenericBinary
 from Dart.lib.sdk import PubServe
 from Dart.lib.event import EventSource
+from Dart.lib.package_uris import LOCATION_REGEX
+from Dart.lib.package_uris import LocationRewriter
+from Dart.lib.package_uris import uri_resolver
 from Dart.lib import ga
 
 
@@ -353,6 +356,9 @@ class DartRunFileCommand(DartBuildCommandBase):
             # we need to do additional processing in this case, so we don't
             # use the regular .execute() method to manage the subprocess.
             self.panel = OutputPanel('dart.out')
+            self.panel.set('result_file_regex', LOCATION_REGEX)
+            self.panel.set('result_base_dir', working_dir)
+            self.locations = LocationRewriter(uri_resolver, working_dir)
             self.panel.write('=' * 80)
             self.panel.write('\n')
             self.panel.write('Running dart with Observatory.\n')
@@ -385,7 +391,8 @@ class DartRunFileCommand(DartBuildCommandBase):
         self.execute(
             cmd=[SDK().path_to_dart, '--checked', file_name],
             working_dir=working_dir,
-            file_regex=r"'file:///(.+)': error: line (\d+) pos (\d+): (.*)$",
+            file_regex=LOCATION_REGEX,
+            uri_root=working_dir,
             preamble=preamble.format(file_name),
             )
         DartRunFileCommand.is_script_running = True
@@ -433,13 +440,14 @@ class DartRunFileCommand(DartBuildCommandBase):
             DartRunFileCommand.observatory = None
 
             if self.panel:
+                self.panel.write(self.locations.flush())
                 self.panel.write('[Observatory stopped]\n')
 
     def on_data(self, text):
-        self.panel.write(text)
+        self.panel.write(self.locations.feed(text))
 
     def on_error(self, text):
-        self.panel.write(text)
+        self.panel.write(self.locations.feed(text))
 
 
 class DartRunPubspecCommand(DartBuildCommandBase):
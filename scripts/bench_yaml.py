@@ -0,0 +1,107 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+"""
+time the YAML loaders on a corpus of documents
+
+usage: python3 scripts/bench_yaml.py [path/to/file.yaml ...]
+
+The plugin must be checked out in a directory called Dart. Without paths,
+the pubspec files under bin/ are used, plus generated documents in various
+styles. For each document, the vendored PyYAML's scanner and loader are
+timed, as is the fast pub loader where the document is simple enough for
+it.
+"""
+
+from timeit import timeit
+import glob
+import os
+import sys
+
+
+_this_dir = os.path.dirname(__file__)
+_parent = os.path.realpath(os.path.join(_this_dir, '..'))
+sys.path.insert(0, os.path.dirname(_parent))
+
+from Dart.lib.pub_yaml import load_fast
+from Dart.lib.pub_yaml import Unsupported
+from Dart.out_there.yaml import load
+from Dart.out_there.yaml import scan
+
+
+def make_lock_file(count):
+    lines = ['# Generated by pub', 'packages:']
+    for i in range(count):
+        lines.extend(['  package_{}:'.format(i),
+                      '    description: package_{}'.format(i),
+                      '    source: hosted',
+                      '    version: "1.{}.0+1"'.format(i)])
+    lines.append('sdk: ">=1.9.0 <2.0.0"')
+    return '\n'.join(lines) + '\n'
+
+
+def make_options_file(count):
+    lines = ['# Analysis options.', 'analyzer:', '  exclude:']
+    lines.extend('    - lib/generated/file_{}.dart'.format(i)
+                 for i in range(count))
+    lines.append('linter:')
+    lines.append('  rules: [{}]'.format(', '.join('rule_{}'.format(i)
+                                                  for i in range(count))))
+    return '\n'.join(lines) + '\n'
+
+
+def make_text_file(count):
+    lines = []
+    for i in range(count):
+        lines.append('entry_{}:'.format(i))
+        lines.append('  summary: A plain scalar that goes on for a while and'
+                     ' then some more, {}'.format(i))
+        lines.append('  quoted: "a double-quoted\\tvalue with escapes \\u00e9"')
+        lines.append("  single: 'a single-quoted value with ''quotes'''")
+        lines.append('  body: |')
+        lines.append('    A literal block scalar')
+        lines.append('    spanning a few lines.')
+    return '\n'.join(lines) + '\n'
+
+
+def get_corpus(paths):
+    if paths:
+        for path in paths:
+            with open(path, 'rt', encoding='utf-8') as f:
+                yield path, f.read()
+        return
+
+    for path in sorted(glob.glob(os.path.join(_parent, 'bin', '*',
+                                              'pubspec.*'))):
+        with open(path, 'rt', encoding='utf-8') as f:
+            yield os.path.relpath(path, _parent), f.read()
+    yield '<lock file, 2000 packages>', make_lock_file(2000)
+    yield '<options, 2000 entries>', make_options_file(2000)
+    yield '<mixed scalars, 500 entries>', make_text_file(500)
+
+
+def time_per_call(fn, text):
+    # Aim for about half a second per measurement.
+    once = timeit(lambda: fn(text), number=1)
+    number = max(1, min(100, int(0.5 / max(once, 1e-6))))
+    return timeit(lambda: fn(text), number=number) / number * 1000
+
+
+def main(paths):
+    print('{:<32} {:>7} {:>10} {:>10} {:>10}'.format(
+          'document', 'lines', 'scan', 'load', 'pub load'))
+    for name, text in get_corpus(paths):
+        try:
+            assert load_fast(text) == load(text), 'results differ: ' + name
+            fast = '{:>8.2f}ms'.format(time_per_call(load_fast, text))
+        except Unsupported:
+            fast = '{:>10}'.format('-')
+        print('{:<32} {:>7} {:>8.2f}ms {:>8.2f}ms {}'.format(
+              name[-32:], text.count('\n'),
+              time_per_call(lambda t: list(scan(t)), text),
+              time_per_call(load, text), fast))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,80 @@
+import unittest
+
+from Dart._init_ import editor_context
+from Dart.lib.analyzer.analyzer import AnalysisServer
+from Dart.lib.analyzer.api.protocol import HoverInformation
+from Dart.lib.hover import HoverRequest
+
+
+class FakeView(object):
+    def __init__(self, path, text):
+        self.path = path
+        self.text = text
+
+    def file_name(self):
+        return self.path
+
+    def size(self):
+        return len(self.text)
+
+    def substr(self, region):
+        return self.text[region.begin():region.end()]
+
+    def id(self):
+        return 1
+
+    def buffer_id(self):
+        return 1
+
+    def is_dirty(self):
+        return False
+
+    def change_count(self):
+        return 1
+
+    def sel(self):
+        return []
+
+
+class Test_AnalysisServer_content(unittest.TestCase):
+
+    def setUp(self):
+        self.server = AnalysisServer()
+        self.server.should_ignore_file = lambda path: False
+
+    def get_overlay_types(self):
+        types = []
+        while not self.server.requests.empty():
+            req = self.server.requests.get(block=False)
+            for overlay in req['params']['files'].values():
+                types.append(overlay['type'])
+        return types
+
+    def testSendsContentUpdatesInOrder(self):
+        view = FakeView('/pkg/lib/a.dart', 'class A {}')
+        self.server.send_add_content(view)
+        view.text = 'class AB {}'
+        self.server.send_change_content(view)
+        self.server.send_remove_content(view)
+        self.assertEqual(self.get_overlay_types(),
+                         ['add', 'change', 'remove'])
+
+    def testContentUpdatesClearCachedHovers(self):
+        cache = editor_context.hover_cache
+        cache.add_request('1', HoverRequest('/pkg/lib/b.dart', 1, 0, False))
+        cache.complete('1', [HoverInformation(0, 5)])
+        self.server.send_add_content(FakeView('/pkg/lib/a.dart', 'class A {}'))
+        self.assertIsNone(cache.lookup('/pkg/lib/b.dart', 1, 0))
+
+
+class Test_AnalysisServer_format(unittest.TestCase):
+
+    def setUp(self):
+        self.server = AnalysisServer()
+
+    def testFailedRequestsAreCompleted(self):
+        self.server.send_format_file(FakeView('/pkg/lib/a.dart', ''))
+        request_id = self.server.requests.get(block=False)['id']
+        callback = self.server.callbacks.pop(request_id)
+        callback(None, {'code': 'FORMAT_WITH_ERRORS', 'message': 'oops'})
+        self.assertIsNone(editor_context.format_requests.complete(request_id))
@@ -0,0 +1,94 @@
+import unittest
+
+from Dart.lib.analyzer.batch import RequestWindow
+from Dart.lib.analyzer.batch import TIMED_OUT
+
+
+class Test_RequestWindow(unittest.TestCase):
+
+    def setUp(self):
+        self.in_flight = []
+        self.responses = []
+        self.done = []
+        self.timers = []
+        self.now = 0.0
+
+    def make_window(self, items, size, on_response=None):
+        return RequestWindow(items,
+                             lambda item, cb: self.in_flight.append((item, cb)),
+                             on_response or (lambda item, result, error:
+                                self.responses.append((item, result, error))),
+                             lambda: self.done.append(True),
+                             size=size,
+                             timeout=10,
+                             clock=lambda: self.now,
+                             start_timer=lambda seconds, fn:
+                                self.timers.append((seconds, fn)))
+
+    def respond(self):
+        item, callback = self.in_flight.pop(0)
+        callback(item * 10, None)
+
+    def run_timers(self):
+        timers, self.timers = self.timers, []
+        for _, fn in timers:
+            fn()
+
+    def testKeepsAtMostSizeRequestsInFlight(self):
+        window = self.make_window([1, 2, 3, 4, 5], size=2)
+        window.start()
+        self.assertEqual([i for (i, _) in self.in_flight], [1, 2])
+        self.respond()
+        self.assertEqual([i for (i, _) in self.in_flight], [2, 3])
+        while self.in_flight:
+            self.respond()
+        self.assertEqual([i for (i, _, _) in self.responses], [1, 2, 3, 4, 5])
+        self.assertEqual(self.done, [True])
+
+    def testCancellingFinishesAtOnce(self):
+        window = self.make_window([1, 2, 3], size=2)
+        window.start()
+        window.cancel()
+        self.assertEqual(self.done, [True])
+        self.respond()
+        self.respond()
+        self.assertEqual(self.responses, [])
+        self.assertEqual(self.done, [True])
+
+    def testFinishesRightAwayIfEmpty(self):
+        self.make_window([], size=2).start()
+        self.assertEqual(self.done, [True])
+
+    def testFinishesEvenIfHandlingResponsesFails(self):
+        def fail(item, result, error):
+            raise ValueError(item)
+        window = self.make_window([1], size=2, on_response=fail)
+        window.start()
+        with self.assertRaises(ValueError):
+            self.respond()
+        self.assertEqual(self.done, [True])
+
+    def testAbandonsRequestsWithoutResponse(self):
+        window = self.make_window([1, 2, 3], size=2)
+        window.start()
+        self.assertEqual([s for (s, _) in self.timers], [10])
+        self.now = 5
+        self.respond()
+
+        # Only request 2 is old enough.
+        self.now = 10
+        self.run_timers()
+        self.assertEqual(self.responses[-1], (2, None, TIMED_OUT))
+        self.assertEqual(window.in_flight, 1)
+        self.assertEqual([s for (s, _) in self.timers], [5])
+
+        self.now = 15
+        self.run_timers()
+        self.assertEqual(self.responses[-1], (3, None, TIMED_OUT))
+        self.assertEqual(self.done, [True])
+        self.assertEqual(self.timers, [])
+
+        # Late responses are ignored.
+        self.respond()
+        self.respond()
+        self.assertEqual(len(self.responses), 3)
@@ -0,0 +1,47 @@
+import unittest
+
+from Dart.lib.analyzer.overlays import diff_content
+from Dart.lib.analyzer.overlays import OverlayTracker
+
+
+class Test_diff_content(unittest.TestCase):
+
+    def testReturnsNoneIfEqual(self):
+        self.assertEqual(diff_content('foo', 'foo'), None)
+
+    def testCanDetectInsertion(self):
+        self.assertEqual(diff_content('foo.', 'foo.bar'), (4, 0, 'bar'))
+
+    def testCanDetectDeletion(self):
+        self.assertEqual(diff_content('foo.bar', 'foo.'), (4, 3, ''))
+
+    def testCanDetectReplacement(self):
+        self.assertEqual(diff_content('a.foo();', 'a.bar();'), (2, 3, 'bar'))
+
+    def testCanDetectRepeatedCharInsertion(self):
+        self.assertEqual(diff_content('aa', 'aaa'), (2, 0, 'a'))
+
+    def testEditCanBeApplied(self):
+        old = 'main() {\n  x.\n}'
+        new = 'main() {\n  x.y\n  z;\n}'
+        offset, length, text = diff_content(old, new)
+        self.assertEqual(old[:offset] + text + old[offset + length:], new)
+
+
+class Test_OverlayTracker(unittest.TestCase):
+
+    def testUpdateFailsIfUnknownPath(self):
+        tracker = OverlayTracker()
+        self.assertRaises(KeyError, tracker.update, 'foo.dart', 'bar')
+
+    def testUpdateReturnsEdit(self):
+        tracker = OverlayTracker()
+        tracker.set('foo.dart', 'x.')
+        self.assertEqual(tracker.update('foo.dart', 'x.y'), (2, 0, 'y'))
+        self.assertEqual(tracker.update('foo.dart', 'x.y'), None)
+
+    def testCanRemove(self):
+        tracker = OverlayTracker()
+        tracker.set('foo.dart', 'x')
+        tracker.remove('foo.dart')
+        self.assertFalse('foo.dart' in tracker)
@@ -37,6 +37,14 @@ class Test_RequestIdManager(unittest.TestCase):
         _id = rm.new_id(self.view, int)
         self.assertFalse(rm.validate(self.view, {'id': '1'}))
 
+    def testRequestsWithoutViewValidateForAnyView(self):
+        rm = RequestIdManager()
+        _id = rm.new_id(None, int)
+        self.assertTrue(rm.validate(self.view, {'id': _id}))
+        self.assertTrue(rm.validate(None, {'id': _id}))
+        self.assertEqual(rm.get_response_type(self.view, _id), int)
+        self.assertFalse(rm.validate(self.view, {'id': _id}))
+
     def setUp(self):
         self.view = sublime.active_window().new_file()
 
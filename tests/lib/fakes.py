@@ -0,0 +1,17 @@
+# Copyright (c) 2014, Guillermo López-Anglada. Please see the AUTHORS file for details.
+# All rights reserved. Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.)
+
+'''Test doubles shared by the tests.
+'''
+
+
+class FakeClock(object):
+    '''A clock that only moves when tests set `now`.
+    '''
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
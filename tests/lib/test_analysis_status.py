@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+
+from Dart.lib.analysis_status import AnalysisStatusTracker
+from Dart.lib.analysis_status import parse_plugin_version
+from Dart.lib.analysis_status import StatusHistory
+from Dart.lib.analysis_status import summarize
+from Dart.lib.analysis_status import to_record
+from Dart.lib.analysis_status import TRIGGER_EDIT
+from Dart.lib.analysis_status import TRIGGER_ROOTS
+from Dart.lib.analysis_status import TRIGGER_STARTUP
+from Dart.tests.lib.fakes import FakeClock
+
+
+class Test_AnalysisStatusTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(now=100.0)
+        self.tracker = AnalysisStatusTracker(clock=self.clock)
+
+    def testCanRecordTimeToQuiescence(self):
+        self.tracker.mark(TRIGGER_STARTUP)
+        self.clock.now += 2
+        self.assertIsNone(self.tracker.update(True, 'lib/a.dart'))
+        self.assertTrue(self.tracker.is_analyzing)
+        # Repeated notifications don't start a new interval.
+        self.clock.now += 1
+        self.tracker.update(True, 'lib/b.dart')
+        self.clock.now += 3
+        finished = self.tracker.update(False)
+        self.assertEqual(finished.trigger, TRIGGER_STARTUP)
+        self.assertEqual(finished.quiescence_ms, 6000)
+        self.assertEqual(finished.analyzing_ms, 4000)
+        self.assertFalse(self.tracker.is_analyzing)
+        self.assertEqual(self.tracker.get_history(), [finished])
+
+    def testUnmarkedAnalysisIsAnEdit(self):
+        self.tracker.update(True)
+        self.clock.now += 1
+        self.assertEqual(self.tracker.update(False).trigger, TRIGGER_EDIT)
+
+    def testTriggerDuringEditAnalysisTakesOver(self):
+        self.tracker.update(True)
+        self.clock.now += 1
+        self.tracker.mark(TRIGGER_ROOTS)
+        self.clock.now += 1
+        finished = self.tracker.update(False)
+        self.assertEqual(finished.trigger, TRIGGER_ROOTS)
+        self.assertEqual(finished.quiescence_ms, 1000)
+
+    def testIdleWithoutAnalysisIsIgnored(self):
+        self.assertIsNone(self.tracker.update(False))
+
+
+class Test_StatusHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = StatusHistory(os.path.join(self.tmp.name, 'Dart',
+                                                  'history.jsonl'),
+                                     max_records=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testCanSaveAndTrimRecords(self):
+        self.assertEqual(self.history.read(), [])
+        for i in range(5):
+            self.history.append({'quiescence_ms': i})
+        self.assertEqual(self.history.read(),
+                         [{'quiescence_ms': 3}, {'quiescence_ms': 4}])
+        with open(self.history.path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def testCanSummarize(self):
+        tracker = AnalysisStatusTracker(clock=FakeClock(now=100.0))
+        tracker.mark(TRIGGER_STARTUP)
+        tracker.update(True)
+        tracker.clock.now += 1
+        record = to_record(tracker.update(False), '1.0.0', '1.9.0')
+        self.assertEqual(record['quiescence_ms'], 1000)
+        lines = summarize([record, dict(record, quiescence_ms=3000)]).split('\n')
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].split(),
+                         ['1.0.0', '1.9.0', 'startup', '2', '2000', '3000'])
+
+
+class Test_parse_plugin_version(unittest.TestCase):
+
+    def testPicksNewestVersion(self):
+        text = json.dumps({'install': 'x', '0.9.0': 'a', '0.10.0': 'b'})
+        self.assertEqual(parse_plugin_version(text), '0.10.0')
+
+    def testIgnoresBadInput(self):
+        self.assertIsNone(parse_plugin_version(''))
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from Dart.lib.batch_format import find_dart_files
+from Dart.lib.batch_format import format_files
+from Dart.lib.batch_format import summarize
+
+
+def upper(text):
+    if 'error' in text:
+        raise ValueError('bad')
+    return text.upper()
+
+
+class Test_batch_format(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for rel, text in [('lib/a.dart', 'a'), ('lib/b.dart', 'B'),
+                          ('lib/c.dart', 'error'), ('lib/README', 'x'),
+                          ('packages/foo/foo.dart', 'foo'),
+                          ('build/web/main.dart', 'main'),
+                          ('.pub/x.dart', 'x')]:
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, rel):
+        return os.path.join(self.root, rel)
+
+    def testSkipsDependenciesAndBuildOutput(self):
+        self.assertEqual(find_dart_files(self.root),
+                         [self.path('lib/a.dart'), self.path('lib/b.dart'),
+                          self.path('lib/c.dart')])
+
+    def testWritesOnlyChangedFiles(self):
+        seen = []
+        paths = find_dart_files(self.root)
+        os.utime(self.path('lib/b.dart'), ns=(0, 0))
+
+        results = format_files(paths, upper, seen.append, max_workers=2)
+
+        by_path = {r.path: r for r in results}
+        self.assertEqual(len(seen), 3)
+        self.assertTrue(by_path[self.path('lib/a.dart')].changed)
+        self.assertFalse(by_path[self.path('lib/b.dart')].changed)
+        self.assertEqual(by_path[self.path('lib/c.dart')].error, 'bad')
+        self.assertEqual(os.stat(self.path('lib/b.dart')).st_mtime_ns, 0)
+        with open(self.path('lib/a.dart')) as f:
+            self.assertEqual(f.read(), 'A')
+
+        self.assertTrue(summarize(results, 10).startswith(
+                        '3 files, 1 formatted, 1 failed'))
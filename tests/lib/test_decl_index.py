@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from Dart.lib.decl_index import DeclarationIndex
+from Dart.lib.decl_index import DeclarationIndexes
+
+
+class Test_DeclarationIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'pkg')
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+        os.makedirs(os.path.join(self.root, 'lib'))
+        self.foo = self.write('lib/foo.dart', 'class Foo {}')
+        self.bar = self.write('lib/bar.dart', 'class Bar {}')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel, text):
+        path = os.path.join(self.root, rel)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def make_index(self):
+        index = DeclarationIndex(self.root, self.cache_dir)
+        index.update_file(self.foo, [('Foo', 'CLASS', 6, 1, 7)])
+        index.update_file(self.bar, [('Bar', 'CLASS', 6, 1, 7),
+                                     ('baz', 'FUNCTION', 20, 3, 1)])
+        return index
+
+    def testCanSearchByRegex(self):
+        index = self.make_index()
+        found, stale = index.search('^Ba')
+        self.assertEqual([d.name for d in found], ['Bar'])
+        self.assertEqual(found[0].path, self.bar)
+        self.assertEqual(stale, [])
+
+    def testFallsBackToLiteralSearchForInvalidRegex(self):
+        index = self.make_index()
+        found, _ = index.search('Foo(')
+        self.assertEqual(found, [])
+
+    def testDropsFilesChangedOnDisk(self):
+        index = self.make_index()
+        os.utime(self.bar, (0, 0))
+        found, stale = index.search('a')
+        self.assertEqual(stale, [self.bar])
+        self.assertEqual([d.name for d in found], [])
+        self.assertEqual(index.search('Foo')[0][0].name, 'Foo')
+
+    def testCanRoundTripThroughDisk(self):
+        index = self.make_index()
+        index.mark_refreshed()
+        index.save()
+
+        loaded = DeclarationIndex(self.root, self.cache_dir)
+        self.assertTrue(loaded.load())
+        self.assertFalse(loaded.needs_refresh)
+        found, _ = loaded.search('.*')
+        self.assertEqual([d.name for d in found], ['Bar', 'Foo', 'baz'])
+
+    def testNeedsRefreshWhenNew(self):
+        index = DeclarationIndex(self.root, self.cache_dir)
+        self.assertFalse(index.load())
+        self.assertTrue(index.needs_refresh)
+
+    def testOnlyOneRefreshAtATime(self):
+        index = DeclarationIndex(self.root, self.cache_dir)
+        self.assertTrue(index.start_refresh())
+        self.assertFalse(index.start_refresh())
+        index.mark_refreshed()
+        self.assertTrue(index.start_refresh())
+
+
+class Test_DeclarationIndexes(unittest.TestCase):
+
+    def testInnermostRootOwnsPath(self):
+        indexes = DeclarationIndexes('cache')
+        outer = indexes.get(os.path.join('a'))
+        inner = indexes.get(os.path.join('a', 'b'))
+        path = os.path.join('a', 'b', 'lib', 'foo.dart')
+        self.assertIs(indexes.find_loaded(path), inner)
+        self.assertIs(indexes.find_loaded(os.path.join('a', 'foo.dart')), outer)
+        self.assertIsNone(indexes.find_loaded(os.path.join('c', 'foo.dart')))
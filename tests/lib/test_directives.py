@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from Dart.lib.directives import DirectiveCache
+from Dart.lib.directives import parse_directives
+
+
+HEADER = '''\
+#!/usr/bin/env dart
+// Copyright (c) 2014.
+
+/** Docs /* nested */ for the library. */
+@deprecated
+@Foo('a)', bar: const [1])
+library foo.bar;
+
+import 'dart:io';
+import "package:args/args.dart" show ArgParser;
+import r'src/raw.dart' as raw;
+export 'src/api.dart' hide Internal;
+part 'src/part.dart';
+
+void main() {
+  import 'dart:html';
+}
+'''
+
+
+class Test_parse_directives(unittest.TestCase):
+
+    def testCanParseHeader(self):
+        d = parse_directives(HEADER)
+        self.assertEqual(d.library, 'foo.bar')
+        self.assertEqual(d.imports, ['dart:io', 'package:args/args.dart',
+                                     'src/raw.dart'])
+        self.assertEqual(d.exports, ['src/api.dart'])
+        self.assertEqual(d.parts, ['src/part.dart'])
+        self.assertTrue(d.has_import('dart:io'))
+        self.assertFalse(d.has_import('dart:html'))
+
+    def testCanParsePartOf(self):
+        self.assertEqual(parse_directives('part of foo.bar;').part_of,
+                         'foo.bar')
+        self.assertEqual(parse_directives("part of '../foo.dart';").part_of,
+                         '../foo.dart')
+
+    def testStopsAtFirstDeclaration(self):
+        d = parse_directives("class A {}\nimport 'dart:io';")
+        self.assertEqual(d.imports, [])
+
+    def testIgnoresCommentedOutDirectives(self):
+        d = parse_directives("// import 'dart:io';\n/* import 'dart:html'; */")
+        self.assertEqual(d.imports, [])
+
+    def testSkipsByteOrderMark(self):
+        d = parse_directives('\ufeffimport "dart:io";')
+        self.assertEqual(d.imports, ['dart:io'])
+
+
+class Test_DirectiveCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = DirectiveCache()
+        self.reads = 0
+
+    def get_text(self, text):
+        def get():
+            self.reads += 1
+            return text
+        return get
+
+    def testParsesBuffersOncePerChange(self):
+        first = self.cache.get_for_buffer(1, 5, self.get_text(HEADER))
+        self.assertIs(self.cache.get_for_buffer(1, 5, self.get_text('')),
+                      first)
+        self.assertEqual(self.reads, 1)
+
+        d = self.cache.get_for_buffer(1, 6, self.get_text(''))
+        self.assertEqual(d.imports, [])
+        self.assertEqual(self.reads, 2)
+
+    def testCanReadFilesThatAreNotOpen(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'main.dart')
+            with open(path, 'w') as f:
+                f.write(HEADER)
+            self.assertTrue(self.cache.get_for_path(path).has_import('dart:io'))
+
+    def testCanReadFilesWithByteOrderMark(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'main.dart')
+            with open(path, 'w', encoding='utf-8-sig') as f:
+                f.write(HEADER)
+            self.assertTrue(self.cache.get_for_path(path).has_import('dart:io'))
+
+    def testReturnsNoDirectivesForMissingFiles(self):
+        self.assertEqual(self.cache.get_for_path('???').imports, [])
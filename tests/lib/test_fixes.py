@@ -0,0 +1,79 @@
+import unittest
+
+from Dart.lib.analyzer.api.protocol import AnalysisError
+from Dart.lib.analyzer.api.protocol import AnalysisErrorFixes
+from Dart.lib.analyzer.api.protocol import AnalysisErrorSeverity
+from Dart.lib.analyzer.api.protocol import AnalysisErrorType
+from Dart.lib.analyzer.api.protocol import Location
+from Dart.lib.analyzer.api.protocol import SourceChange
+from Dart.lib.analyzer.api.protocol import SourceEdit
+from Dart.lib.analyzer.api.protocol import SourceFileEdit
+from Dart.lib.fixes import choose_fix
+from Dart.lib.fixes import count_kinds
+from Dart.lib.fixes import EditMerger
+from Dart.lib.fixes import error_kind
+
+
+def make_error(message, offset):
+    return AnalysisError(AnalysisErrorSeverity.INFO, AnalysisErrorType.HINT,
+                         Location('foo.dart', offset, 1, 1, offset + 1),
+                         message)
+
+
+def make_change(message, *edits, path='foo.dart'):
+    return SourceChange(message, edits=[
+        SourceFileEdit(path, 0, edits=[SourceEdit(*e) for e in edits])])
+
+
+class Test_kinds(unittest.TestCase):
+
+    def testErrorsAboutDifferentNamesHaveSameKind(self):
+        a = make_error("The value of 'a' isn't used", 0)
+        b = make_error("The value of 'b' isn't used", 10)
+        self.assertEqual(error_kind(a), error_kind(b))
+        self.assertEqual(count_kinds([a, b, make_error('Unused import', 20)]),
+                         [(error_kind(a), 2),
+                          (error_kind(make_error('Unused import', 0)), 1)])
+
+    def testCanChooseFixByKind(self):
+        error = make_error('Unused import', 5)
+        fix = make_change("Remove import 'x'", (0, 10, ''))
+        fixes = [AnalysisErrorFixes(make_error('Unused import', 6), [fix]),
+                 AnalysisErrorFixes(error, [make_change('Ignore'), fix])]
+        self.assertIs(choose_fix(fixes, error, "Remove import ''"), fix)
+        self.assertIsNone(choose_fix(fixes, error, 'Nope'))
+
+
+class Test_EditMerger(unittest.TestCase):
+
+    def testMergesNonOverlappingChanges(self):
+        merger = EditMerger()
+        self.assertTrue(merger.add(make_change('a', (0, 5, ''))))
+        self.assertTrue(merger.add(make_change('b', (10, 2, 'x'))))
+        self.assertTrue(merger.add(make_change('c', (5, 0, 'y'))))
+        self.assertEqual(merger.get_edits(),
+                         {'foo.dart': [[0, 5, ''], [5, 0, 'y'], [10, 2, 'x']]})
+
+    def testRejectsOverlappingChanges(self):
+        merger = EditMerger()
+        merger.add(make_change('a', (0, 5, '')))
+        self.assertFalse(merger.add(make_change('b', (4, 2, 'x'))))
+        self.assertFalse(merger.add(make_change('c', (0, 0, 'y'))))
+        self.assertEqual(merger.rejected, 2)
+
+    def testRejectedChangesLeaveNoEdits(self):
+        merger = EditMerger()
+        merger.add(make_change('a', (10, 5, '')))
+        self.assertFalse(merger.add(
+            SourceChange('b', edits=[
+                SourceFileEdit('bar.dart', 0, edits=[SourceEdit(0, 1, '')]),
+                SourceFileEdit('foo.dart', 0, edits=[SourceEdit(12, 1, '')]),
+                ])))
+        self.assertEqual(list(merger.get_edits()), ['foo.dart'])
+
+    def testIdenticalEditsAreNotConflicts(self):
+        merger = EditMerger()
+        merger.add(make_change('a', (0, 0, "import 'x';\n"), (10, 1, '')))
+        self.assertTrue(merger.add(
+            make_change('b', (0, 0, "import 'x';\n"), (20, 1, ''))))
+        self.assertEqual(len(merger.get_edits()['foo.dart']), 3)
@@ -0,0 +1,29 @@
+import unittest
+
+from Dart.lib.formatting import FormatRequest
+from Dart.lib.formatting import FormatRequests
+
+
+class Test_FormatRequests(unittest.TestCase):
+
+    def testNewerRequestSupersedesOlder(self):
+        requests = FormatRequests()
+        requests.add(FormatRequest(1, 100, 5))
+        requests.add(FormatRequest(2, 100, 6))
+        self.assertIsNone(requests.complete(1))
+        self.assertEqual(requests.complete(2).version, 6)
+        self.assertEqual(requests.superseded, 1)
+
+    def testRequestsForDifferentViewsAreIndependent(self):
+        requests = FormatRequests()
+        requests.add(FormatRequest(1, 100, 5))
+        requests.add(FormatRequest(2, 200, 5))
+        self.assertIsNotNone(requests.complete(1))
+        self.assertIsNotNone(requests.complete(2))
+
+    def testRecordsLatency(self):
+        requests = FormatRequests()
+        requests.add(FormatRequest(1, 100, 5))
+        requests.complete(1)
+        requests.complete(1)
+        self.assertEqual(len(requests.latency), 1)
@@ -0,0 +1,70 @@
+import unittest
+
+from Dart.lib.analyzer.api.protocol import HighlightRegion
+from Dart.lib.analyzer.api.protocol import HighlightRegionType
+from Dart.lib.highlights import group_regions
+from Dart.lib.highlights import HighlightsCache
+from Dart.lib.highlights import split_visible
+
+
+CLASS = HighlightRegionType.CLASS
+KEYWORD = HighlightRegionType.KEYWORD
+PARAMETER = HighlightRegionType.PARAMETER_REFERENCE
+
+
+class Test_group_regions(unittest.TestCase):
+
+    def testGroupsRegionsAndSkipsSyntacticOnes(self):
+        groups = group_regions([
+            HighlightRegion(CLASS, 20, 3),
+            HighlightRegion(KEYWORD, 0, 5),
+            HighlightRegion(CLASS, 6, 3),
+            HighlightRegion(PARAMETER, 10, 1),
+            ])
+        self.assertEqual(groups, {'type': ((6, 9), (20, 23)),
+                                  'parameter': ((10, 11),)})
+
+
+class Test_split_visible(unittest.TestCase):
+
+    def testCanSplitSpans(self):
+        spans = ((0, 3), (10, 13), (20, 23), (1000, 1003))
+        self.assertEqual(split_visible(spans, 12, 500),
+                         ([(10, 13), (20, 23)], True))
+        self.assertEqual(split_visible(spans, 0, 2000), (list(spans), False))
+
+
+class Test_HighlightsCache(unittest.TestCase):
+
+    def testOnlyReportsChangedGroups(self):
+        cache = HighlightsCache()
+        changed, removed = cache.update('foo.dart', [
+            HighlightRegion(CLASS, 0, 3),
+            HighlightRegion(PARAMETER, 10, 1)])
+        self.assertEqual(sorted(changed), ['parameter', 'type'])
+        self.assertEqual(removed, [])
+
+        changed, removed = cache.update('foo.dart', [
+            HighlightRegion(CLASS, 0, 3),
+            HighlightRegion(PARAMETER, 12, 1)])
+        self.assertEqual(changed, {'parameter': ((12, 13),)})
+        self.assertEqual(cache.stats.churn.values(), [1.0, 0.5])
+
+        changed, removed = cache.update('foo.dart', [
+            HighlightRegion(CLASS, 0, 3)])
+        self.assertEqual(changed, {})
+        self.assertEqual(removed, ['parameter'])
+
+    def testRepaintsEverythingAfterRemoval(self):
+        cache = HighlightsCache()
+        regions = [HighlightRegion(CLASS, 0, 3)]
+        cache.update('foo.dart', regions)
+        cache.remove('foo.dart')
+        changed, _ = cache.update('foo.dart', regions)
+        self.assertEqual(list(changed), ['type'])
+
+    def testCanGetCurrentGroups(self):
+        cache = HighlightsCache()
+        cache.update('foo.dart', [HighlightRegion(CLASS, 0, 3)])
+        self.assertEqual(cache.get('foo.dart'), {'type': ((0, 3),)})
+        self.assertEqual(cache.get('bar.dart'), {})
@@ -0,0 +1,64 @@
+import unittest
+
+from Dart.lib.analyzer.api.protocol import HoverInformation
+from Dart.lib.hover import FileHovers
+from Dart.lib.hover import HoverCache
+from Dart.lib.hover import HoverRequest
+
+
+class Test_FileHovers(unittest.TestCase):
+
+    def testSpanCoversAllOffsets(self):
+        hovers = FileHovers(1)
+        info = [HoverInformation(10, 5, elementDescription='foo')]
+        hovers.add(12, info)
+        self.assertEqual(hovers.lookup(10), info)
+        self.assertEqual(hovers.lookup(15), info)
+        self.assertEqual(hovers.lookup(9), None)
+        self.assertEqual(hovers.lookup(16), None)
+
+    def testCanRecordMisses(self):
+        hovers = FileHovers(1)
+        hovers.add(3, [])
+        self.assertEqual(hovers.lookup(3), [])
+        self.assertEqual(hovers.lookup(4), None)
+
+    def testCanReplaceSpan(self):
+        hovers = FileHovers(1)
+        old = [HoverInformation(0, 3, elementDescription='old')]
+        new = [HoverInformation(0, 3, elementDescription='new')]
+        hovers.add(0, old)
+        hovers.add(1, new)
+        self.assertEqual(len(hovers.spans), 1)
+        self.assertEqual(hovers.lookup(2), new)
+
+
+class Test_HoverCache(unittest.TestCase):
+
+    def testCanStoreResponse(self):
+        cache = HoverCache()
+        cache.add_request('1', HoverRequest('foo.dart', 5, 12, False))
+        self.assertTrue(cache.is_pending('foo.dart', 5, 12))
+        info = [HoverInformation(10, 5)]
+        request = cache.complete('1', info)
+        self.assertEqual(request.offset, 12)
+        self.assertFalse(cache.is_pending('foo.dart', 5, 12))
+        self.assertEqual(cache.lookup('foo.dart', 5, 14), info)
+
+    def testIgnoresOtherVersions(self):
+        cache = HoverCache()
+        cache.add_request('1', HoverRequest('foo.dart', 5, 12, False))
+        cache.complete('1', [HoverInformation(10, 5)])
+        self.assertEqual(cache.lookup('foo.dart', 6, 12), None)
+
+    def testDropsStaleResponses(self):
+        cache = HoverCache()
+        cache.add_request('1', HoverRequest('foo.dart', 5, 12, False))
+        cache.add_request('2', HoverRequest('foo.dart', 4, 12, False))
+        cache.complete('1', [HoverInformation(10, 5)])
+        cache.complete('2', [HoverInformation(0, 20)])
+        self.assertEqual(cache.lookup('foo.dart', 5, 2), None)
+
+    def testIgnoresUnknownRequests(self):
+        cache = HoverCache()
+        self.assertEqual(cache.complete('1', []), None)
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+from Dart.lib.manifests import LockIndex
+from Dart.lib.manifests import ManifestCache
+from Dart.lib.manifests import parse_lock
+
+
+LOCK = '''\
+# Generated by pub
+packages:
+  browser:
+    description: browser
+    source: hosted
+    version: "0.10.0+2"
+  polymer:
+    description: polymer
+    source: hosted
+    version: "0.15.1"
+'''
+
+
+class Test_LockIndex(unittest.TestCase):
+
+    def testCanFindPackages(self):
+        index = LockIndex({'polymer': '0.15.1'})
+        self.assertTrue(index.has('polymer'))
+        self.assertFalse(index.has('browser'))
+
+    def testCanMatchVersions(self):
+        index = LockIndex({'polymer': '0.15.1'})
+        self.assertTrue(index.has('polymer', '0.15.1'))
+        self.assertFalse(index.has('polymer', '0.16.0'))
+
+    def testCanBuildFromEmptyLockFile(self):
+        self.assertEqual(LockIndex.from_data(None).versions, {})
+        self.assertEqual(LockIndex.from_data({'packages': {}}).versions, {})
+
+
+class Test_ManifestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'pubspec.lock')
+        self.write(LOCK)
+        self.stamp = 1
+        self.cache = ManifestCache(stamp=lambda path: (os.stat(path).st_size,
+                                                       self.stamp))
+        self.parsed = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def parse(self, path):
+        self.parsed.append(path)
+        return parse_lock(path)
+
+    def testCanParseLockFile(self):
+        index = self.cache.get(self.path, self.parse)
+        self.assertEqual(index.get_version('browser'), '0.10.0+2')
+        self.assertEqual(index.get_version('polymer'), '0.15.1')
+
+    def testReusesParsedFileIfUnchanged(self):
+        first = self.cache.get(self.path, self.parse)
+        self.assertIs(self.cache.get(self.path, self.parse), first)
+        self.assertEqual(len(self.parsed), 1)
+
+    def testParsesAgainIfChanged(self):
+        self.cache.get(self.path, self.parse)
+        self.write(LOCK.replace('0.15.1', '0.16.0'))
+        self.stamp = 2
+        index = self.cache.get(self.path, self.parse)
+        self.assertTrue(index.has('polymer', '0.16.0'))
+        self.assertEqual(len(self.parsed), 2)
+
+    def testRaisesIfFileIsMissing(self):
+        os.unlink(self.path)
+        self.assertRaises(OSError, self.cache.get, self.path, self.parse)
+
+    def testCanRefreshInBackground(self):
+        self.cache.refresh_async(self.path, self.parse).join()
+        self.assertEqual(len(self.cache), 1)
+        self.cache.get(self.path, self.parse)
+        self.assertEqual(len(self.parsed), 1)
+
+    def testRefreshForgetsDeletedFiles(self):
+        self.cache.get(self.path, self.parse)
+        os.unlink(self.path)
+        self.cache.refresh(self.path, self.parse)
+        self.assertEqual(len(self.cache), 0)
@@ -0,0 +1,65 @@
+import sys
+import unittest
+
+from Dart.lib.memory import approx_size
+from Dart.lib.memory import count_types
+from Dart.lib.memory import diff_counts
+from Dart.lib.memory import format_size
+from Dart.lib.memory import report_structures
+
+
+class Thing(object):
+    def __init__(self, data):
+        self.data = data
+
+
+class OddModule(object):
+    __module__ = 42
+
+
+class Test_approx_size(unittest.TestCase):
+
+    def testCountsContainedObjects(self):
+        text = 'x' * 1000
+        self.assertGreater(approx_size([text]), sys.getsizeof(text))
+        self.assertGreater(approx_size(Thing({'a': text})),
+                           sys.getsizeof(text))
+
+    def testCountsSharedObjectsOnce(self):
+        text = 'x' * 1000
+        self.assertLess(approx_size([text, text]), 2 * sys.getsizeof(text))
+
+    def testStopsAtLimit(self):
+        items = list(range(1000, 2000))
+        self.assertLess(approx_size(items, limit=10), approx_size(items))
+
+
+class Test_reports(unittest.TestCase):
+
+    def testCanFormatSizes(self):
+        self.assertEqual(format_size(10), '10B')
+        self.assertEqual(format_size(2048), '2KB')
+        self.assertEqual(format_size(3 * 1024 * 1024), '3MB')
+
+    def testCanReportStructures(self):
+        lines = report_structures([('errors', 2, ['a', 'b']),
+                                   ('queue', 5, None)]).split('\n')
+        self.assertEqual(lines[1].split()[:2], ['errors', '2'])
+        self.assertEqual(lines[2].split(), ['queue', '5', '-'])
+
+    def testCanCountAndDiffTypes(self):
+        things = [Thing(i) for i in range(3)]
+        counts = count_types(prefix=Thing.__module__)
+        self.assertEqual(counts[Thing.__module__ + '.Thing'], 3)
+
+        old = {'a': 1, 'b': 5, 'c': 2}
+        new = {'a': 1, 'b': 2, 'd': 10}
+        self.assertEqual(diff_counts(old, new),
+                         [('d', 10, 10), ('b', 2, -3), ('c', 0, -2)])
+        del things
+
+    def testSkipsTypesWithoutModuleName(self):
+        odd = OddModule()
+        counts = count_types(prefix='')
+        self.assertNotIn('42.OddModule', counts)
+        del odd
@@ -0,0 +1,47 @@
+import unittest
+
+from Dart.lib.analyzer.api.protocol import Element
+from Dart.lib.analyzer.api.protocol import ElementKind
+from Dart.lib.analyzer.api.protocol import Occurrences
+from Dart.lib.occurrences import OccurrencesCache
+from Dart.lib.occurrences import OccurrenceTable
+
+
+def make_occurrences(name, *offsets):
+    element = Element(ElementKind.LOCAL_VARIABLE, name, 0)
+    return Occurrences(element, list(offsets), len(name))
+
+
+class Test_OccurrenceTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = OccurrenceTable([
+            make_occurrences('foo', 20, 0),
+            make_occurrences('x', 3, 30),
+            ])
+
+    def testCanFindOccurrences(self):
+        self.assertEqual(self.table.lookup(1), ((0, 3), (20, 3)))
+        self.assertEqual(self.table.lookup(30), ((3, 1), (30, 1)))
+
+    def testPrefersElementStartingAtCaret(self):
+        # 'foo' ends where 'x' starts.
+        self.assertEqual(self.table.lookup(3), ((3, 1), (30, 1)))
+
+    def testFindsElementEndingAtCaret(self):
+        self.assertEqual(self.table.lookup(23), ((0, 3), (20, 3)))
+
+    def testReturnsEmptyTupleIfNothingFound(self):
+        self.assertEqual(self.table.lookup(10), ())
+        self.assertEqual(self.table.lookup(100), ())
+
+
+class Test_OccurrencesCache(unittest.TestCase):
+
+    def testCanRetainFiles(self):
+        cache = OccurrencesCache()
+        cache.update('foo.dart', [])
+        cache.update('bar.dart', [])
+        cache.retain(['bar.dart'])
+        self.assertIsNone(cache.get('foo.dart'))
+        self.assertIsNotNone(cache.get('bar.dart'))
@@ -0,0 +1,63 @@
+import unittest
+
+from Dart.lib.output_buffer import FLUSH_DELAY_MS
+from Dart.lib.output_buffer import OutputBuffer
+from Dart.lib.output_buffer import keep_last_lines
+
+
+class Test_OutputBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.source = object()
+        self.buffer = OutputBuffer(flush_size=10, max_pending=20)
+
+    def testAsksForOneDelayedFlush(self):
+        self.assertEqual(self.buffer.add(self.source, b'abc'), FLUSH_DELAY_MS)
+        self.assertIsNone(self.buffer.add(self.source, b'def'))
+
+    def testAsksForImmediateFlushWhenFull(self):
+        self.buffer.add(self.source, b'abc')
+        self.assertEqual(self.buffer.add(self.source, b'0123456789'), 0)
+        self.assertIsNone(self.buffer.add(self.source, b'abc'))
+
+    def testAsksAgainAfterTake(self):
+        self.buffer.add(self.source, b'abc')
+        self.buffer.take()
+        self.assertEqual(self.buffer.add(self.source, b'def'), FLUSH_DELAY_MS)
+
+    def testJoinsChunksFromSameSource(self):
+        other = object()
+        self.buffer.add(self.source, b'a')
+        self.buffer.add(self.source, b'b')
+        self.buffer.add(other, b'c')
+        self.buffer.add(self.source, b'd')
+        chunks, dropped = self.buffer.take()
+        self.assertEqual(chunks, [(self.source, b'ab'), (other, b'c'),
+                                  (self.source, b'd')])
+        self.assertEqual(dropped, 0)
+        self.assertEqual(len(self.buffer), 0)
+
+    def testDropsOldestChunksWhenBehind(self):
+        for data in (b'0123456789', b'abcdefghij', b'ABCDEFGHIJ'):
+            self.buffer.add(self.source, data)
+        chunks, dropped = self.buffer.take()
+        self.assertEqual(chunks, [(self.source, b'abcdefghijABCDEFGHIJ')])
+        self.assertEqual(dropped, 10)
+        self.assertEqual(self.buffer.take(), ([], 0))
+
+    def testKeepsLastChunkEvenIfTooLarge(self):
+        self.buffer.add(self.source, b'x' * 30)
+        chunks, dropped = self.buffer.take()
+        self.assertEqual(chunks, [(self.source, b'x' * 30)])
+        self.assertEqual(dropped, 0)
+
+
+class Test_keep_last_lines(unittest.TestCase):
+
+    def testKeepsShortText(self):
+        self.assertEqual(keep_last_lines('a\nb\n', 2), ('a\nb\n', 0))
+        self.assertEqual(keep_last_lines('', 2), ('', 0))
+
+    def testCutsOffFirstLines(self):
+        self.assertEqual(keep_last_lines('a\nb\nc\n', 2), ('b\nc\n', 2))
+        self.assertEqual(keep_last_lines('a\nb\nc', 1), ('c', 4))
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from Dart.lib.analyzer.api.protocol import SourceEdit
+from Dart.lib.analyzer.api.protocol import SourceFileEdit
+from Dart.lib.error import ChangeConflictError
+from Dart.lib.package_edits import BatchStats
+from Dart.lib.package_edits import write_file_edit
+from Dart.lib.source_changes import get_stamp
+
+
+class Test_write_file_edit(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'a.dart')
+        with open(self.path, 'w') as f:
+            f.write("import 'b.dart';\nimport 'a.dart';\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(self.path) as f:
+            return f.read()
+
+    def testCanApplyEdits(self):
+        edit = SourceFileEdit(self.path, get_stamp(self.path), [
+                    SourceEdit(0, 34, "import 'a.dart';\nimport 'b.dart';\n")])
+        self.assertTrue(write_file_edit(self.path, edit))
+        self.assertEqual(self.read(), "import 'a.dart';\nimport 'b.dart';\n")
+
+    def testDoesNotWriteWithoutEdits(self):
+        edit = SourceFileEdit(self.path, get_stamp(self.path) - 10000, [])
+        self.assertFalse(write_file_edit(self.path, edit))
+
+    def testRejectsStaleEdits(self):
+        edit = SourceFileEdit(self.path, get_stamp(self.path) - 10000, [
+                    SourceEdit(0, 0, 'x')])
+        with self.assertRaises(ChangeConflictError):
+            write_file_edit(self.path, edit)
+        self.assertEqual(self.read(), "import 'b.dart';\nimport 'a.dart';\n")
+
+
+class Test_BatchStats(unittest.TestCase):
+
+    def testCanSummarize(self):
+        stats = BatchStats()
+        stats.add('a', 10, changed=True)
+        stats.add('b', 20)
+        stats.add('c', 30, error='bad')
+        self.assertEqual(stats.changed, 1)
+        self.assertEqual(stats.failed, [('c', 'bad')])
+        summary = stats.summary(4, elapsed_ms=1000)
+        self.assertTrue(summary.startswith(
+            '3/4 files, 1 changed, 1 failed in 1000ms (3.0 files/s)'))
+        self.assertIn('p50=20.0ms', summary)
@@ -0,0 +1,165 @@
+import os
+import re
+import tempfile
+import unittest
+
+from Dart.lib.package_uris import LOCATION_REGEX
+from Dart.lib.package_uris import LocationRewriter
+from Dart.lib.package_uris import PackageMap
+from Dart.lib.package_uris import PackageUriResolver
+from Dart.lib.package_uris import path_to_file_uri
+from Dart.lib.package_uris import read_dot_packages
+from Dart.lib.package_uris import rewrite_locations
+
+
+class Test_PackageMap(unittest.TestCase):
+
+    def setUp(self):
+        self.lib = os.path.join(os.sep, 'cache', 'foo-1.0.0', 'lib')
+        self.map = PackageMap(os.sep + 'app', {'foo': self.lib})
+
+    def testCanResolvePackageUris(self):
+        self.assertEqual(self.map.to_path('package:foo/src/bar.dart'),
+                         os.path.join(self.lib, 'src', 'bar.dart'))
+
+    def testCannotResolveUnknownPackages(self):
+        self.assertIsNone(self.map.to_path('package:baz/baz.dart'))
+        self.assertIsNone(self.map.to_path('dart:core'))
+
+    def testCanResolveFileUris(self):
+        path = os.path.join(os.sep, 'app', 'bin', 'main.dart')
+        self.assertEqual(self.map.to_path(path_to_file_uri(path)), path)
+
+    def testCanFindPackageUriForPath(self):
+        path = os.path.join(self.lib, 'src', 'bar.dart')
+        self.assertEqual(self.map.to_uri(path), 'package:foo/src/bar.dart')
+
+    def testFallsBackToFileUri(self):
+        path = os.path.join(os.sep, 'app', 'bin', 'main.dart')
+        self.assertEqual(self.map.to_uri(path), path_to_file_uri(path))
+
+    def testRemembersBothDirections(self):
+        path = self.map.to_path('package:foo/foo.dart')
+        self.assertEqual(self.map.to_uri(path), 'package:foo/foo.dart')
+        self.map.add('package:baz/baz.dart', '/baz/lib/baz.dart')
+        self.assertEqual(self.map.to_path('package:baz/baz.dart'),
+                         '/baz/lib/baz.dart')
+
+
+class Test_read_dot_packages(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testCanReadAbsoluteAndRelativeUris(self):
+        path = os.path.join(self.root, '.packages')
+        cached = os.path.join(self.root, 'cache', 'foo', 'lib')
+        with open(path, 'w') as f:
+            f.write('# Generated by pub on 2016-01-01.\n')
+            f.write('foo:' + path_to_file_uri(cached) + '/\n')
+            f.write('app:lib/\n')
+        packages = read_dot_packages(path)
+        self.assertEqual(packages['foo'], cached)
+        self.assertEqual(packages['app'], os.path.join(self.root, 'lib'))
+
+
+class Test_PackageUriResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.stamp = 1
+        self.resolver = PackageUriResolver(stamp=lambda root: self.stamp)
+        self.write_packages('foo', 'one')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_packages(self, name, directory):
+        with open(os.path.join(self.root, '.packages'), 'w') as f:
+            f.write('{}:{}/\n'.format(name, directory))
+
+    def testRereadsPackagesWhenStampChanges(self):
+        self.assertEqual(self.resolver.to_path('package:foo/a.dart', self.root),
+                         os.path.join(self.root, 'one', 'a.dart'))
+        self.write_packages('foo', 'two')
+        self.assertEqual(self.resolver.to_path('package:foo/a.dart', self.root),
+                         os.path.join(self.root, 'one', 'a.dart'))
+        self.stamp = 2
+        self.assertEqual(self.resolver.to_path('package:foo/a.dart', self.root),
+                         os.path.join(self.root, 'two', 'a.dart'))
+
+    def testAsksServerOnceForUnknownPackages(self):
+        asked = []
+        self.resolver.server_lookup = lambda root, uri, callback: (
+            asked.append(uri), callback('/bar/lib/bar.dart'))
+        self.assertIsNone(self.resolver.to_path('package:bar/bar.dart',
+                                                self.root))
+        self.assertEqual(self.resolver.to_path('package:bar/bar.dart',
+                                               self.root),
+                         '/bar/lib/bar.dart')
+        self.assertEqual(asked, ['package:bar/bar.dart'])
+
+    def testAsksServerAgainWhenPackagesChange(self):
+        asked = []
+        self.resolver.server_lookup = lambda root, uri, callback: (
+            asked.append(uri), callback('/bar/lib/bar.dart'))
+        self.resolver.to_path('package:bar/bar.dart', self.root)
+        self.stamp = 2
+        self.assertIsNone(self.resolver.to_path('package:bar/bar.dart',
+                                                self.root))
+        self.assertEqual(self.resolver.to_path('package:bar/bar.dart',
+                                               self.root),
+                         '/bar/lib/bar.dart')
+        self.assertEqual(asked, ['package:bar/bar.dart'] * 2)
+
+
+class Test_rewrite_locations(unittest.TestCase):
+
+    def setUp(self):
+        self.map = PackageMap('/app', {'foo': '/cache/foo/lib'})
+
+    def testRewritesStackFrames(self):
+        text = '#0      main (package:foo/foo.dart:12:3)\n'
+        self.assertEqual(rewrite_locations(text, self.map),
+                         '#0      main (/cache/foo/lib/foo.dart:12:3)\n')
+
+    def testRewritesVmErrors(self):
+        text = "'file:///app/bin/main.dart': error: line 3 pos 5: oops\n"
+        self.assertEqual(rewrite_locations(text, self.map),
+                         '/app/bin/main.dart:3:5: error: oops\n')
+
+    def testLeavesUnknownUrisAlone(self):
+        text = '#1      f (package:bar/bar.dart:1:1)\n'
+        self.assertEqual(rewrite_locations(text, self.map), text)
+
+    def testRewrittenLocationsMatchRegex(self):
+        text = rewrite_locations(
+            "'file:///app/bin/main.dart': error: line 3 pos 5: oops",
+            self.map)
+        m = re.search(LOCATION_REGEX, text)
+        self.assertEqual(m.groups(), ('/app/bin/main.dart', '3', '5',
+                                      'error: oops'))
+        m = re.search(LOCATION_REGEX, '#0  main (/app/bin/main.dart:1:2)')
+        self.assertEqual(m.groups()[:3], ('/app/bin/main.dart', '1', '2'))
+
+    def testRegexIgnoresUnresolvedUris(self):
+        self.assertIsNone(re.search(LOCATION_REGEX,
+                                    '#0  f (package:bar/bar.dart:1:1)'))
+
+
+class Test_LocationRewriter(unittest.TestCase):
+
+    def testJoinsLocationsSplitAcrossChunks(self):
+        resolver = PackageUriResolver(stamp=lambda root: 1)
+        resolver.get_map = lambda root: PackageMap(
+            root, {'foo': '/cache/foo/lib'})
+        rewriter = LocationRewriter(resolver, '/app')
+        self.assertEqual(rewriter.feed('#0 main (package:fo'), '')
+        self.assertEqual(rewriter.feed('o/foo.dart:1:2)\nmore'),
+                         '#0 main (/cache/foo/lib/foo.dart:1:2)\n')
+        self.assertEqual(rewriter.flush(), 'more')
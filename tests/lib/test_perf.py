@@ -0,0 +1,116 @@
+import unittest
+
+from Dart.lib.perf import Histogram
+from Dart.lib.perf import Metrics
+from Dart.lib.perf import Rate
+from Dart.lib.perf import render_stats
+from Dart.lib.perf import Samples
+from Dart.lib.perf import Stopwatch
+from Dart.tests.lib.fakes import FakeClock
+
+
+class Test_Samples(unittest.TestCase):
+
+    def testCanComputePercentiles(self):
+        samples = Samples()
+        for i in range(1, 101):
+            samples.add(i)
+        self.assertEqual(samples.percentile(50), 50)
+        self.assertEqual(samples.percentile(90), 90)
+        self.assertEqual(samples.percentile(100), 100)
+        self.assertEqual(samples.percentile(0), 1)
+
+    def testKeepsOnlyMostRecentValues(self):
+        samples = Samples(size=2)
+        for i in range(5):
+            samples.add(i)
+        self.assertEqual(samples.values(), [3, 4])
+        self.assertEqual(samples.total, 5)
+
+    def testReturnsNoneIfEmpty(self):
+        self.assertIsNone(Samples().percentile(50))
+        self.assertIsNone(Samples().mean())
+
+
+class Test_Stopwatch(unittest.TestCase):
+
+    def testMeasuresTime(self):
+        with Stopwatch() as sw:
+            pass
+        self.assertGreaterEqual(sw.ms, 0)
+
+
+
+class Test_Histogram(unittest.TestCase):
+
+    def testCountsValuesInBuckets(self):
+        h = Histogram(bounds=(10, 100))
+        for value in (1, 10, 11, 500):
+            h.add(value)
+        self.assertEqual(h.counts, [2, 1, 1])
+        self.assertEqual(h.max, 500)
+        self.assertEqual(h.format(),
+                         'n=4 mean=130.5 max=500.0 | <=10:2 <=100:1 >100:1')
+
+
+class Test_Rate(unittest.TestCase):
+
+    def testCountsEventsInWindow(self):
+        clock = FakeClock()
+        rate = Rate(window=2, clock=clock)
+        rate.mark()
+        rate.mark()
+        clock.now += 1
+        rate.mark(2)
+        self.assertEqual(rate.per_second(), 2)
+        clock.now += 1
+        self.assertEqual(rate.per_second(), 1)
+        clock.now += 5
+        rate.mark()
+        self.assertEqual(len(rate.buckets), 1)
+        self.assertEqual(rate.total, 5)
+
+
+class Test_Metrics(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.metrics = Metrics(clock=self.clock)
+
+    def testCanTimeRequests(self):
+        self.metrics.start_request('1', 'edit.format')
+        self.clock.now += 0.25
+        self.metrics.finish_request('1')
+        self.metrics.finish_request('unknown')
+        histogram = self.metrics.histograms['request.edit.format']
+        self.assertEqual(histogram.total, 1)
+        self.assertEqual(histogram.sum, 250)
+
+    def testDropsOldestPendingRequests(self):
+        for i in range(Metrics.MAX_PENDING + 1):
+            self.metrics.start_request(i, 'x')
+        self.assertEqual(self.metrics.snapshot()['pending'], Metrics.MAX_PENDING)
+        self.metrics.finish_request(0)
+        self.assertNotIn('request.x', self.metrics.histograms)
+
+    def testCanTimeFunctions(self):
+        @self.metrics.timed('ui.f')
+        def f(x):
+            return x * 2
+        self.assertEqual(f(2), 4)
+        self.assertEqual(self.metrics.histograms['ui.f'].total, 1)
+
+    def testCanRenderStats(self):
+        self.metrics.incr('server.starts', 2)
+        self.metrics.set_thread_alive('RequestHandler-thread', True)
+        self.metrics.mark('analysis.errors')
+        self.metrics.observe('request.edit.format', 3)
+        self.metrics.observe('ui.show_errors', 7)
+        text = render_stats(self.metrics.snapshot(), [('requests', 4)])
+        self.assertIn('requests                      4', text)
+        self.assertIn('RequestHandler-thread    alive for 0s', text)
+        self.assertIn('restarts                      1', text)
+        self.assertIn('analysis.errors', text)
+        self.assertIn('edit.format', text)
+        self.assertIn('show_errors', text)
+        self.assertIn('total=7ms', text)
@@ -0,0 +1,98 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+from Dart.lib.profiling import make_profile_path
+from Dart.lib.profiling import ProfileSession
+from Dart.lib.profiling import Sampler
+from Dart.lib.profiling import to_folded
+from Dart.lib.profiling import top_sampled
+from Dart.lib.profiling import top_stats
+
+
+def busy():
+    return sum(range(1000))
+
+
+class Test_ProfileSession(unittest.TestCase):
+
+    def setUp(self):
+        self.session = ProfileSession()
+
+    def testReturnsNoneIfNothingWasProfiled(self):
+        self.session.start()
+        self.assertIsNone(self.session.stop())
+
+    def testCanProfileSections(self):
+        self.session.start()
+        with self.session.section():
+            busy()
+        stats = self.session.stop()
+        self.assertIn('busy', top_stats(stats))
+
+    def testCanProfileOtherThreads(self):
+        self.session.start()
+        started = threading.Event()
+        done = threading.Event()
+
+        def loop():
+            while not done.is_set():
+                self.session.checkpoint()
+                busy()
+                started.set()
+            self.session.checkpoint()
+
+        t = threading.Thread(target=loop)
+        t.start()
+        started.wait(5)
+        stats = self.session.stop()
+        done.set()
+        t.join()
+        self.assertIn('busy', top_stats(stats))
+        self.assertFalse(self.session._local.__dict__.get('enabled'))
+
+
+class Test_Sampler(unittest.TestCase):
+
+    def testRecordsIncludedStacksOnly(self):
+        sampler = Sampler()
+
+        def leaf():
+            return sampler.sample('T', sys._getframe())
+
+        leaf()
+        self.assertEqual(len(sampler.counts), 1)
+        stack = list(sampler.counts)[0]
+        self.assertTrue(stack.startswith('T;'))
+        self.assertIn('leaf (test_profiling.py:', stack.split(';')[-1])
+
+        sampler.include = lambda frame: False
+        sampler.counts.clear()
+        leaf()
+        self.assertEqual(len(sampler.counts), 0)
+
+    def testCanSampleThreads(self):
+        sampler = Sampler(interval=0.001)
+        sampler.start()
+        time.sleep(0.05)
+        counts = sampler.stop()
+        self.assertFalse(sampler.running)
+        self.assertGreater(sampler.samples, 0)
+        self.assertTrue(counts)
+
+
+class Test_helpers(unittest.TestCase):
+
+    def testCanFormatFoldedStacks(self):
+        counts = {'T;a;b': 3, 'T;a': 1}
+        self.assertEqual(to_folded(counts), 'T;a 1\nT;a;b 3\n')
+        summary = top_sampled(counts).split('\n')
+        self.assertEqual(summary[0], '4 samples')
+        self.assertEqual(summary[2].split(), ['75.0%', '3', 'b'])
+
+    def testCanMakePaths(self):
+        now = time.strptime('2015-01-02 03:04:05', '%Y-%m-%d %H:%M:%S')
+        self.assertEqual(make_profile_path('x', '.pstats', now),
+                         os.path.join('x', 'dart-20150102-030405.pstats'))
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from Dart.lib.project_registry import ProjectRegistry
+from Dart.tests.lib.fakes import FakeClock
+
+
+class Test_ProjectRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'pkg')
+        os.makedirs(os.path.join(self.root, 'lib', 'src'))
+        os.makedirs(os.path.join(self.root, 'web'))
+        self.touch('pkg/pubspec.yaml')
+        self.clock = FakeClock()
+        self.registry = ProjectRegistry(ttl=5, clock=self.clock)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, rel):
+        return os.path.join(self.tmp.name, *rel.split('/'))
+
+    def touch(self, rel):
+        with open(self.path(rel), 'w'):
+            pass
+
+    def testCanFindRoot(self):
+        self.assertEqual(self.registry.find_root(self.path('pkg/lib/src/a.dart')),
+                         self.root)
+        self.assertEqual(self.registry.find_root(self.root), self.root)
+        self.assertIsNone(self.registry.find_root(self.tmp.name))
+
+    def testCachesRootsUntilTtlExpires(self):
+        path = self.path('pkg/lib/src/a.dart')
+        self.registry.find_root(path)
+        os.remove(self.path('pkg/pubspec.yaml'))
+        self.assertEqual(self.registry.find_root(path), self.root)
+        # Siblings are found through the cached parent directories.
+        self.assertEqual(self.registry.find_root(self.path('pkg/lib/b.dart')),
+                         self.root)
+        self.clock.now += 6
+        self.assertIsNone(self.registry.find_root(path))
+
+    def testCanInvalidateSubtree(self):
+        path = self.path('pkg/lib/src/a.dart')
+        self.registry.find_root(path)
+        self.touch('pkg/lib/pubspec.yaml')
+        self.assertEqual(self.registry.find_root(path), self.root)
+        self.registry.invalidate(self.path('pkg/lib'))
+        self.assertEqual(self.registry.find_root(path), self.path('pkg/lib'))
+
+    def testCanListTopLevelDirs(self):
+        self.assertEqual(self.registry.get_top_level_dir(self.root, 'web'),
+                         self.path('pkg/web'))
+        self.assertIsNone(self.registry.get_top_level_dir(self.root, 'bin'))
+
+    def testRelistsTopLevelDirsWhenRootChanges(self):
+        layout = self.registry.get_layout(self.root)
+        os.makedirs(self.path('pkg/bin'))
+        os.utime(self.root, (0, layout.mtime + 10))
+        # Not checked again until the ttl expires.
+        self.assertIsNone(self.registry.get_top_level_dir(self.root, 'bin'))
+        self.clock.now += 6
+        self.assertEqual(self.registry.get_top_level_dir(self.root, 'bin'),
+                         self.path('pkg/bin'))
+
+    def testKeepsLayoutIfRootIsUnchanged(self):
+        layout = self.registry.get_layout(self.root)
+        self.clock.now += 6
+        self.assertIs(self.registry.get_layout(self.root), layout)
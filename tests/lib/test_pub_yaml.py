@@ -0,0 +1,90 @@
+import glob
+import os
+import unittest
+
+from Dart.lib.pub_yaml import load
+from Dart.lib.pub_yaml import load_fast
+from Dart.lib.pub_yaml import Unsupported
+from Dart.out_there.yaml import load as yaml_load
+
+
+_REPO = os.path.dirname(os.path.dirname(os.path.dirname(
+                        os.path.abspath(__file__))))
+
+
+PUBSPEC = '''\
+name: sample
+version: 0.1.0+1
+description: A sample
+  web app.
+author: Someone <someone@example.com>
+homepage: http://example.com/#home
+environment:
+  sdk: '>=1.0.0 <2.0.0'
+dependencies:
+  browser: any
+  polymer: ">=0.15.1 <0.16.0"
+  path:
+    git: git://github.com/dart-lang/path.git
+dev_dependencies:
+  unittest: any # For tests.
+transformers:
+- polymer:
+    entry_points: web/index.html
+- $dart2js
+'''
+
+SUPPORTED = [
+    PUBSPEC.split('transformers')[0],
+    '',
+    '# Only a comment.\n',
+    'a: 1\nb: 1.5\nc: yes\nd: ~\ne: 2014-01-02\nf: 0x1F\ng: 012\n',
+    'h: 1:30\ni: .inf\nj: \'1\'\nk: "x"\nl: -.5e+3\nm: 1_000\n',
+    'version: 0.15.1\nother: 1.0\n',
+    'a:\n- 1\n- two\nb:\n  - x\n  -\n  - \'y\'\n',
+    'a: b # c\nd: \'e\' # f\n',
+    '\'quoted key\': v\n"other": w\n',
+    'a: \'it\'\'s\'\n',
+    '1: one\n1.5: x\nnull: y\n',
+    'a:\n  b:\n    c: d\n  e: f\ng: h\n',
+    'a: b\r\nc: d\r\n',
+]
+
+UNSUPPORTED = [
+    PUBSPEC,
+    'a: [1, 2]\n',
+    'a: &x 1\nb: *x\n',
+    'a: |\n  text\n',
+    '---\na: b\n',
+    'a: "tab\\tbed"\n',
+    'a:\tb\n',
+    '<<: x\n',
+    'a: b: c\n',
+    'a: b\n  c: d\n',
+    'a: b # c\n  d\n',
+]
+
+
+class Test_load(unittest.TestCase):
+
+    def testHandlesSupportedYamlOnFastPath(self):
+        for text in SUPPORTED:
+            self.assertEqual(load_fast(text), yaml_load(text), text)
+
+    def testFallsBackOnUnsupportedYaml(self):
+        for text in UNSUPPORTED:
+            self.assertRaises(Unsupported, load_fast, text)
+            try:
+                expected = yaml_load(text)
+            except Exception as e:
+                self.assertRaises(type(e), load, text)
+            else:
+                self.assertEqual(load(text), expected, text)
+
+    def testMatchesYamlOnRealFiles(self):
+        paths = glob.glob(os.path.join(_REPO, 'bin', '*', 'pubspec.*'))
+        self.assertTrue(paths)
+        for path in paths:
+            with open(path, 'rt', encoding='utf-8') as f:
+                text = f.read()
+            self.assertEqual(load_fast(text), yaml_load(text), path)
@@ -0,0 +1,49 @@
+import unittest
+
+from Dart.lib.references import format_reference
+from Dart.lib.references import OffsetTable
+from Dart.lib.references import OffsetTableCache
+
+
+class Test_OffsetTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = OffsetTable('foo\nbar baz\r\n\nqux')
+
+    def testCanResolveOffsets(self):
+        self.assertEqual(self.table.row_col(0), (1, 1))
+        self.assertEqual(self.table.row_col(8), (2, 5))
+        self.assertEqual(self.table.row_col(14), (4, 1))
+
+    def testCanGetLines(self):
+        self.assertEqual(self.table.line(2), 'bar baz')
+        self.assertEqual(self.table.line(3), '')
+        self.assertEqual(self.table.line(4), 'qux')
+
+
+class Test_OffsetTableCache(unittest.TestCase):
+
+    def testReloadsOnlyWhenVersionChanges(self):
+        cache = OffsetTableCache()
+        loads = []
+        def load():
+            loads.append(1)
+            return 'foo'
+
+        first = cache.get('foo.dart', 1, load)
+        self.assertIs(cache.get('foo.dart', 1, load), first)
+        self.assertIsNot(cache.get('foo.dart', 2, load), first)
+        self.assertEqual(len(loads), 2)
+
+    def testDoesNotCacheUnreadableFiles(self):
+        cache = OffsetTableCache()
+        self.assertIsNone(cache.get('foo.dart', 1, lambda: None))
+        self.assertIsNotNone(cache.get('foo.dart', 1, lambda: 'foo'))
+
+
+class Test_format_reference(unittest.TestCase):
+
+    def testCanFormatReference(self):
+        self.assertEqual(
+            format_reference('foo.dart', 2, 5, 'READ', '  x = y;', True),
+            'foo.dart:2:5: [read?] x = y;')
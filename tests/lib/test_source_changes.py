@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from Dart.lib.analyzer.api.protocol import SourceChange
+from Dart.lib.analyzer.api.protocol import SourceEdit
+from Dart.lib.analyzer.api.protocol import SourceFileEdit
+from Dart.lib.error import ChangeConflictError
+from Dart.lib.source_changes import ChangePlan
+from Dart.lib.source_changes import get_stamp
+from Dart.lib.source_changes import group_by_file
+from Dart.lib.source_changes import is_stamp_current
+from Dart.lib.source_changes import NEW_FILE_STAMP
+
+
+class Test_source_changes(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.a = self.write('a.dart', 'var foo = 1;')
+        self.b = self.write('b.dart', 'print(foo);')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def rename(self, stamp_a=None, stamp_b=None):
+        stamp_a = get_stamp(self.a) if stamp_a is None else stamp_a
+        stamp_b = get_stamp(self.b) if stamp_b is None else stamp_b
+        return SourceChange('Rename', [
+            SourceFileEdit(self.a, stamp_a, [SourceEdit(4, 3, 'bar')]),
+            SourceFileEdit(self.b, stamp_b, [SourceEdit(6, 3, 'bar')]),
+            ])
+
+    def testCanGroupEditsByFile(self):
+        change = SourceChange('x', [
+            SourceFileEdit('a', 1, [SourceEdit(0, 1, 'x')]),
+            SourceFileEdit('b', 2, [SourceEdit(1, 1, 'y')]),
+            SourceFileEdit('a', 1, [SourceEdit(5, 0, 'z')]),
+            ])
+        files = group_by_file(change)
+        self.assertEqual(list(files), ['a', 'b'])
+        self.assertEqual(files['a'].edits, [[0, 1, 'x'], [5, 0, 'z']])
+        self.assertEqual(files['b'].stamp, 2)
+
+    def testCanCheckStamps(self):
+        stamp = get_stamp(self.a)
+        self.assertTrue(is_stamp_current(self.a, stamp))
+        os.utime(self.a, (0, stamp / 1000 + 10))
+        self.assertFalse(is_stamp_current(self.a, stamp))
+
+    def testMissingFileHasNewFileStamp(self):
+        missing = os.path.join(self.tmp.name, 'missing.dart')
+        self.assertEqual(get_stamp(missing), NEW_FILE_STAMP)
+        self.assertTrue(is_stamp_current(missing, NEW_FILE_STAMP))
+        self.assertFalse(is_stamp_current(self.a, NEW_FILE_STAMP))
+
+    def testCanWriteAllFiles(self):
+        plan = ChangePlan(self.rename(), lambda path: False)
+        plan.write_files()
+        self.assertEqual(self.read(self.a), 'var bar = 1;')
+        self.assertEqual(self.read(self.b), 'print(bar);')
+        # No temporary files are left behind.
+        self.assertEqual(sorted(os.listdir(self.tmp.name)),
+                         ['a.dart', 'b.dart'])
+
+    def testLeavesOpenFilesToViews(self):
+        plan = ChangePlan(self.rename(), lambda path: path == self.a)
+        self.assertEqual(dict(plan.view_edits), {self.a: [[4, 3, 'bar']]})
+        plan.write_files()
+        self.assertEqual(self.read(self.a), 'var foo = 1;')
+        self.assertEqual(self.read(self.b), 'print(bar);')
+
+    def testWritesNothingIfAnyFileIsStale(self):
+        change = self.rename(stamp_b=get_stamp(self.b) - 10000)
+        with self.assertRaises(ChangeConflictError):
+            ChangePlan(change, lambda path: False)
+        self.assertEqual(self.read(self.a), 'var foo = 1;')
+        self.assertEqual(self.read(self.b), 'print(foo);')
+
+    def testCanCreateFiles(self):
+        path = os.path.join(self.tmp.name, 'lib', 'c.dart')
+        change = SourceChange('Create', [
+            SourceFileEdit(path, NEW_FILE_STAMP, [SourceEdit(0, 0, 'main() {}')]),
+            ])
+        ChangePlan(change, lambda path: False).write_files()
+        self.assertEqual(self.read(path), 'main() {}')
@@ -0,0 +1,30 @@
+import unittest
+
+from Dart.lib.analyzer.api.protocol import SourceEdit
+from Dart.lib.source_edits import apply_edits
+from Dart.lib.source_edits import sort_edits
+from Dart.lib.source_edits import to_command_args
+
+
+class Test_sort_edits(unittest.TestCase):
+
+    def testSortsEditsInReverseOffsetOrder(self):
+        edits = [[0, 1, 'a'], [10, 0, 'b'], [5, 2, 'c']]
+        self.assertEqual(sort_edits(edits),
+                         [[10, 0, 'b'], [5, 2, 'c'], [0, 1, 'a']])
+
+    def testKeepsOrderOfEditsAtSameOffset(self):
+        edits = [[3, 0, 'a'], [3, 0, 'b']]
+        self.assertEqual(sort_edits(edits), edits)
+
+
+class Test_apply_edits(unittest.TestCase):
+
+    def testAppliesEditsInServerOrderWithoutShiftingOffsets(self):
+        text = 'main(){print(1);}'
+        edits = to_command_args([SourceEdit(0, 0, '// x\n'),
+                                 SourceEdit(6, 0, ' '),
+                                 SourceEdit(7, 0, '\n  '),
+                                 SourceEdit(16, 0, '\n')])
+        self.assertEqual(apply_edits(text, edits),
+                         '// x\nmain() {\n  print(1);\n}')
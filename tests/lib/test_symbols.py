@@ -0,0 +1,96 @@
+import unittest
+
+from Dart.lib.analyzer.api.protocol import Element
+from Dart.lib.analyzer.api.protocol import ElementKind
+from Dart.lib.analyzer.api.protocol import Location
+from Dart.lib.analyzer.api.protocol import Outline
+from Dart.lib.symbols import fuzzy_score
+from Dart.lib.symbols import SymbolIndex
+
+
+def make_outline(kind, name, offset, children=[]):
+    location = Location('foo.dart', offset, len(name), 1, offset + 1)
+    element = Element(kind, name, 0, location=location)
+    return Outline(element, offset, len(name), children=children)
+
+
+def make_unit(*children):
+    return make_outline(ElementKind.COMPILATION_UNIT, '<unit>', 0,
+                        children=list(children))
+
+
+class Test_SymbolIndex(unittest.TestCase):
+
+    def testCanIndexMembers(self):
+        index = SymbolIndex()
+        unit = make_unit(make_outline(ElementKind.CLASS, 'Foo', 0, children=[
+                            make_outline(ElementKind.METHOD, 'bar', 10)]))
+        index.update('foo.dart', unit)
+        names = [s.qualified_name for s in index.get_file_symbols('foo.dart')]
+        self.assertEqual(names, ['Foo', 'Foo.bar'])
+
+    def testAppliesUpdatesIncrementally(self):
+        index = SymbolIndex()
+        index.update('foo.dart', make_unit(
+                        make_outline(ElementKind.CLASS, 'Foo', 0),
+                        make_outline(ElementKind.FUNCTION, 'main', 20)))
+        foo = index.get_file_symbols('foo.dart')[0]
+
+        added, removed, moved = index.update('foo.dart', make_unit(
+                        make_outline(ElementKind.CLASS, 'Foo', 5),
+                        make_outline(ElementKind.FUNCTION, 'baz', 30)))
+
+        self.assertEqual((added, removed, moved), (1, 1, 1))
+        symbols = index.get_file_symbols('foo.dart')
+        self.assertIs(symbols[0], foo)
+        self.assertEqual(foo.offset, 5)
+        self.assertEqual(symbols[1].name, 'baz')
+
+    def testMergesFiles(self):
+        index = SymbolIndex()
+        index.update('a.dart', make_unit(make_outline(ElementKind.CLASS, 'B', 0)))
+        index.update('b.dart', make_unit(make_outline(ElementKind.CLASS, 'A', 0)))
+        self.assertEqual([s.name for s in index.get_all_symbols()], ['A', 'B'])
+        index.remove('b.dart')
+        self.assertEqual([s.name for s in index.get_all_symbols()], ['B'])
+
+    def testUpdatesParameters(self):
+        index = SymbolIndex()
+        index.update('foo.dart', make_unit(
+                        make_outline(ElementKind.FUNCTION, 'main', 0)))
+        unit = make_unit(make_outline(ElementKind.FUNCTION, 'main', 0))
+        unit.children[0].element.parameters = '(List<String> args)'
+        self.assertEqual(index.update('foo.dart', unit), (0, 0, 1))
+        self.assertEqual(index.get_file_symbols('foo.dart')[0].parameters,
+                         '(List<String> args)')
+
+    def testKeepsAllSymbolsSortedAcrossUpdates(self):
+        index = SymbolIndex()
+        index.update('a.dart', make_unit(make_outline(ElementKind.CLASS, 'B', 0)))
+        self.assertEqual([s.name for s in index.get_all_symbols()], ['B'])
+        index.update('b.dart', make_unit(
+                        make_outline(ElementKind.CLASS, 'C', 0),
+                        make_outline(ElementKind.CLASS, 'A', 10)))
+        index.update('a.dart', make_unit(make_outline(ElementKind.CLASS, 'D', 0)))
+        self.assertEqual([s.name for s in index.get_all_symbols()],
+                         ['A', 'C', 'D'])
+        index.remove('b.dart')
+        self.assertEqual([s.name for s in index.get_all_symbols()], ['D'])
+
+    def testCanFindFuzzily(self):
+        index = SymbolIndex()
+        index.update('a.dart', make_unit(
+                        make_outline(ElementKind.CLASS, 'HttpRequest', 0),
+                        make_outline(ElementKind.CLASS, 'Hash', 20),
+                        make_outline(ElementKind.CLASS, 'Other', 40)))
+        self.assertEqual([s.name for s in index.find('hrq')], ['HttpRequest'])
+        self.assertEqual([s.name for s in index.find('hs')], ['Hash', 'HttpRequest'])
+
+
+class Test_fuzzy_score(unittest.TestCase):
+
+    def testFailsIfNotSubsequence(self):
+        self.assertEqual(fuzzy_score('xyz', 'foo'), None)
+
+    def testExactMatchScoresBest(self):
+        self.assertTrue(fuzzy_score('foo', 'foo') < fuzzy_score('foo', 'f_o_o'))
@@ -0,0 +1,47 @@
+import unittest
+
+from Dart.lib.trace import format_trace
+from Dart.lib.trace import ProtocolTrace
+from Dart.lib.trace import RECEIVED
+from Dart.lib.trace import SENT
+from Dart.tests.lib.fakes import FakeClock
+
+
+class Test_ProtocolTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.trace = ProtocolTrace(size=3, clock=self.clock)
+
+    def testKeepsOnlyLastEntries(self):
+        for i in range(5):
+            self.trace.sent({'id': str(i), 'method': 'm'}, 10)
+        self.assertEqual([e[3] for e in self.trace.last(0)], ['2', '3', '4'])
+        self.assertEqual([e[3] for e in self.trace.last(2)], ['3', '4'])
+
+    def testRecordsMetadata(self):
+        self.trace.sent({'id': '1', 'method': 'edit.format', 'params': {}}, 50)
+        self.trace.received({'event': 'analysis.errors', 'params': {}}, 70)
+        self.assertEqual(self.trace.last(0), [
+            (1000.0, SENT, 'edit.format', '1', 50),
+            (1000.0, RECEIVED, 'analysis.errors', None, 70),
+            ])
+
+
+class Test_format_trace(unittest.TestCase):
+
+    def testMatchesResponsesAndListsPendingRequests(self):
+        clock = FakeClock()
+        trace = ProtocolTrace(clock=clock)
+        trace.sent({'id': '1', 'method': 'edit.format'}, 50)
+        trace.sent({'id': '2', 'method': 'analysis.getHover'}, 50)
+        clock.now += 0.25
+        trace.received({'id': '1'}, 100)
+        trace.received({'event': 'server.status'}, 30)
+
+        text = format_trace(trace.last(0), now=clock.now + 1)
+        lines = text.splitlines()
+        self.assertIn('> edit.format #1', lines[0])
+        self.assertIn('< response #1 to edit.format (250ms)', lines[2])
+        self.assertIn('< server.status', lines[3])
+        self.assertEqual(lines[-1], '  analysis.getHover #2 for 1250ms')
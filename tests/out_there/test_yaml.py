@@ -0,0 +1,47 @@
+import io
+import unittest
+
+from Dart.out_there.yaml import load
+from Dart.out_there.yaml import scan
+from Dart.out_there.yaml.scanner import ScannerError
+
+
+def get_tokens(stream):
+    return [(type(t).__name__, getattr(t, 'value', None),
+             t.start_mark.index, t.start_mark.line, t.start_mark.column,
+             t.end_mark.index, t.end_mark.line, t.end_mark.column)
+            for t in scan(stream)]
+
+
+class Test_Scanner(unittest.TestCase):
+
+    def testReadsStreamsAcrossChunks(self):
+        # The reader reads files in chunks of 4096 characters; runs of
+        # characters must be measured across them.
+        text = ''.join('key{0}: "quoted {0}" # comment\n'
+                       'list{0}:\n'
+                       '  - plain scalar {1}\n'
+                       '    continued here\n'
+                       '  - {{a: b, c: [d]}}\n'
+                       'block{0}: |\n'
+                       '  {1}\n'.format(i, 'x' * (1 + i * 37 % 500))
+                       for i in range(100))
+        self.assertEqual(get_tokens(io.StringIO(text)), get_tokens(text))
+        self.assertEqual(load(io.StringIO(text)), load(text))
+
+    def testCanTrackLinesAndColumns(self):
+        tokens = get_tokens('a: b\r\nc:\r  - d\x85e:   f\n')
+        self.assertEqual([t[2:] for t in tokens if t[0] == 'ScalarToken'], [
+            (0, 0, 0, 1, 0, 1),
+            (3, 0, 3, 4, 0, 4),
+            (6, 1, 0, 7, 1, 1),
+            (13, 2, 4, 14, 2, 5),
+            (15, 3, 0, 16, 3, 1),
+            (20, 3, 5, 21, 3, 6),
+        ])
+
+    def testPlainScalarsStopAtColonFollowedBySpace(self):
+        self.assertEqual(load('a:b: c:d\n'), {'a:b': 'c:d'})
+        self.assertEqual(load('[a, b: c]'), ['a', {'b': 'c'}])
+        # Not in flow collections, though.
+        self.assertRaises(ScannerError, load, '[a, b:c]')